@@ -8,6 +8,7 @@ from .models import (
     Bookmark,
     Notification,
     ActivityLog,
+    SavedSearch,
 )
 
 
@@ -61,3 +62,10 @@ class NotificationAdmin(admin.ModelAdmin):
 class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ("created_at", "user", "action")
     search_fields = ("action", "user__username")
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ("user", "name", "query", "location", "alerts_enabled", "last_alerted_at")
+    list_filter = ("alerts_enabled",)
+    search_fields = ("user__username", "name", "query")
@@ -0,0 +1,171 @@
+# accounts/alerts.py - Notify users when new jobs match their saved searches
+#
+# Every saved search is filed under one "anchor" key: its most selective
+# condition (longest query word, then place, category, job type, remote,
+# else "any"). A new job only checks the searches filed under keys it has,
+# so a batch costs roughly (jobs x candidates per job), not
+# (jobs x saved searches).
+
+import re
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from jobAccess import versions
+from jobAccess.geo import find_place, place_label, resolve_location
+from jobAccess.models import InteractionWatermark, Job
+from jobAccess.recommendations import id_batches
+
+from .models import Notification, SavedSearch
+
+WATERMARK_SOURCE = "search_alerts"
+ANY = ("any",)
+
+_WORD_RE = re.compile(r"\w+")
+
+JOB_FIELDS = (
+    "id", "title", "company_name", "location", "description", "job_type",
+    "category__name", "place", "is_remote", "is_active", "salary_min", "salary_max",
+)
+
+
+def _words(text):
+    return set(_WORD_RE.findall((text or "").lower()))
+
+
+class SearchSpec:
+    __slots__ = ("id", "user_id", "label", "words", "job_type", "category", "place", "location",
+                 "remote", "salary_min", "salary_max")
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.user_id = row["user_id"]
+        self.label = row["name"] or row["query"] or "your saved search"
+        self.words = _words(row["query"])
+        self.job_type = row["job_type"]
+        self.category = row["category"].lower()
+        place = find_place(row["location"]) if row["location"] else None
+        self.place = place_label(place) if place else ""
+        # Unresolvable locations fall back to a substring check, like icontains
+        self.location = "" if place else row["location"].lower()
+        self.remote = row["remote"]
+        self.salary_min = row["salary_min"]
+        self.salary_max = row["salary_max"]
+
+    def anchor(self):
+        if self.words:
+            return ("word", max(self.words, key=lambda w: (len(w), w)))
+        if self.place:
+            return ("place", self.place)
+        if self.category:
+            return ("category", self.category)
+        if self.job_type:
+            return ("job_type", self.job_type)
+        if self.remote:
+            return ("remote",)
+        return ANY
+
+    def matches(self, job):
+        return (
+            self.words <= job["words"]
+            and (not self.job_type or self.job_type == job["job_type"])
+            and (not self.category or self.category == job["category"])
+            and (not self.place or self.place == job["place"])
+            and (not self.location or self.location in job["location"])
+            and (self.remote is None or self.remote == job["is_remote"])
+            and (self.salary_min is None or (job["salary_min"] is not None and job["salary_min"] >= self.salary_min))
+            and (self.salary_max is None or (job["salary_max"] is not None and job["salary_max"] <= self.salary_max))
+        )
+
+
+class SearchMatcher:
+    """Inverted index of saved searches keyed by their anchor condition."""
+
+    def __init__(self, rows):
+        self.postings = defaultdict(list)
+        for row in rows:
+            spec = SearchSpec(row)
+            self.postings[spec.anchor()].append(spec)
+
+    def match(self, job):
+        """Saved searches matching a job dict (see prepare_job)."""
+        keys = [("word", w) for w in job["words"]]
+        keys += [ANY, ("place", job["place"]), ("category", job["category"]), ("job_type", job["job_type"])]
+        if job["is_remote"]:
+            keys.append(("remote",))
+        for key in keys:
+            for spec in self.postings.get(key, ()):
+                if spec.matches(job):
+                    yield spec
+
+
+def prepare_job(row):
+    job = {
+        **row,
+        "words": _words(f"{row['title']} {row['company_name']} {row['location']} {row['description']}"),
+        "category": (row["category__name"] or "").lower(),
+        "location": row["location"].lower(),
+    }
+    if not row["place"] and not row["is_remote"]:
+        # bulk_create skips the signal that geocodes locations
+        resolved = resolve_location(row["location"])
+        job["place"], job["is_remote"] = resolved.place, resolved.is_remote
+    return job
+
+
+def load_matcher():
+    rows = SavedSearch.objects.filter(alerts_enabled=True).values(
+        "id", "user_id", "name", "query", "job_type", "category", "location",
+        "remote", "salary_min", "salary_max",
+    )
+    return SearchMatcher(rows.iterator(chunk_size=5000))
+
+
+def send_search_alerts(batch_size=2000):
+    """Notify saved-search owners about active jobs added since the last run.
+
+    Returns (jobs_scanned, notifications_created). The first run only records
+    the current newest job, so existing postings never trigger alerts.
+    """
+    watermark, created = InteractionWatermark.objects.get_or_create(source=WATERMARK_SOURCE)
+    newest = Job.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    if created:
+        watermark.last_id = newest
+        watermark.save(update_fields=["last_id"])
+        return 0, 0
+    if newest <= watermark.last_id:
+        return 0, 0
+
+    matcher = load_matcher()
+    scanned = sent = 0
+    while watermark.last_id < newest:
+        rows = list(
+            Job.objects.filter(id__gt=watermark.last_id, id__lte=newest)
+            .order_by("id").values(*JOB_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+        notifications, alerted = [], set()
+        for row in rows:
+            if not row["is_active"]:
+                continue
+            job = prepare_job(row)
+            users = set()
+            for spec in matcher.match(job):
+                if spec.user_id not in users:
+                    users.add(spec.user_id)
+                    notifications.append(Notification(
+                        user_id=spec.user_id,
+                        message=f'New job for "{spec.label}": {row["title"]} at {row["company_name"]}'[:255],
+                    ))
+                alerted.add(spec.id)
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=1000)
+            versions.bump(*{versions.user_key(n.user_id, "notifications") for n in notifications})
+            for ids in id_batches(sorted(alerted)):
+                SavedSearch.objects.filter(id__in=ids).update(last_alerted_at=timezone.now())
+            watermark.last_id = rows[-1]["id"]
+            watermark.save(update_fields=["last_id"])
+        scanned += len(rows)
+        sent += len(notifications)
+    return scanned, sent
@@ -0,0 +1,157 @@
+# accounts/exports.py - Stream jobs, applications and activity logs as NDJSON or CSV
+#
+# Rows come from QuerySet.values_list().iterator(chunk_size=...), so the
+# database cursor is read a chunk at a time and only one chunk of rows plus
+# one chunk of output is ever held in memory, however large the table.
+
+import csv
+import json
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from jobAccess.models import Job
+
+from .models import ActivityLog, Application
+
+CHUNK_SIZE = 2000
+FORMATS = ("ndjson", "csv")
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _timestamp(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Not a date or datetime: {value}")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _flag(value):
+    if value not in ("true", "false"):
+        raise ValueError(f"Expected true or false, got: {value}")
+    return value == "true"
+
+
+class Export:
+    """One exportable table: its queryset, output columns and accepted filters."""
+
+    def __init__(self, queryset, columns, filters):
+        self.queryset = queryset
+        # {output name: values_list lookup}
+        self.columns = columns
+        # {param: (field lookup, parser)}
+        self.filters = filters
+
+    def rows(self, params, chunk_size=CHUNK_SIZE):
+        """Iterator of value tuples for params (a dict of filter name -> raw string)."""
+        unknown = set(params) - set(self.filters)
+        if unknown:
+            raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+        conditions = {}
+        for name, raw in params.items():
+            lookup, parse = self.filters[name]
+            conditions[lookup] = parse(raw)
+        qs = self.queryset().filter(**conditions).order_by("id")
+        return qs.values_list(*self.columns.values()).iterator(chunk_size=chunk_size)
+
+
+EXPORTS = {
+    "jobs": Export(
+        lambda: Job.objects.all(),
+        {
+            "id": "id", "title": "title", "company_name": "company_name", "location": "location",
+            "place": "place", "is_remote": "is_remote", "job_type": "job_type", "category": "category__name",
+            "is_active": "is_active", "salary_min": "salary_min", "salary_max": "salary_max",
+            "posted_date": "posted_date",
+        },
+        {
+            "job_type": ("job_type", str),
+            "category": ("category__name__iexact", str),
+            "is_active": ("is_active", _flag),
+            "remote": ("is_remote", _flag),
+            "since": ("posted_date__gte", _timestamp),
+            "until": ("posted_date__lt", _timestamp),
+        },
+    ),
+    "applications": Export(
+        lambda: Application.objects.all(),
+        {
+            "id": "id", "status": "status", "applied_at": "applied_at",
+            "user_id": "user_id", "username": "user__username", "email": "user__email",
+            "job_id": "job_id", "job_title": "job__title", "company_name": "job__company_name",
+            "job_type": "job__job_type",
+        },
+        {
+            "status": ("status", str),
+            "job": ("job_id", int),
+            "user": ("user_id", int),
+            "since": ("applied_at__gte", _timestamp),
+            "until": ("applied_at__lt", _timestamp),
+        },
+    ),
+    "activity": Export(
+        lambda: ActivityLog.objects.all(),
+        {
+            "id": "id", "created_at": "created_at", "action": "action",
+            "user_id": "user_id", "username": "user__username", "meta": "meta",
+        },
+        {
+            "action": ("action", str),
+            "user": ("user_id", int),
+            "since": ("created_at__gte", _timestamp),
+            "until": ("created_at__lt", _timestamp),
+        },
+    ),
+}
+
+
+_encoder = DjangoJSONEncoder()
+# Leading characters spreadsheets read as the start of a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value):
+    # Same text as the NDJSON output for timestamps and JSON fields
+    if isinstance(value, (dict, list)):
+        return _encoder.encode(value)
+    if isinstance(value, datetime):
+        return _encoder.default(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Quote user-supplied text such as "=HYPERLINK(...)" so it opens as text
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object whose write() hands back what csv.writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def render(export, rows, fmt, batch=CHUNK_SIZE):
+    """Yield the export as text, one batch of lines at a time (CSV starts with a header)."""
+    names = list(export.columns)
+    lines = []
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        lines.append(writer.writerow(names))
+        for row in rows:
+            lines.append(writer.writerow([_csv_value(value) for value in row]))
+            if len(lines) >= batch:
+                yield "".join(lines)
+                lines = []
+    else:
+        for row in rows:
+            lines.append(json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n")
+            if len(lines) >= batch:
+                yield "".join(lines)
+                lines = []
+    if lines:
+        yield "".join(lines)
@@ -0,0 +1,114 @@
+# accounts/interactions.py - Apply to and bookmark any number of jobs in one transaction
+#
+# Each call costs a fixed handful of queries (look up the jobs, find the
+# existing rows, bulk insert the new rows, activity and notifications)
+# however many job ids it gets. Signal side effects that bulk_create skips
+# are run once per call instead of once per row.
+
+import re
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from jobAccess import versions
+from jobAccess.models import Job
+from jobAccess.signals import interactions_changed
+
+from .models import ActivityLog, Application, Bookmark, Notification
+
+MAX_BATCH = 100
+
+
+_ID_RE = re.compile(r"-?[0-9]+")
+
+
+def _parse_id(value):
+    # int() would also take True and truncate 1.9, so only ints and digit strings pass
+    if isinstance(value, str) and _ID_RE.fullmatch(value.strip()):
+        value = int(value)
+    elif type(value) is not int:
+        raise ValueError(f"{value!r} is not an id")
+    if value <= 0:
+        raise ValueError(f"{value} is not a positive id")
+    return value
+
+
+def parse_ids(values):
+    """Distinct positive ints from a list (or comma-separated string) of ids, in order.
+
+    Raises ValueError for anything but positive ints or digit strings, or for
+    more than MAX_BATCH ids.
+    """
+    if isinstance(values, str):
+        values = [v for v in values.split(",") if v.strip()]
+    ids = list(dict.fromkeys(_parse_id(v) for v in values))
+    if len(ids) > MAX_BATCH:
+        raise ValueError(f"At most {MAX_BATCH} ids per request")
+    return ids
+
+
+def _notify(notifications):
+    Notification.objects.bulk_create(notifications)
+    versions.bump(*{versions.user_key(n.user_id, "notifications") for n in notifications})
+
+
+def _split(model, user, job_ids):
+    """(titles of the jobs that exist, ids among them the user already has a row for)."""
+    titles = dict(Job.objects.filter(id__in=job_ids).values_list("id", "title"))
+    existing = set(model.objects.filter(user=user, job_id__in=titles).values_list("job_id", flat=True))
+    return titles, existing
+
+
+def apply_to_jobs(user, job_ids):
+    """Apply user to job_ids; returns (created, existing, missing) id lists."""
+    with transaction.atomic():
+        titles, existing = _split(Application, user, job_ids)
+        created = [i for i in job_ids if i in titles and i not in existing]
+        if created:
+            Application.objects.bulk_create(
+                [Application(user=user, job_id=i) for i in created], ignore_conflicts=True
+            )
+            ActivityLog.objects.bulk_create(
+                [ActivityLog(user=user, action="apply", meta={"job_id": i}) for i in created]
+            )
+            staff_users = list(User.objects.filter(is_staff=True).exclude(id=user.id).values_list("id", flat=True))
+            _notify(
+                [Notification(user=user, message=f"Applied to {titles[i]}") for i in created]
+                + [
+                    Notification(user_id=staff, message=f"{user.username} applied to {titles[i]}")
+                    for i in created for staff in staff_users
+                ]
+            )
+            interactions_changed(Application, user.id, created)
+    return created, [i for i in job_ids if i in existing], [i for i in job_ids if i not in titles]
+
+
+def bookmark_jobs(user, job_ids):
+    """Bookmark job_ids for user; returns (created, existing, missing) id lists."""
+    with transaction.atomic():
+        titles, existing = _split(Bookmark, user, job_ids)
+        created = [i for i in job_ids if i in titles and i not in existing]
+        found = [i for i in job_ids if i in titles]
+        if created:
+            Bookmark.objects.bulk_create(
+                [Bookmark(user=user, job_id=i) for i in created], ignore_conflicts=True
+            )
+            _notify([Notification(user=user, message=f"Bookmarked {titles[i]}") for i in created])
+            interactions_changed(Bookmark, user.id, created)
+        ActivityLog.objects.bulk_create(
+            [ActivityLog(user=user, action="bookmark", meta={"job_id": i}) for i in found]
+        )
+    return created, [i for i in job_ids if i in existing], [i for i in job_ids if i not in titles]
+
+
+def unbookmark_jobs(user, job_ids):
+    """Remove user's bookmarks on job_ids; returns (removed, missing) id lists."""
+    with transaction.atomic():
+        found = set(Job.objects.filter(id__in=job_ids).values_list("id", flat=True))
+        removed = set(Bookmark.objects.filter(user=user, job_id__in=found).values_list("job_id", flat=True))
+        if removed:
+            # Deletes send their own post_delete signals
+            Bookmark.objects.filter(user=user, job_id__in=removed).delete()
+        ActivityLog.objects.bulk_create(
+            [ActivityLog(user=user, action="unbookmark", meta={"job_id": i}) for i in job_ids if i in found]
+        )
+    return [i for i in job_ids if i in removed], [i for i in job_ids if i not in found]
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from accounts.exports import CHUNK_SIZE, EXPORTS, FORMATS, render
+
+
+class Command(BaseCommand):
+    help = 'Stream jobs, applications or activity logs to a file or stdout as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS), help='What to export')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--output', default='-', help="File to write, or '-' for stdout")
+        parser.add_argument('--filter', action='append', default=[], metavar='NAME=VALUE',
+                            help='Export filter, e.g. since=2025-01-01 or status=applied (repeatable)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options['kind']]
+        params = {}
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Filters look like NAME=VALUE, got: {item}')
+            params[name] = value
+        try:
+            rows = export.rows(params, chunk_size=options['chunk_size'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        to_stdout = options['output'] == '-'
+        out = sys.stdout if to_stdout else open(options['output'], 'w', encoding='utf-8', newline='')
+        try:
+            for text in render(export, rows, options['format'], batch=options['chunk_size']):
+                out.write(text)
+        finally:
+            if not to_stdout:
+                out.close()
+        if not to_stdout:
+            self.stdout.write(self.style.SUCCESS(f"✓ Exported {options['kind']} to {options['output']}"))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from accounts.resumes import process_resumes
+
+
+class Command(BaseCommand):
+    help = 'Parse queued resume uploads and merge detected skills into profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Files parsed in parallel')
+        parser.add_argument('--timeout', type=int, default=30, help='Seconds allowed per file')
+        parser.add_argument('--memory-mb', type=int, default=512, help='Address-space limit per parser')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new uploads')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            counts = process_resumes(
+                workers=options['workers'],
+                timeout=options['timeout'],
+                memory_mb=options['memory_mb'],
+            )
+            if counts['done'] or counts['failed'] or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✓ Parsed {counts['done']} resumes ({counts['failed']} failed)"
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
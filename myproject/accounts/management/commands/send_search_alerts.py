@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from accounts.alerts import send_search_alerts
+
+
+class Command(BaseCommand):
+    help = 'Notify users about jobs posted since the last run that match their saved searches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='New jobs matched per transaction')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            scanned, sent = send_search_alerts(batch_size=options['batch_size'])
+            if scanned or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'✓ Matched {scanned} new jobs and sent {sent} alerts in {time.monotonic() - started:.2f}s'
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
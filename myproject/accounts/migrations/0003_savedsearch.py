@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_resumeparsetask'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('query', models.CharField(blank=True, max_length=255)),
+                ('job_type', models.CharField(blank=True, max_length=20)),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('remote', models.BooleanField(blank=True, null=True)),
+                ('salary_min', models.IntegerField(blank=True, null=True)),
+                ('salary_max', models.IntegerField(blank=True, null=True)),
+                ('alerts_enabled', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_alerted_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeparsetask',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
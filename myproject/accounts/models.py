@@ -59,6 +59,7 @@ class Application(models.Model):
 
     class Meta:
         unique_together = ("user", "job")
+        indexes = [models.Index(fields=["user", "applied_at", "id"], name="application_user_applied")]
 
     def __str__(self):
         return f"{self.user.username} -> {self.job.title} ({self.status})"
@@ -71,6 +72,7 @@ class Bookmark(models.Model):
 
     class Meta:
         unique_together = ("user", "job")
+        indexes = [models.Index(fields=["user", "created_at", "id"], name="bookmark_user_created")]
 
 
 class Notification(models.Model):
@@ -79,6 +81,9 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [models.Index(fields=["user", "created_at", "id"], name="notification_user_created")]
+
     def __str__(self):
         return f"Notif({self.user.username}): {self.message[:20]}"
 
@@ -90,4 +95,42 @@ class ActivityLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.created_at:%Y-%m-%d %H:%M} - {self.action}"
\ No newline at end of file
+        return f"{self.created_at:%Y-%m-%d %H:%M} - {self.action}"
+
+class ResumeParseTask(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="resume_tasks")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    detected_skills = models.JSONField(blank=True, null=True)
+    error = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when a worker takes the task; a "running" task claimed long ago lost its worker
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"ResumeParse({self.profile.user.username}): {self.status}"
+
+
+class SavedSearch(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="saved_searches")
+    name = models.CharField(max_length=100, blank=True)
+    # Same meaning as the jobs_collection filters; blank/null means "any"
+    query = models.CharField(max_length=255, blank=True)
+    job_type = models.CharField(max_length=20, blank=True)
+    category = models.CharField(max_length=100, blank=True)
+    location = models.CharField(max_length=200, blank=True)
+    remote = models.BooleanField(blank=True, null=True)
+    salary_min = models.IntegerField(blank=True, null=True)
+    salary_max = models.IntegerField(blank=True, null=True)
+    alerts_enabled = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_alerted_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"SavedSearch({self.user.username}): {self.name or self.query}"
@@ -0,0 +1,96 @@
+# accounts/resume_text.py - Best-effort text extraction from uploaded resumes
+#
+# Runs inside resource-limited child processes, so it deliberately imports
+# nothing from Django.
+
+import html
+import re
+import zipfile
+import zlib
+
+# Text returned to the parent process is capped at this many characters
+MAX_TEXT_CHARS = 200_000
+
+_DOCX_PARAGRAPH_RE = re.compile(r'</w:p>')
+_DOCX_TEXT_RE = re.compile(r'<w:t(?:\s[^>]*)?>([^<]*)</w:t>')
+_PDF_STREAM_RE = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+_PDF_TEXT_BLOCK_RE = re.compile(rb'BT(.*?)ET', re.S)
+_PDF_LITERAL_RE = re.compile(rb'\((?:\\.|[^\\()])*\)', re.S)
+_PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'', b'f': b''}
+
+
+def extract_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        xml = archive.read('word/document.xml').decode('utf-8', 'ignore')
+    paragraphs = (
+        ''.join(_DOCX_TEXT_RE.findall(chunk))
+        for chunk in _DOCX_PARAGRAPH_RE.split(xml)
+    )
+    return html.unescape('\n'.join(p for p in paragraphs if p))
+
+
+def _pdf_literal(raw):
+    out = bytearray()
+    i = 1
+    while i < len(raw) - 1:
+        ch = raw[i:i + 1]
+        if ch == b'\\' and i + 1 < len(raw) - 1:
+            nxt = raw[i + 1:i + 2]
+            out += _PDF_ESCAPES.get(nxt, nxt)
+            i += 2
+        else:
+            out += ch
+            i += 1
+    return bytes(out).decode('latin-1')
+
+
+def extract_pdf(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        PdfReader = None
+    if PdfReader is not None:
+        return '\n'.join(page.extract_text() or '' for page in PdfReader(path).pages)
+
+    # Fallback: pull literal strings out of the text blocks of each content stream
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    chunks = []
+    for stream in _PDF_STREAM_RE.findall(data):
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for block in _PDF_TEXT_BLOCK_RE.findall(stream):
+            chunks.append(' '.join(_pdf_literal(lit) for lit in _PDF_LITERAL_RE.findall(block)))
+    return '\n'.join(c for c in chunks if c.strip())
+
+
+def extract_text(path):
+    lower = str(path).lower()
+    if lower.endswith('.docx'):
+        return extract_docx(path)
+    if lower.endswith('.pdf'):
+        return extract_pdf(path)
+    with open(path, 'rb') as fh:
+        return fh.read(MAX_TEXT_CHARS * 4).decode('utf-8', 'ignore')
+
+
+def parse_resume_file(path, conn, memory_mb, cpu_seconds):
+    """Child-process entry point: send ('ok', text) or ('error', message) over conn."""
+    try:
+        import resource
+
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    except (ImportError, ValueError, OSError):
+        pass  # Not enforceable here; the parent's wall-clock timeout still applies
+    try:
+        conn.send(('ok', extract_text(path)[:MAX_TEXT_CHARS]))
+    except MemoryError:
+        conn.send(('error', f'memory limit of {memory_mb} MB exceeded'))
+    except Exception as exc:
+        conn.send(('error', f'{type(exc).__name__}: {exc}'[:200]))
+    finally:
+        conn.close()
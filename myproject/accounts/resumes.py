@@ -0,0 +1,112 @@
+# accounts/resumes.py - Background resume parsing into profile skills
+
+import multiprocessing
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from jobAccess.models import Skill
+from jobAccess.skills import get_matcher
+
+from .models import ResumeParseTask
+from .resume_text import parse_resume_file
+
+# Added to the parse timeout before a "running" task is presumed orphaned by
+# a worker that died mid-parse and handed out again
+LEASE_SLACK_SECONDS = 60
+
+
+def enqueue_resume(profile):
+    """Queue the profile's current resume for parsing by process_resumes."""
+    return ResumeParseTask.objects.create(profile=profile)
+
+
+def _requeue_expired(lease_seconds):
+    """Put back "running" tasks whose worker has held them past the lease."""
+    expired = timezone.now() - timedelta(seconds=lease_seconds)
+    return ResumeParseTask.objects.filter(
+        Q(claimed_at__lt=expired) | Q(claimed_at__isnull=True), status="running"
+    ).update(status="pending", claimed_at=None)
+
+
+def _claim(limit):
+    claimed = []
+    pending = ResumeParseTask.objects.filter(status="pending").select_related("profile").order_by("id")
+    for task in pending[:limit]:
+        # Conditional update so concurrent workers never take the same task
+        now = timezone.now()
+        if ResumeParseTask.objects.filter(id=task.id, status="pending").update(status="running", claimed_at=now):
+            task.status, task.claimed_at = "running", now
+            claimed.append(task)
+    return claimed
+
+
+def _finish(task, text=None, error=""):
+    if error:
+        task.status = "failed"
+        task.error = error[:255]
+    else:
+        skill_ids = get_matcher().find(text)
+        task.detected_skills = sorted(Skill.objects.filter(id__in=skill_ids).values_list("name", flat=True))
+        if skill_ids and getattr(settings, "RESUME_SKILL_MERGE", True):
+            task.profile.skills.add(*skill_ids)
+        task.status = "done"
+    task.finished_at = timezone.now()
+    task.save(update_fields=["status", "error", "detected_skills", "finished_at"])
+    return task.status
+
+
+def process_resumes(workers=2, timeout=30, memory_mb=512):
+    """Parse every pending resume, at most `workers` at a time.
+
+    Each file is parsed in its own child process with an address-space and CPU
+    limit, and is killed once it runs past `timeout` seconds, so a pathological
+    file only fails its own task. Tasks left "running" by a worker that died
+    are queued again once their claim is older than the timeout plus
+    LEASE_SLACK_SECONDS. Returns {"done": n, "failed": n}.
+    """
+    ctx = multiprocessing.get_context()
+    counts = {"done": 0, "failed": 0}
+    _requeue_expired(timeout + LEASE_SLACK_SECONDS)
+    active = []
+    while True:
+        claimed = _claim(workers - len(active)) if len(active) < workers else []
+        for task in claimed:
+            try:
+                path = task.profile.resume.path
+            except (ValueError, NotImplementedError) as exc:
+                counts[_finish(task, error=f"resume unavailable: {exc}")] += 1
+                continue
+            receiver, sender = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=parse_resume_file, args=(path, sender, memory_mb, timeout), daemon=True
+            )
+            process.start()
+            sender.close()
+            active.append((task, process, receiver, time.monotonic() + timeout))
+        if not active:
+            return counts
+
+        running = []
+        for task, process, receiver, deadline in active:
+            if not receiver.poll() and process.is_alive() and time.monotonic() <= deadline:
+                running.append((task, process, receiver, deadline))
+                continue
+            if receiver.poll():
+                try:
+                    status, payload = receiver.recv()
+                except EOFError:
+                    status, payload = "error", "parser exited without a result"
+                result = _finish(task, text=payload) if status == "ok" else _finish(task, error=payload)
+            elif not process.is_alive():
+                result = _finish(task, error=f"parser exited with code {process.exitcode}")
+            else:
+                process.kill()
+                result = _finish(task, error=f"timed out after {timeout}s")
+            process.join()
+            receiver.close()
+            counts[result] += 1
+        active = running
+        time.sleep(0.05)
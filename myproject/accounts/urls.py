@@ -10,13 +10,30 @@ urlpatterns = [
     path("api/jobs/", views.jobs_collection, name="jobs_collection"),
     path("api/jobs/<int:job_id>/", views.job_detail, name="job_detail"),
     path("api/stats/", views.job_stats, name="job_stats"),
+    path("api/cache-stats/", views.listing_cache_stats_view, name="listing_cache_stats"),
+    path("api/request-timings/", views.request_timings_view, name="request_timings"),
+    path("api/profiles/", views.profiles_list, name="profiles_list"),
+    path("api/profiles/<str:profile_id>/", views.profile_detail, name="profile_detail"),
+    path("api/suggest/", views.suggest_view, name="suggest"),
 
     # Applications & Bookmarks
     path("api/jobs/<int:job_id>/apply/", views.apply_to_job, name="apply_to_job"),
     path("api/jobs/<int:job_id>/bookmark/", views.bookmark_job, name="bookmark_job"),
+    path("api/jobs/apply/", views.apply_batch, name="apply_batch"),
+    path("api/jobs/bookmark/", views.bookmark_batch, name="bookmark_batch"),
     path("api/bookmarks/", views.list_bookmarks, name="list_bookmarks"),
     path("api/applications/", views.list_applications, name="list_applications"),
 
+    # Staff exports
+    path("api/exports/<str:kind>/", views.export_data, name="export_data"),
+
+    # Saved searches
+    path("api/saved-searches/", views.saved_searches, name="saved_searches"),
+    path("api/saved-searches/<int:search_id>/", views.saved_search_detail, name="saved_search_detail"),
+
+    # Recommendations
+    path("api/recommendations/", views.recommendations_list, name="recommendations_list"),
+
     # Profile
     path("api/profile/", views.profile_endpoint, name="profile_endpoint"),
     path("api/profile/picture/", views.profile_picture_upload, name="profile_picture_upload"),
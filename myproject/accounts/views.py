@@ -1,14 +1,32 @@
 # accounts/views.py
+import hmac
 import json
+import math
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login
-from django.http import JsonResponse, HttpResponseNotAllowed
+from django.core import signing
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator
 from django.db import models
 from django.db.models import Q, Count
-from jobAccess.models import Job, Skill, JobCategory
+from django.utils.dateparse import parse_datetime
+from jobAccess.models import Job, Skill, JobCategory, JobRecommendation, RecommendationDirtyMark
+from jobAccess.facets import cached_count, cached_facets
+from jobAccess.fuzzy import fuzzy_search_jobs
+from jobAccess.geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, distance_km, near as near_jobs, parse_point
+from jobAccess.listcache import cached_listing, stats as listing_cache_stats
+from jobAccess.recommendations import mark_dirty, recent_active_jobs
+from jobAccess.search import search_jobs
+from jobAccess.serializers import job_values, parse_fields, serialize_job
+from jobAccess.skills import extract_job_skills
+from jobAccess.suggest import KINDS as SUGGEST_KINDS, suggest
+from jobAccess import versions
+from jobAccess.versions import conditional
+from myproject import metrics, profiling
+from myproject.timing import JsonResponse, snapshot as request_timings
 from .models import (
     Category,
     Profile,
@@ -18,7 +36,116 @@ from .models import (
     Bookmark,
     Notification,
     ActivityLog,
+    ResumeParseTask,
+    SavedSearch,
 )
+from .exports import CONTENT_TYPES, EXPORTS, FORMATS, render as render_export
+from .interactions import apply_to_jobs, bookmark_jobs, parse_ids, unbookmark_jobs
+from .resumes import enqueue_resume
+
+# -------------------- PAGINATION --------------------
+CURSOR_SALT = "accounts.cursor"
+
+
+def encode_cursor(name, *values):
+    """Sign values as a cursor that only endpoint name's decode_cursor accepts."""
+    values = [v.isoformat() if hasattr(v, "isoformat") else v for v in values]
+    return signing.dumps(values, salt=f"{CURSOR_SALT}.{name}", compress=True)
+
+
+def decode_cursor(name, token):
+    """Return the values packed by encode_cursor(name, ...), or None if the token is invalid."""
+    try:
+        return signing.loads(token, salt=f"{CURSOR_SALT}.{name}")
+    except signing.BadSignature:
+        return None
+
+
+def _int_param(request, name):
+    try:
+        return int(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def _after(keys, values):
+    """Rows strictly after (keys, values) in descending key order."""
+    condition = Q(**{f"{keys[-1]}__lt": values[-1]})
+    for key, value in zip(reversed(keys[:-1]), reversed(values[:-1])):
+        condition = Q(**{f"{key}__lt": value}) | (Q(**{key: value}) & condition)
+    return condition
+
+
+def _cursor_values(model, keys, values):
+    """values converted to the types of model's keys fields, or None if any doesn't fit."""
+    if not isinstance(values, list) or len(values) != len(keys):
+        return None
+    parsed = []
+    for key, value in zip(keys, values):
+        field = model._meta.get_field(key)
+        if isinstance(field, models.DateTimeField):
+            try:
+                value = parse_datetime(value) if isinstance(value, str) else None
+            except ValueError:
+                value = None
+        elif isinstance(field, models.IntegerField):
+            value = value if isinstance(value, int) and not isinstance(value, bool) else None
+        else:
+            value = None
+        if value is None:
+            return None
+        parsed.append(value)
+    return parsed
+
+
+def keyset_page(request, name, qs, keys, default_limit=20, max_limit=100):
+    """One newest-first page of qs for ?cursor=&limit=, as (rows, next_cursor).
+
+    The cursor holds the last row's key values, so each page is a WHERE on an
+    index instead of an OFFSET and deep pages cost the same as the first.
+    Cursors are signed per endpoint name. Returns None for an invalid cursor.
+    """
+    limit = min(max(_int_param(request, "limit") or default_limit, 1), max_limit)
+    qs = qs.order_by(*[f"-{key}" for key in keys])
+    token = request.GET.get("cursor")
+    if token:
+        values = _cursor_values(qs.model, keys, decode_cursor(name, token))
+        if values is None:
+            return None
+        qs = qs.filter(_after(keys, values))
+    rows = list(qs[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(name, *[last[key] if isinstance(last, dict) else getattr(last, key) for key in keys])
+    return rows[:limit], next_cursor
+
+
+def _wants_total(request):
+    return request.GET.get("total") in ("1", "true")
+
+
+def _fields_param(request, **kwargs):
+    """(fields from ?fields=, None) or (None, a 400 response); fields is None when not given."""
+    try:
+        return parse_fields(request.GET.get("fields"), **kwargs), None
+    except ValueError as exc:
+        return None, JsonResponse({"error": str(exc)}, status=400)
+
+
+# -------------------- CONDITIONAL GET --------------------
+def _user_scope(name, *shared):
+    """ETag scopes for a user's own list plus any shared scopes its rows embed."""
+    def scopes(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return None
+        return [versions.user_key(request.user.id, name), *shared]
+    return scopes
+
+
+def _job_scope(request, job_id):
+    return [versions.job_key(job_id), versions.CATEGORIES]
+
 
 # -------------------- SIGNUP --------------------
 @csrf_exempt
@@ -80,9 +207,34 @@ def login_view(request):
 
 
 # -------------------- JOB APIs --------------------
+# Query params that shape a jobs_collection GET response, with their defaults
+JOBS_LIST_PARAMS = {
+    "q": "", "job_type": "", "is_active": "", "category": "", "salary_min": "", "salary_max": "",
+    "remote": "", "near": "", "radius_km": str(DEFAULT_RADIUS_KM), "page": "1", "per_page": "10",
+    "fuzzy": "", "facets": "", "cursor": None, "limit": "", "total": "", "ids": None, "fields": "",
+}
+
+
 @csrf_exempt
+@cached_listing("jobs_api", JOBS_LIST_PARAMS)
 def jobs_collection(request):
     if request.method == "GET":
+        fields, error = _fields_param(request)
+        if error:
+            return error
+        if "ids" in request.GET:
+            # Several jobs by id in one query, as job_detail would return them
+            try:
+                ids = parse_ids(request.GET["ids"])
+            except ValueError as exc:
+                return JsonResponse({"error": f"Invalid ids: {exc}"}, status=400)
+            rows = job_values(Job.objects.filter(id__in=ids), description=True, fields=fields)
+            rows = {row["id"]: row for row in rows}
+            return JsonResponse({
+                "items": [serialize_job(rows[i], description=True, fields=fields) for i in ids if i in rows],
+                "missing": [i for i in ids if i not in rows],
+            })
+
         # Filters
         q = request.GET.get("q", "").strip()
         job_type = request.GET.get("job_type")
@@ -90,12 +242,28 @@ def jobs_collection(request):
         category = request.GET.get("category")
         salary_min = request.GET.get("salary_min")
         salary_max = request.GET.get("salary_max")
+        remote = request.GET.get("remote")
+        near = request.GET.get("near", "").strip()
         page = int(request.GET.get("page", 1))
         per_page = int(request.GET.get("per_page", 10))
 
+        point = None
+        if near:
+            point = parse_point(near)
+            if point is None:
+                return JsonResponse({"error": f"Unknown place: {near}"}, status=400)
+            try:
+                radius_km = float(request.GET.get("radius_km", DEFAULT_RADIUS_KM))
+            except ValueError:
+                return JsonResponse({"error": "radius_km must be a number"}, status=400)
+            if not math.isfinite(radius_km) or radius_km <= 0:
+                return JsonResponse({"error": "radius_km must be a positive number"}, status=400)
+            if radius_km > MAX_RADIUS_KM:
+                return JsonResponse({"error": f"radius_km can be at most {MAX_RADIUS_KM:g}"}, status=400)
+
         qs = Job.objects.all()
-        if q:
-            qs = qs.filter(Q(title__icontains=q) | Q(company_name__icontains=q) | Q(location__icontains=q) | Q(description__icontains=q))
+        if remote in ("true", "false"):
+            qs = qs.filter(is_remote=(remote == "true"))
         if job_type:
             qs = qs.filter(job_type=job_type)
         if is_active in ("true", "false"):
@@ -113,31 +281,63 @@ def jobs_collection(request):
             except Exception:
                 pass
 
-        qs = qs.order_by("-posted_date")
-
-        paginator = Paginator(qs, per_page)
-        page_obj = paginator.get_page(page)
-
-        items = []
-        for job in page_obj.object_list:
-            items.append({
-                "id": job.id,
-                "title": job.title,
-                "company_name": job.company_name,
-                "location": job.location,
-                "job_type": job.job_type,
-                "category": job.category.name if job.category else None,
-                "is_active": job.is_active,
-                "posted_date": job.posted_date.strftime("%Y-%m-%d"),
-                "applications": job.applications.count(),
-            })
-
-        return JsonResponse({
-            "items": items,
-            "page": page_obj.number,
-            "pages": paginator.num_pages,
-            "total": paginator.count,
-        })
+        # Full-text match ordered by relevance; newest first without a query.
+        # Typo-tolerant matching runs on request or when nothing matches exactly.
+        search_mode = "exact"
+        if q and request.GET.get("fuzzy") in ("1", "true"):
+            qs, search_mode = fuzzy_search_jobs(qs, q), "fuzzy"
+        else:
+            exact = search_jobs(qs, q)
+            if q and not exact.exists():
+                qs, search_mode = fuzzy_search_jobs(qs, q), "fuzzy"
+            else:
+                qs = exact
+        if point:
+            # Distance ordering takes over from relevance
+            qs = near_jobs(qs, *point, radius_km)
+
+        filters = {k: request.GET.get(k) for k in (
+            "q", "job_type", "is_active", "category", "salary_min", "salary_max", "remote", "near", "radius_km",
+        )}
+        filters["search_mode"] = search_mode
+        facets = None
+        if request.GET.get("facets") in ("1", "true"):
+            facets = cached_facets(qs, filters)
+
+        if "cursor" in request.GET:
+            # Keyset mode: newest first on (posted_date, id), no COUNT unless asked
+            if q or point:
+                return JsonResponse({"error": "Cursor paging is newest-first; use page with q or near"}, status=400)
+            rows = job_values(qs, extra=("posted_date",), fields=fields)
+            result = keyset_page(request, "jobs", rows, ("posted_date", "id"), default_limit=per_page)
+            if result is None:
+                return JsonResponse({"error": "Invalid cursor"}, status=400)
+            rows, next_cursor = result
+            data = {"items": [serialize_job(row, fields=fields) for row in rows], "next_cursor": next_cursor}
+            if _wants_total(request):
+                data["total"] = cached_count(qs, filters)
+                data["total_is_approximate"] = True
+        else:
+            paginator = Paginator(job_values(qs, extra=("distance_sq",) if point else (), fields=fields), per_page)
+            page_obj = paginator.get_page(page)
+
+            items = []
+            for row in page_obj.object_list:
+                items.append(serialize_job(row, fields=fields))
+                if point:
+                    items[-1]["distance_km"] = distance_km(row["distance_sq"])
+
+            data = {
+                "items": items,
+                "page": page_obj.number,
+                "pages": paginator.num_pages,
+                "total": paginator.count,
+            }
+        if q:
+            data["search_mode"] = search_mode
+        if facets is not None:
+            data["facets"] = facets
+        return JsonResponse(data)
 
     elif request.method == "POST":
         if not request.user.is_authenticated or not request.user.is_staff:
@@ -161,34 +361,30 @@ def jobs_collection(request):
             is_active=bool(data.get("is_active", True)),
             category=cat,
         )
+        extract_job_skills(job)
         return JsonResponse({"success": True, "id": job.id})
 
     return HttpResponseNotAllowed(["GET", "POST"])
 
 
 @csrf_exempt
+@conditional(_job_scope)
 def job_detail(request, job_id):
+    if request.method == "GET":
+        fields, error = _fields_param(request)
+        if error:
+            return error
+        row = job_values(Job.objects.filter(id=job_id), description=True, fields=fields).first()
+        if row is None:
+            return JsonResponse({"error": "Not found"}, status=404)
+        return JsonResponse(serialize_job(row, description=True, fields=fields))
+
     try:
         job = Job.objects.get(id=job_id)
     except Job.DoesNotExist:
         return JsonResponse({"error": "Not found"}, status=404)
 
-    if request.method == "GET":
-        return JsonResponse({
-            "id": job.id,
-            "title": job.title,
-            "company_name": job.company_name,
-            "location": job.location,
-            "job_type": job.job_type,
-            "description": job.description,
-            "salary_min": str(job.salary_min) if job.salary_min is not None else None,
-            "salary_max": str(job.salary_max) if job.salary_max is not None else None,
-            "is_active": job.is_active,
-            "posted_date": job.posted_date.strftime("%Y-%m-%d"),
-            "category": job.category.name if job.category else None,
-            "applications": job.applications.count(),
-        })
-    elif request.method in ("PUT", "PATCH"):
+    if request.method in ("PUT", "PATCH"):
         if not request.user.is_authenticated or not request.user.is_staff:
             return JsonResponse({"error": "Staff permission required"}, status=403)
         data = json.loads(request.body or "{}")
@@ -213,6 +409,8 @@ def job_detail(request, job_id):
                 else:
                     job.category, _ = JobCategory.objects.get_or_create(name=str(cat_val).strip())
         job.save()
+        if "title" in data or "description" in data:
+            extract_job_skills(job)
         return JsonResponse({"success": True})
     elif request.method == "DELETE":
         if not request.user.is_authenticated or not request.user.is_staff:
@@ -222,6 +420,97 @@ def job_detail(request, job_id):
 
     return HttpResponseNotAllowed(["GET", "PUT", "PATCH", "DELETE"])
 
+@csrf_exempt
+def listing_cache_stats_view(request):
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff permission required"}, status=403)
+    return JsonResponse(listing_cache_stats())
+
+
+@csrf_exempt
+def request_timings_view(request):
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff permission required"}, status=403)
+    return JsonResponse(request_timings())
+
+
+def _metrics_authorized(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    # Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>" instead
+    token = getattr(settings, "METRICS_TOKEN", "")
+    header = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+
+
+def _metrics_gauges(totals):
+    """Gauges read at scrape time: cache hit ratio and background queue depths."""
+    lookups = {dict(labels)["result"]: value for (name, labels), value in totals.items()
+               if name == "listing_cache_requests_total"}
+    served = lookups.get("hits", 0) + lookups.get("stale", 0)
+    total = served + lookups.get("misses", 0)
+    resume_tasks = dict(
+        ResumeParseTask.objects.filter(status__in=["pending", "running"])
+        .values_list("status").annotate(n=Count("id"))
+    )
+    dirty_marks = dict(RecommendationDirtyMark.objects.values_list("kind").annotate(n=Count("id")))
+    return [
+        ("listing_cache_hit_ratio", "gauge", "Share of listing lookups served from cache (fresh or stale)",
+         [({}, served / total if total else 0)]),
+        ("resume_parse_queue_depth", "gauge", "Resume parse tasks waiting or in progress",
+         [({"status": status}, resume_tasks.get(status, 0)) for status in ("pending", "running")]),
+        ("recommendation_dirty_marks", "gauge", "Jobs and users waiting for refresh_recommendations",
+         [({"kind": kind}, dirty_marks.get(kind, 0)) for kind in ("job", "user")]),
+    ]
+
+
+@csrf_exempt
+def metrics_view(request):
+    if not _metrics_authorized(request):
+        return JsonResponse({"error": "Staff permission required"}, status=403)
+    totals = metrics.collect()
+    return HttpResponse(metrics.render(totals, _metrics_gauges(totals)),
+                        content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Sortable columns of stored ?_profile= tables
+PROFILE_SORTS = {
+    "cpu": ("cumtime_ms", "tottime_ms", "ncalls"),
+    "mem": ("size_kb", "count"),
+}
+
+
+@csrf_exempt
+def profiles_list(request):
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff permission required"}, status=403)
+    return JsonResponse({"profiles": profiling.list_profiles()})
+
+
+@csrf_exempt
+def profile_detail(request, profile_id):
+    """A stored profile as a table (?sort=, ?limit=), or its ?format=collapsed / prof file."""
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff permission required"}, status=403)
+    fmt = request.GET.get("format")
+    if fmt:
+        path = profiling.artifact_path(profile_id, fmt)
+        if path is None:
+            return JsonResponse({"error": "Profile file not found"}, status=404)
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=f"{profile_id}.{fmt}")
+
+    summary = profiling.load(profile_id)
+    if summary is None:
+        return JsonResponse({"error": "Profile not found"}, status=404)
+    sorts = PROFILE_SORTS[summary["kind"]]
+    sort = request.GET.get("sort", sorts[0])
+    if sort not in sorts:
+        return JsonResponse({"error": f"sort must be one of: {', '.join(sorts)}"}, status=400)
+    limit = min(max(_int_param(request, "limit") or 50, 1), profiling.TOP)
+    summary["rows"] = sorted(summary["rows"], key=lambda row: row[sort], reverse=True)[:limit]
+    return JsonResponse(summary)
+
+
 @csrf_exempt
 def job_stats(request):
     try:
@@ -250,6 +539,20 @@ def job_stats(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+# -------------------- SUGGEST --------------------
+def suggest_view(request):
+    """Autocomplete for the search boxes, served from the in-memory prefix index."""
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    prefix = request.GET.get("prefix", "")
+    kinds = tuple(k for k in request.GET.get("types", "").split(",") if k in SUGGEST_KINDS) or None
+    try:
+        limit = max(int(request.GET.get("limit", 8)), 1)
+    except ValueError:
+        limit = 8
+    return JsonResponse({"prefix": prefix, "suggestions": suggest(prefix, limit, kinds)})
+
+
 # -------------------- APPLICATIONS & BOOKMARKS --------------------
 @csrf_exempt
 def apply_to_job(request, job_id):
@@ -258,26 +561,11 @@ def apply_to_job(request, job_id):
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Authentication required"}, status=401)
     try:
-        job = Job.objects.get(id=job_id)
-    except Job.DoesNotExist:
-        return JsonResponse({"error": "Not found"}, status=404)
-
-    try:
-        application, created = Application.objects.get_or_create(user=request.user, job=job)
+        created, existing, missing = apply_to_jobs(request.user, [job_id])
     except Exception as exc:
         return JsonResponse({"error": str(exc)}, status=500)
-
-    if created:
-        ActivityLog.objects.create(user=request.user, action="apply", meta={"job_id": job.id})
-        Notification.objects.create(user=request.user, message=f"Applied to {job.title}")
-
-        staff_users = User.objects.filter(is_staff=True).exclude(id=request.user.id)
-        staff_notifications = [
-            Notification(user=staff, message=f"{request.user.username} applied to {job.title}")
-            for staff in staff_users
-        ]
-        if staff_notifications:
-            Notification.objects.bulk_create(staff_notifications)
+    if missing:
+        return JsonResponse({"error": "Not found"}, status=404)
 
     return JsonResponse({
         "success": True,
@@ -290,56 +578,336 @@ def apply_to_job(request, job_id):
 def bookmark_job(request, job_id):
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Authentication required"}, status=401)
-    try:
-        job = Job.objects.get(id=job_id)
-    except Job.DoesNotExist:
-        return JsonResponse({"error": "Not found"}, status=404)
 
     if request.method == "POST":
-        bookmark, created = Bookmark.objects.get_or_create(user=request.user, job=job)
-        ActivityLog.objects.create(user=request.user, action="bookmark", meta={"job_id": job.id})
-        if created:
-            Notification.objects.create(user=request.user, message=f"Bookmarked {job.title}")
-        return JsonResponse({"success": True})
+        created, existing, missing = bookmark_jobs(request.user, [job_id])
     elif request.method == "DELETE":
-        Bookmark.objects.filter(user=request.user, job=job).delete()
-        ActivityLog.objects.create(user=request.user, action="unbookmark", meta={"job_id": job.id})
-        return JsonResponse({"success": True})
-    return HttpResponseNotAllowed(["POST", "DELETE"])
+        removed, missing = unbookmark_jobs(request.user, [job_id])
+    else:
+        return HttpResponseNotAllowed(["POST", "DELETE"])
+    if missing:
+        return JsonResponse({"error": "Not found"}, status=404)
+    return JsonResponse({"success": True})
+
+
+def _batch_ids(request):
+    """Job ids from a JSON body {"ids": [...]}, or a 400 response."""
+    try:
+        data = json.loads(request.body or "{}")
+        return parse_ids(data.get("ids") or []), None
+    except (ValueError, TypeError, AttributeError) as exc:
+        return None, JsonResponse({"error": f"Invalid ids: {exc}"}, status=400)
+
+
+@csrf_exempt
+def apply_batch(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+    ids, error = _batch_ids(request)
+    if error:
+        return error
+    created, existing, missing = apply_to_jobs(request.user, ids)
+    return JsonResponse({"success": True, "applied": created, "already_applied": existing, "missing": missing})
+
+
+@csrf_exempt
+def bookmark_batch(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+    if request.method not in ("POST", "DELETE"):
+        return HttpResponseNotAllowed(["POST", "DELETE"])
+    ids, error = _batch_ids(request)
+    if error:
+        return error
+    if request.method == "POST":
+        created, existing, missing = bookmark_jobs(request.user, ids)
+        return JsonResponse({"success": True, "bookmarked": created, "already_bookmarked": existing, "missing": missing})
+    removed, missing = unbookmark_jobs(request.user, ids)
+    return JsonResponse({"success": True, "removed": removed, "missing": missing})
 
 
 @csrf_exempt
+@conditional(_user_scope("bookmarks", versions.JOBS))
 def list_bookmarks(request):
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Authentication required"}, status=401)
-    data = [
-        {
-            "id": b.job.id,
-            "title": b.job.title,
-            "company_name": b.job.company_name,
-            "location": b.job.location,
-            "job_type": b.job.job_type,
-        }
-        for b in Bookmark.objects.select_related("job").filter(user=request.user)
-    ]
-    return JsonResponse({"items": data})
+    fields, error = _fields_param(request)
+    if error:
+        return error
+    bookmarks = Bookmark.objects.filter(user=request.user)
+    rows = job_values(bookmarks, prefix="job__", extra=("created_at", "id"), fields=fields)
+    if "cursor" not in request.GET:
+        data = [serialize_job(row, prefix="job__", fields=fields) for row in rows.order_by("id")]
+        return JsonResponse({"items": data})
+    result = keyset_page(request, "bookmarks", rows, ("created_at", "id"))
+    if result is None:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+    rows, next_cursor = result
+    data = {"items": [serialize_job(row, prefix="job__", fields=fields) for row in rows], "next_cursor": next_cursor}
+    if _wants_total(request):
+        data["total"] = bookmarks.count()
+    return JsonResponse(data)
 
 
 @csrf_exempt
+@conditional(_user_scope("applications", versions.JOBS))
 def list_applications(request):
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Authentication required"}, status=401)
+    fields, error = _fields_param(request)
+    if error:
+        return error
+    applications = Application.objects.filter(user=request.user)
+    rows = job_values(applications, prefix="job__", extra=("status", "applied_at", "id"), fields=fields)
+    next_cursor = None
+    if "cursor" in request.GET:
+        result = keyset_page(request, "applications", rows, ("applied_at", "id"))
+        if result is None:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+        rows, next_cursor = result
+    else:
+        rows = rows.order_by("-applied_at")
     data = [
-        {
-            "id": a.job.id,
-            "title": a.job.title,
-            "company_name": a.job.company_name,
-            "status": a.status,
-            "applied_at": a.applied_at.strftime("%Y-%m-%d"),
-        }
-        for a in Application.objects.select_related("job").filter(user=request.user).order_by("-applied_at")
+        {**serialize_job(row, prefix="job__", fields=fields), "status": row["status"], "applied_at": row["applied_at"].strftime("%Y-%m-%d")}
+        for row in rows
     ]
-    return JsonResponse({"items": data})
+    if "cursor" not in request.GET:
+        return JsonResponse({"items": data})
+    data = {"items": data, "next_cursor": next_cursor}
+    if _wants_total(request):
+        data["total"] = applications.count()
+    return JsonResponse(data)
+
+
+# -------------------- EXPORTS --------------------
+def export_data(request, kind):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff permission required"}, status=403)
+    export = EXPORTS.get(kind)
+    if export is None:
+        return JsonResponse({"error": f"Unknown export: {kind}"}, status=404)
+    params = request.GET.dict()
+    fmt = params.pop("format", "ndjson")
+    if fmt not in FORMATS:
+        return JsonResponse({"error": f"format must be one of {', '.join(FORMATS)}"}, status=400)
+    try:
+        rows = export.rows(params)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    response = StreamingHttpResponse(render_export(export, rows, fmt), content_type=CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{kind}.{fmt}"'
+    return response
+
+
+# -------------------- SAVED SEARCHES --------------------
+def _serialize_saved_search(s):
+    return {
+        "id": s.id,
+        "name": s.name,
+        "query": s.query,
+        "job_type": s.job_type,
+        "category": s.category,
+        "location": s.location,
+        "remote": s.remote,
+        "salary_min": s.salary_min,
+        "salary_max": s.salary_max,
+        "alerts_enabled": s.alerts_enabled,
+        "created_at": s.created_at.strftime("%Y-%m-%d %H:%M"),
+        "last_alerted_at": s.last_alerted_at.strftime("%Y-%m-%d %H:%M") if s.last_alerted_at else None,
+    }
+
+
+# Text fields a saved search accepts, with their column lengths
+SAVED_SEARCH_TEXT = {"name": 100, "query": 255, "job_type": 20, "category": 100, "location": 200}
+
+
+def _flag(value, name, optional=False):
+    if optional and value in (None, ""):
+        return None
+    if value in (True, "true", "1"):
+        return True
+    if value in (False, "false", "0"):
+        return False
+    raise ValueError(f"{name} must be true or false")
+
+
+def _optional_int(value, name):
+    if value in (None, ""):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def _saved_search_fields(body, partial=False):
+    """SavedSearch field values from a request body; partial (PATCH) keeps only the keys sent.
+
+    Raises ValueError for malformed JSON or values.
+    """
+    data = json.loads(body or "{}")
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    values = {}
+    for field, length in SAVED_SEARCH_TEXT.items():
+        if field in data or not partial:
+            values[field] = str(data.get(field) or "").strip()[:length]
+    for field in ("salary_min", "salary_max"):
+        if field in data or not partial:
+            values[field] = _optional_int(data.get(field), field)
+    if "remote" in data or not partial:
+        values["remote"] = _flag(data.get("remote"), "remote", optional=True)
+    if "alerts_enabled" in data or not partial:
+        values["alerts_enabled"] = _flag(data.get("alerts_enabled", True), "alerts_enabled")
+    return values
+
+
+@csrf_exempt
+def saved_searches(request):
+    """List or create the current user's saved searches; new matching jobs raise notifications."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+    if request.method == "GET":
+        items = [_serialize_saved_search(s) for s in request.user.saved_searches.order_by("-created_at")]
+        return JsonResponse({"items": items})
+    elif request.method == "POST":
+        try:
+            values = _saved_search_fields(request.body)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        search = SavedSearch.objects.create(user=request.user, **values)
+        return JsonResponse({"success": True, "id": search.id})
+    return HttpResponseNotAllowed(["GET", "POST"])
+
+
+@csrf_exempt
+def saved_search_detail(request, search_id):
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+    search = SavedSearch.objects.filter(id=search_id, user=request.user).first()
+    if search is None:
+        return JsonResponse({"error": "Not found"}, status=404)
+    if request.method == "GET":
+        return JsonResponse(_serialize_saved_search(search))
+    elif request.method in ("PUT", "PATCH"):
+        try:
+            values = _saved_search_fields(request.body, partial=request.method == "PATCH")
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        for field, value in values.items():
+            setattr(search, field, value)
+        search.save()
+        return JsonResponse({"success": True})
+    elif request.method == "DELETE":
+        search.delete()
+        return JsonResponse({"success": True})
+    return HttpResponseNotAllowed(["GET", "PUT", "PATCH", "DELETE"])
+
+
+# -------------------- RECOMMENDATIONS --------------------
+RECOMMENDATION_FIELDS = ("id", "title", "company_name", "location", "job_type", "salary_min", "salary_max", "posted_date", "score")
+
+
+def _serialize_recommendation(job, score, fields=RECOMMENDATION_FIELDS):
+    data = {name: job[name] for name in fields if name not in ("posted_date", "score")}
+    if "posted_date" in fields:
+        data["posted_date"] = job["posted_date"].strftime("%Y-%m-%d")
+    if "score" in fields:
+        data["score"] = score
+    return data
+
+
+def _matches_filters(job, job_type, location, salary_min, salary_max):
+    if job_type and job["job_type"] != job_type:
+        return False
+    if location and location.lower() not in job["location"].lower():
+        return False
+    if salary_min is not None and (job["salary_min"] is None or job["salary_min"] < salary_min):
+        return False
+    if salary_max is not None and (job["salary_max"] is None or job["salary_max"] > salary_max):
+        return False
+    return True
+
+
+@csrf_exempt
+def recommendations_list(request):
+    """Top recommendations for the current user, keyset-paged by (score, job id)."""
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    job_type = request.GET.get("job_type")
+    location = request.GET.get("location", "").strip()
+    salary_min = _int_param(request, "salary_min")
+    salary_max = _int_param(request, "salary_max")
+    limit = min(max(_int_param(request, "limit") or 10, 1), 50)
+    fields, error = _fields_param(request, allowed=RECOMMENDATION_FIELDS)
+    if error:
+        return error
+    fields = fields or RECOMMENDATION_FIELDS
+    # The keyset needs the job id whatever is returned
+    columns = {"id", *fields} - {"score"}
+    cursor = None
+    if request.GET.get("cursor"):
+        cursor = decode_cursor("recommendations", request.GET["cursor"])
+        # [score, job id]
+        if not (
+            isinstance(cursor, list) and len(cursor) == 2
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in cursor)
+            and isinstance(cursor[1], int)
+        ):
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+
+    def page():
+        qs = JobRecommendation.objects.filter(user=request.user, job__is_active=True)
+        if job_type:
+            qs = qs.filter(job__job_type=job_type)
+        if location:
+            qs = qs.filter(job__location__icontains=location)
+        if salary_min is not None:
+            qs = qs.filter(job__salary_min__gte=salary_min)
+        if salary_max is not None:
+            qs = qs.filter(job__salary_max__lte=salary_max)
+        if cursor:
+            score, job_id = cursor
+            qs = qs.filter(Q(relevance_score__lt=score) | Q(relevance_score=score, job_id__lt=job_id))
+        rows = qs.order_by("-relevance_score", "-job_id").values(
+            "relevance_score", *[f"job__{name}" for name in sorted(columns)]
+        )[:limit + 1]
+        return [
+            ({key[5:]: value for key, value in row.items() if key.startswith("job__")}, row["relevance_score"])
+            for row in rows
+        ]
+
+    results = page()
+    source = "precomputed"
+    if not results and cursor is None and not JobRecommendation.objects.filter(user=request.user).exists():
+        # Nothing precomputed yet: queue the user for refresh_recommendations
+        # and serve the cached fallback below meanwhile
+        mark_dirty("user", [request.user.id])
+    if not results and (cursor is None or cursor[0] == 0):
+        # Cold start: newest active jobs from the shared cache, score 0
+        source = "recent"
+        after_id = cursor[1] if cursor else None
+        results = [
+            (job, 0.0) for job in recent_active_jobs()
+            if (after_id is None or job["id"] < after_id)
+            and _matches_filters(job, job_type, location, salary_min, salary_max)
+        ][:limit + 1]
+
+    items = [_serialize_recommendation(job, score, fields) for job, score in results[:limit]]
+    next_cursor = None
+    if len(results) > limit:
+        last_job, last_score = results[limit - 1]
+        next_cursor = encode_cursor("recommendations", last_score, last_job["id"])
+    return JsonResponse({"items": items, "next_cursor": next_cursor, "source": source})
 
 
 # -------------------- PROFILE --------------------
@@ -355,10 +923,15 @@ def profile_endpoint(request):
     profile = ensure_profile(request.user)
 
     if request.method == "GET":
+        parse = ResumeParseTask.objects.filter(profile=profile).order_by("-id").first()
         return JsonResponse({
             "user": request.user.username,
             "bio": profile.bio or "",
             "resume": profile.resume.url if profile.resume else None,
+            "resume_parse": {
+                "status": parse.status,
+                "skills": parse.detected_skills or [],
+            } if parse else None,
             "skills": [s.name for s in profile.skills.all()],
             "education": [
                 {"institution": e.institution, "degree": e.degree, "start_year": e.start_year, "end_year": e.end_year}
@@ -401,7 +974,8 @@ def profile_resume_upload(request):
     profile.resume = f
     profile.save()
     ActivityLog.objects.create(user=request.user, action="resume_upload")
-    return JsonResponse({"success": True, "url": profile.resume.url})
+    task = enqueue_resume(profile)
+    return JsonResponse({"success": True, "url": profile.resume.url, "parse_task": task.id})
 
 
 @csrf_exempt
@@ -422,19 +996,33 @@ def profile_picture_upload(request):
 
 # -------------------- NOTIFICATIONS --------------------
 @csrf_exempt
+@conditional(_user_scope("notifications"))
 def notifications_list(request):
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Authentication required"}, status=401)
+    notifications = Notification.objects.filter(user=request.user)
+    rows = notifications.values("id", "message", "created_at", "read")
+    next_cursor = None
+    if "cursor" in request.GET:
+        result = keyset_page(request, "notifications", rows, ("created_at", "id"), default_limit=50, max_limit=200)
+        if result is None:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+        rows, next_cursor = result
+    else:
+        rows = rows.order_by("-created_at", "-id")
     items = [
         {
-            "id": n.id, 
-            "message": n.message, 
-            "created_at": n.created_at.isoformat(), 
-            "read": n.read
+            "id": n["id"],
+            "message": n["message"],
+            "created_at": n["created_at"].isoformat(),
+            "read": n["read"]
         }
-        for n in Notification.objects.filter(user=request.user).order_by("-created_at")
+        for n in rows
     ]
-    return JsonResponse({"items": items})
+    data = {"items": items, "unread": notifications.filter(read=False).count()}
+    if "cursor" in request.GET:
+        data["next_cursor"] = next_cursor
+    return JsonResponse(data)
 
 
 @csrf_exempt
@@ -443,7 +1031,8 @@ def notifications_mark_read(request, notif_id):
         return HttpResponseNotAllowed(["POST"])
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Authentication required"}, status=401)
-    Notification.objects.filter(id=notif_id, user=request.user).update(read=True)
+    if Notification.objects.filter(id=notif_id, user=request.user).update(read=True):
+        versions.bump(versions.user_key(request.user.id, "notifications"))
     return JsonResponse({"success": True})
 
 
@@ -456,7 +1045,8 @@ def notifications_mark_read_bulk(request):
     try:
         data = json.loads(request.body)
         ids = data.get("ids", [])
-        Notification.objects.filter(id__in=ids, user=request.user).update(read=True)
+        if Notification.objects.filter(id__in=ids, user=request.user).update(read=True):
+            versions.bump(versions.user_key(request.user.id, "notifications"))
         return JsonResponse({"success": True})
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
@@ -0,0 +1,189 @@
+# jobAccess/collaborative.py - Item-to-item collaborative filtering
+#
+# "Users who applied to X also applied to Y": JobCooccurrence counts how many
+# users interacted with each pair of jobs, where an interaction is an
+# Application or a Bookmark. Counts are folded in incrementally from rows
+# newer than the stored InteractionWatermark, so a run only reads the history
+# of users who have new interactions.
+
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import InteractionWatermark, JobCooccurrence
+from .recommendations import CHUNK_SIZE, id_batches, select_top
+
+# Strongest neighbours kept per job when scoring
+MAX_NEIGHBOURS = 50
+
+
+def _sources():
+    from accounts.models import Application, Bookmark
+
+    return {'application': Application, 'bookmark': Bookmark}
+
+
+def _apply_deltas(deltas):
+    """Add a Counter of (job_id, other_id) -> n into JobCooccurrence."""
+    for batch in id_batches(deltas, size=200):
+        jobs = {job_id for job_id, _ in batch}
+        others = {other_id for _, other_id in batch}
+        current = {
+            (job_id, other_id): count
+            for job_id, other_id, count in JobCooccurrence.objects
+            .filter(job_id__in=jobs, other_id__in=others)
+            .values_list('job_id', 'other_id', 'count')
+        }
+        JobCooccurrence.objects.bulk_create(
+            [
+                JobCooccurrence(job_id=job_id, other_id=other_id,
+                                count=current.get((job_id, other_id), 0) + deltas[job_id, other_id])
+                for job_id, other_id in batch
+            ],
+            update_conflicts=True,
+            unique_fields=['job', 'other'],
+            update_fields=['count'],
+        )
+
+
+def update_cooccurrence(full=False):
+    """Fold Application/Bookmark rows added since the last run into JobCooccurrence.
+
+    Removed applications or bookmarks are not subtracted, and a row whose id
+    was assigned before the last run's upper bound but committed after it is
+    skipped for good; a periodic full=True run (e.g. nightly) recounts from
+    scratch and picks both up. Returns the number of new interactions processed.
+    """
+    sources = _sources()
+    with transaction.atomic():
+        if full:
+            JobCooccurrence.objects.all().delete()
+            # Only this model's sources; other jobs (search alerts) keep their rows
+            InteractionWatermark.objects.filter(source__in=sources).delete()
+        for source in sources:
+            InteractionWatermark.objects.get_or_create(source=source)
+        # Held until commit so overlapping runs can't fold the same rows in twice
+        watermarks = {
+            watermark.source: watermark
+            for watermark in InteractionWatermark.objects.select_for_update().filter(source__in=sources)
+        }
+        # Pin the upper bound so rows inserted mid-run wait for the next one
+        upper = {
+            source: model.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            for source, model in sources.items()
+        }
+
+        new_items = defaultdict(set)
+        processed = 0
+        for source, model in sources.items():
+            rows = (
+                model.objects
+                .filter(id__gt=watermarks[source].last_id, id__lte=upper[source])
+                .values_list('user_id', 'job_id')
+            )
+            for user_id, job_id in rows.iterator(chunk_size=CHUNK_SIZE):
+                new_items[user_id].add(job_id)
+                processed += 1
+
+        for batch in id_batches(new_items):
+            old_items = defaultdict(set)
+            for source, model in sources.items():
+                rows = (
+                    model.objects
+                    .filter(user_id__in=batch, id__lte=watermarks[source].last_id)
+                    .values_list('user_id', 'job_id')
+                )
+                for user_id, job_id in rows:
+                    old_items[user_id].add(job_id)
+
+            deltas = Counter()
+            for user_id in batch:
+                old = old_items[user_id]
+                new = sorted(new_items[user_id] - old)
+                for i, job_id in enumerate(new):
+                    deltas[job_id, job_id] += 1
+                    for other_id in list(old) + new[i + 1:]:
+                        deltas[job_id, other_id] += 1
+                        deltas[other_id, job_id] += 1
+            _apply_deltas(deltas)
+
+        for source, watermark in watermarks.items():
+            watermark.last_id = max(watermark.last_id, upper[source])
+            watermark.save(update_fields=['last_id'])
+    return processed
+
+
+def load_histories(user_ids=None):
+    """Map user id -> set of job ids applied to or bookmarked."""
+    histories = defaultdict(set)
+    for model in _sources().values():
+        rows = model.objects.values_list('user_id', 'job_id')
+        if user_ids is not None:
+            rows = rows.filter(user_id__in=user_ids)
+        for user_id, job_id in rows.iterator(chunk_size=CHUNK_SIZE):
+            histories[user_id].add(job_id)
+    return histories
+
+
+def load_neighbours(job_ids, max_neighbours=MAX_NEIGHBOURS):
+    """Map job id -> [(active neighbour id, cosine similarity)], strongest first."""
+    pairs = defaultdict(list)
+    for batch in id_batches(job_ids):
+        rows = (
+            JobCooccurrence.objects
+            .filter(job_id__in=batch, other__is_active=True)
+            .exclude(other_id=F('job_id'))
+            .values_list('job_id', 'other_id', 'count')
+        )
+        for job_id, other_id, count in rows.iterator(chunk_size=CHUNK_SIZE):
+            pairs[job_id].append((other_id, count))
+
+    involved = set(pairs).union(*({o for o, _ in n} for n in pairs.values()))
+    popularity = {}
+    for batch in id_batches(involved):
+        popularity.update(
+            JobCooccurrence.objects
+            .filter(job_id__in=batch, other_id=F('job_id'))
+            .values_list('job_id', 'count')
+        )
+
+    neighbours = {}
+    for job_id, others in pairs.items():
+        scored = (
+            (other_id, count / math.sqrt(popularity[job_id] * popularity[other_id]))
+            for other_id, count in others
+            if popularity.get(job_id) and popularity.get(other_id)
+        )
+        neighbours[job_id] = heapq.nlargest(max_neighbours, scored, key=lambda item: item[1])
+    return neighbours
+
+
+def score_collaborative(user_ids=None, top_k=20):
+    """Top-k (job_id, score) per user from their history's neighbours.
+
+    Scores are scaled so each user's best candidate is 1.0, which keeps them
+    comparable with the skill and content scores they are blended with.
+    """
+    histories = load_histories(user_ids)
+    neighbours = {}
+    results = {}
+    for batch in id_batches(histories):
+        missing = set().union(*(histories[u] for u in batch)) - neighbours.keys()
+        neighbours.update(dict.fromkeys(missing, ()))
+        neighbours.update(load_neighbours(missing))
+        for user_id in batch:
+            seen = histories[user_id]
+            scores = defaultdict(float)
+            for job_id in seen:
+                for other_id, similarity in neighbours[job_id]:
+                    if other_id not in seen:
+                        scores[other_id] += similarity
+            if scores:
+                best = max(scores.values())
+                results[user_id] = select_top(
+                    {job_id: score / best for job_id, score in scores.items()}, top_k
+                )
+    return results
@@ -0,0 +1,242 @@
+# jobAccess/content.py - TF-IDF content matching between profiles and jobs
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from array import array
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from .models import Job
+
+# Whole words only, keeping tech names such as c++, c# and node.js intact
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that "
+    "the their this to we will with you your".split()
+)
+
+# Terms found in more than this share of jobs carry no signal and are dropped,
+# once the corpus is large enough for document frequencies to mean something
+MAX_DF = 0.5
+MAX_DF_MIN_DOCS = 100
+
+INDEX_MAGIC = b'JRTFIDF1'
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOP_WORDS]
+
+
+class TfidfIndex:
+    """Sparse job x term TF-IDF matrix stored term-major (CSC).
+
+    Job rows are L2-normalised, so the dot product with a normalised query
+    vector is their cosine similarity. Scoring a query walks only the postings
+    of its own terms, which is the sparse matrix-vector product X @ q.
+    """
+
+    def __init__(self, terms, idf, indptr, rows, weights, job_ids):
+        self.terms = terms
+        self.vocabulary = {term: col for col, term in enumerate(terms)}
+        self.idf = idf          # array('f'), one per term
+        self.indptr = indptr    # array('q'), postings of term c are [indptr[c], indptr[c+1])
+        self.rows = rows        # array('i'), job row of each posting
+        self.weights = weights  # array('f'), tf-idf weight of each posting
+        self.job_ids = job_ids  # array('q'), Job.id of each row
+
+    @classmethod
+    def build(cls, documents):
+        """Build from an iterable of (job_id, text) pairs."""
+        vocabulary = {}
+        df = array('i')
+        job_ids = array('q')
+        doc_ptr = array('q', [0])
+        doc_terms = array('i')
+        doc_tfs = array('f')
+        for job_id, text in documents:
+            job_ids.append(job_id)
+            for term, count in Counter(tokenize(text)).items():
+                col = vocabulary.get(term)
+                if col is None:
+                    col = vocabulary[term] = len(df)
+                    df.append(0)
+                df[col] += 1
+                doc_terms.append(col)
+                doc_tfs.append(1.0 + math.log(count))
+            doc_ptr.append(len(doc_terms))
+
+        n_docs = len(job_ids)
+        max_df = int(MAX_DF * n_docs) if n_docs >= MAX_DF_MIN_DOCS else n_docs
+        # Renumber surviving terms densely; dropped terms map to -1
+        remap = array('i', [-1]) * len(df)
+        terms = []
+        for term, col in vocabulary.items():
+            if df[col] <= max_df:
+                remap[col] = len(terms)
+                terms.append(term)
+        idf = array('f', [0.0]) * len(terms)
+        for term in terms:
+            idf[remap[vocabulary[term]]] = math.log((1 + n_docs) / (1 + df[vocabulary[term]])) + 1.0
+
+        # Weight and L2-normalise each job row, counting postings per term
+        indptr = array('q', [0]) * (len(terms) + 1)
+        for row in range(n_docs):
+            start, end = doc_ptr[row], doc_ptr[row + 1]
+            norm = 0.0
+            for i in range(start, end):
+                col = remap[doc_terms[i]]
+                doc_terms[i] = col
+                if col < 0:
+                    continue
+                weight = doc_tfs[i] * idf[col]
+                doc_tfs[i] = weight
+                norm += weight * weight
+                indptr[col + 1] += 1
+            norm = math.sqrt(norm) or 1.0
+            for i in range(start, end):
+                doc_tfs[i] /= norm
+        for col in range(len(terms)):
+            indptr[col + 1] += indptr[col]
+
+        # Transpose into term-major postings
+        fill = array('q', indptr[:-1])
+        rows = array('i', [0]) * indptr[-1]
+        weights = array('f', [0.0]) * indptr[-1]
+        for row in range(n_docs):
+            for i in range(doc_ptr[row], doc_ptr[row + 1]):
+                col = doc_terms[i]
+                if col < 0:
+                    continue
+                pos = fill[col]
+                rows[pos] = row
+                weights[pos] = doc_tfs[i]
+                fill[col] = pos + 1
+        return cls(terms, idf, indptr, rows, weights, job_ids)
+
+    def vectorize(self, text):
+        """Normalised tf-idf query vector as {column: weight}."""
+        counts = Counter(t for t in tokenize(text) if t in self.vocabulary)
+        vector = {
+            self.vocabulary[term]: (1.0 + math.log(count)) * self.idf[self.vocabulary[term]]
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {col: w / norm for col, w in vector.items()}
+
+    def score(self, text, top_k):
+        """Top-k (job_id, cosine) pairs for a free-text query."""
+        scores = defaultdict(float)
+        indptr, rows, weights = self.indptr, self.rows, self.weights
+        for col, query_weight in self.vectorize(text).items():
+            start, end = indptr[col], indptr[col + 1]
+            for row, weight in zip(rows[start:end], weights[start:end]):
+                scores[row] += query_weight * weight
+        job_ids = self.job_ids
+        return heapq.nlargest(
+            top_k,
+            ((job_ids[row], score) for row, score in scores.items()),
+            key=lambda item: (item[1], item[0]),
+        )
+
+    def score_many(self, texts, top_k):
+        """Score {key: text} against the index, returning {key: top-k pairs}."""
+        return {key: self.score(text, top_k) for key, text in texts.items()}
+
+    def save(self, path):
+        header = json.dumps({'terms': self.terms, 'docs': len(self.job_ids)}).encode()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as fh:
+            fh.write(INDEX_MAGIC)
+            fh.write(len(header).to_bytes(8, 'little'))
+            fh.write(header)
+            for arr in (self.idf, self.indptr, self.rows, self.weights, self.job_ids):
+                arr.tofile(fh)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as fh:
+            if fh.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f'{path} is not a TF-IDF index file')
+            header = json.loads(fh.read(int.from_bytes(fh.read(8), 'little')))
+            n_terms, n_docs = len(header['terms']), header['docs']
+            idf, indptr = array('f'), array('q')
+            idf.fromfile(fh, n_terms)
+            indptr.fromfile(fh, n_terms + 1)
+            rows, weights, job_ids = array('i'), array('f'), array('q')
+            rows.fromfile(fh, indptr[-1])
+            weights.fromfile(fh, indptr[-1])
+            job_ids.fromfile(fh, n_docs)
+        return cls(header['terms'], idf, indptr, rows, weights, job_ids)
+
+
+# -------------------- PROCESS-WIDE INDEX --------------------
+_lock = threading.Lock()
+_cached = {'mtime': None, 'index': None}
+
+
+def index_path():
+    return getattr(settings, 'TFIDF_INDEX_PATH', settings.BASE_DIR / 'tfidf_index.bin')
+
+
+def build_index():
+    """Rebuild the index from active jobs, persist it and make it current."""
+    documents = (
+        (job_id, f'{title} {description}')
+        for job_id, title, description in (
+            Job.objects.filter(is_active=True)
+            .values_list('id', 'title', 'description')
+            .iterator(chunk_size=2000)
+        )
+    )
+    index = TfidfIndex.build(documents)
+    path = index_path()
+    index.save(path)
+    with _lock:
+        _cached['mtime'] = os.stat(path).st_mtime_ns
+        _cached['index'] = index
+    return index
+
+
+def get_index():
+    """Return the in-memory index, reloading when another process rewrote the file."""
+    path = index_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return build_index()
+    with _lock:
+        if _cached['mtime'] != mtime:
+            _cached['index'] = TfidfIndex.load(path)
+            _cached['mtime'] = mtime
+        return _cached['index']
+
+
+def load_profile_texts(user_ids=None):
+    """Map user id -> skills, bio and experience text for content matching."""
+    from accounts.models import Experience, Profile
+
+    parts = defaultdict(list)
+    profiles = Profile.objects.values_list('user_id', 'bio')
+    skills = Profile.skills.through.objects.values_list('profile__user_id', 'skill__name')
+    experience = Experience.objects.values_list('profile__user_id', 'role', 'description')
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+        skills = skills.filter(profile__user_id__in=user_ids)
+        experience = experience.filter(profile__user_id__in=user_ids)
+    for user_id, name in skills.iterator(chunk_size=5000):
+        parts[user_id].append(name)
+    for user_id, bio in profiles.iterator(chunk_size=5000):
+        if bio:
+            parts[user_id].append(bio)
+    for user_id, role, description in experience.iterator(chunk_size=5000):
+        parts[user_id].append(role)
+        if description:
+            parts[user_id].append(description)
+    return {user_id: ' '.join(chunks) for user_id, chunks in parts.items()}
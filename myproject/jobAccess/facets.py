@@ -0,0 +1,105 @@
+# jobAccess/facets.py - Facet counts for filtered job listings
+#
+# Each facet is its own GROUP BY over the filtered queryset, so the rows read
+# back grow with the distinct values of one column rather than with every
+# combination of them; free-text locations are limited in the query. Results
+# (and the approximate totals of cursor-paged listings) are cached per filter
+# set under a generation number that only job and category writes bump.
+
+import hashlib
+import json
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, CharField, Count, Value, When
+
+FACETS_GENERATION_KEY = 'facets:generation'
+FACETS_TIMEOUT = 300
+# Locations are free text; only the most common are returned
+MAX_LOCATIONS = 20
+
+# (label, lower bound inclusive, upper bound exclusive) on salary_min
+SALARY_BANDS = (
+    ('0-50k', 0, 50000),
+    ('50k-100k', 50000, 100000),
+    ('100k-150k', 100000, 150000),
+    ('150k+', 150000, None),
+)
+
+
+def salary_band():
+    whens = []
+    for label, low, high in SALARY_BANDS:
+        bounds = {'salary_min__gte': low}
+        if high is not None:
+            bounds['salary_min__lt'] = high
+        whens.append(When(then=Value(label), **bounds))
+    return Case(*whens, default=Value('unspecified'), output_field=CharField())
+
+
+def _group_counts(qs, field, limit=None):
+    """[(value, count)] for one column of qs, most common first."""
+    rows = qs.values_list(field).annotate(n=Count('id')).order_by('-n', field)
+    if limit is not None:
+        rows = rows[:limit]
+    return list(rows)
+
+
+def compute_facets(qs):
+    """Count job_type, category, location, salary band and is_active values in qs."""
+    qs = qs.order_by()
+    bands = Counter(dict(_group_counts(qs.annotate(salary_band=salary_band()), 'salary_band')))
+    band_order = [label for label, _, _ in SALARY_BANDS] + ['unspecified']
+    return {
+        'job_type': _buckets(_group_counts(qs, 'job_type')),
+        'category': _buckets(_group_counts(qs, 'category__name')),
+        'location': _buckets(_group_counts(qs, 'location', MAX_LOCATIONS)),
+        'salary_band': _buckets((b, bands[b]) for b in band_order if bands[b]),
+        'is_active': _buckets(_group_counts(qs, 'is_active')),
+    }
+
+
+def _buckets(pairs):
+    return [{'value': value, 'count': count} for value, count in pairs]
+
+
+def _cache_key(kind, filters):
+    generation = cache.get(FACETS_GENERATION_KEY, 0)
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    return f'{kind}:{generation}:{digest}'
+
+
+def cached_facets(qs, filters):
+    """compute_facets(qs), cached under the current generation and the filters that built qs."""
+    key = _cache_key('facets', filters)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(qs)
+        cache.set(key, facets, FACETS_TIMEOUT)
+    return facets
+
+
+def cached_count(qs, filters):
+    """qs.count(), cached like cached_facets; may lag writes by up to FACETS_TIMEOUT."""
+    key = _cache_key('count', filters)
+    count = cache.get(key)
+    if count is None:
+        count = qs.order_by().count()
+        cache.set(key, count, FACETS_TIMEOUT)
+    return count
+
+
+def invalidate_facets():
+    """Start a new generation once the current transaction commits.
+
+    Only job and category writes call this; applications, bookmarks and the
+    other writes that bump versions.JOBS leave facet counts unchanged.
+    """
+    def apply():
+        cache.add(FACETS_GENERATION_KEY, 0, None)
+        try:
+            cache.incr(FACETS_GENERATION_KEY)
+        except ValueError:
+            cache.delete(FACETS_GENERATION_KEY)
+    transaction.on_commit(apply)
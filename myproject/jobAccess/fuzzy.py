@@ -0,0 +1,176 @@
+# jobAccess/fuzzy.py - Typo-tolerant trigram search over job titles and companies
+#
+# PostgreSQL: pg_trgm GIN indexes and similarity(). Elsewhere: an
+# in-process trigram inverted index over active jobs (kept current through
+# memindex, so with the in-memory cache other workers' writes show up within
+# INDEX_MAX_AGE). Either way only jobs sharing trigrams with the query are
+# scored, never every row.
+
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import connection, models
+from django.db.models import Case, IntegerField, When
+from django.db.models.expressions import RawSQL
+
+from .memindex import ProcessIndex
+from .models import Job
+
+FUZZY_VERSION_KEY = 'fuzzy:version'
+# Jaccard similarity between query and field trigram sets, as pg_trgm's similarity()
+SIMILARITY_THRESHOLD = 0.3
+# Matches returned on the in-process path, counted after the queryset's filters
+MAX_CANDIDATES = 500
+FIELDS = ('title', 'company_name')
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+POSTGRES_INSTALL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS job_title_trgm ON "jobAccess_job" USING GIN (title gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS job_company_trgm ON "jobAccess_job" USING GIN (company_name gin_trgm_ops)',
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS job_title_trgm',
+    'DROP INDEX IF EXISTS job_company_trgm',
+]
+
+
+def install(schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRES_INSTALL:
+            schema_editor.execute(sql)
+
+
+def uninstall(schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRES_UNINSTALL:
+            schema_editor.execute(sql)
+
+
+def trigrams(text):
+    """pg_trgm-style trigrams: each word padded with two leading spaces and one trailing."""
+    grams = set()
+    for word in _WORD_RE.findall((text or '').lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from trigram to the (job id, field) documents containing it."""
+
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.sizes = {}
+
+    def add(self, job_id, field, text):
+        grams = trigrams(text)
+        if grams:
+            for gram in grams:
+                self.postings[gram].add((job_id, field))
+            self.sizes[(job_id, field)] = len(grams)
+
+    def remove(self, job_id, field, text):
+        for gram in trigrams(text):
+            docs = self.postings.get(gram)
+            if docs is not None:
+                docs.discard((job_id, field))
+                if not docs:
+                    del self.postings[gram]
+        self.sizes.pop((job_id, field), None)
+
+    def search(self, query, threshold=SIMILARITY_THRESHOLD):
+        """[(job_id, similarity)] best first, taking each job's best field."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        # A match needs at least min_shared of the query's trigrams, so it must
+        # contain one of the len - min_shared + 1 rarest; only those postings
+        # generate candidates, the rest just verify them.
+        ordered = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))
+        min_shared = max(1, math.ceil(threshold * len(grams)))
+        probe, verify = ordered[:len(grams) - min_shared + 1], ordered[len(grams) - min_shared + 1:]
+
+        shared = Counter()
+        for gram in probe:
+            shared.update(self.postings.get(gram, ()))
+        best = {}
+        for doc, hits in shared.items():
+            hits += sum(1 for gram in verify if doc in self.postings.get(gram, ()))
+            score = hits / (len(grams) + self.sizes[doc] - hits)
+            if score >= threshold and score > best.get(doc[0], 0):
+                best[doc[0]] = score
+        return sorted(best.items(), key=lambda item: (-item[1], -item[0]))
+
+
+def build_index():
+    index = TrigramIndex()
+    active = Job.objects.filter(is_active=True)
+    for job_id, *values in active.values_list('id', *FIELDS).iterator(chunk_size=5000):
+        for field, text in zip(FIELDS, values):
+            index.add(job_id, field, text)
+    return index
+
+
+_index = ProcessIndex(FUZZY_VERSION_KEY, build_index)
+
+
+def job_fields(job):
+    """Snapshot of the indexed fields, or None for jobs the index leaves out."""
+    if job is None or not job.is_active:
+        return None
+    return {field: getattr(job, field) for field in FIELDS}
+
+
+def job_changed(job_id, old, new):
+    """Publish a job's indexed fields changing from old to new (job_fields snapshots)."""
+    changed = [f for f in FIELDS if (old and old[f]) != (new and new[f])]
+    if not changed:
+        return
+
+    def patch(index):
+        for field in changed:
+            if old:
+                index.remove(job_id, field, old[field])
+            if new:
+                index.add(job_id, field, new[field])
+
+    _index.publish(patch)
+
+
+def fuzzy_search_jobs(qs, text):
+    """Restrict a Job queryset to titles/companies similar to text, most similar first."""
+    text = (text or '').strip()
+    if not text:
+        return qs.none()
+    if connection.vendor == 'postgresql':
+        table = qs.model._meta.db_table
+        # % is pg_trgm's index-backed similarity operator (threshold pg_trgm.similarity_threshold, 0.3)
+        return (
+            qs.filter(RawSQL(
+                f'("{table}".title %% %s OR "{table}".company_name %% %s)', [text, text],
+                output_field=models.BooleanField()))
+            .annotate(similarity=RawSQL(
+                f'GREATEST(similarity("{table}".title, %s), similarity("{table}".company_name, %s))',
+                [text, text], output_field=models.FloatField()))
+            .order_by('-similarity', '-posted_date')
+        )
+
+    # Walk the ranking a slice at a time so the queryset's own filters can't
+    # empty the result just because the best matches overall were filtered out
+    ranked = [job_id for job_id, _ in _index.get().search(text)]
+    matched = []
+    for start in range(0, len(ranked), MAX_CANDIDATES):
+        chunk = ranked[start:start + MAX_CANDIDATES]
+        allowed = set(qs.filter(id__in=chunk).values_list('id', flat=True))
+        matched += [job_id for job_id in chunk if job_id in allowed]
+        if len(matched) >= MAX_CANDIDATES:
+            break
+    matched = matched[:MAX_CANDIDATES]
+    if not matched:
+        return qs.none()
+    position = Case(*[When(id=job_id, then=i) for i, job_id in enumerate(matched)], output_field=IntegerField())
+    return qs.filter(id__in=matched).order_by(position)
@@ -0,0 +1,180 @@
+# jobAccess/geo.py - Resolve free-text job locations and filter by distance
+#
+# Places come from the bundled gazetteer (data/gazetteer.tsv). Resolved jobs
+# store lat/lon and a 1-degree grid cell; a radius query first narrows to the
+# grid cells overlapping the circle's bounding box (an indexed IN lookup),
+# then filters and sorts on an equirectangular distance computed in SQL.
+
+import math
+import re
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import ExpressionWrapper, F, FloatField
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.tsv'
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GRID_DEGREES = 1.0
+DEFAULT_RADIUS_KM = 50.0
+# Keeps the cell list of a radius query to a few hundred ids
+MAX_RADIUS_KM = 500.0
+
+REMOTE_RE = re.compile(r'\b(remote|anywhere|work from home|wfh|telecommute|distributed)\b')
+_CLEAN_RE = re.compile(r'[^\w,]+')
+_COORDS_RE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+
+Place = namedtuple('Place', 'name region country latitude longitude population')
+Location = namedtuple('Location', 'place latitude longitude is_remote')
+
+
+def place_label(place):
+    return ', '.join(part for part in (place.name, place.region, place.country) if part)
+
+
+def _clean(text):
+    return ' '.join(_CLEAN_RE.sub(' ', text.lower()).split()).replace(' ,', ',')
+
+
+@lru_cache(maxsize=1)
+def gazetteer():
+    """{normalized name or alias: [Place, ...] most populous first}."""
+    index = {}
+    with open(GAZETTEER_PATH, encoding='utf-8') as fh:
+        for line in fh:
+            if not line.strip() or line.startswith('#'):
+                continue
+            name, region, country, lat, lon, population, aliases = line.rstrip('\n').split('\t')
+            place = Place(name, region, country, float(lat), float(lon), int(population))
+            for key in {name, *filter(None, aliases.split('|'))}:
+                index.setdefault(_clean(key), []).append(place)
+    for places in index.values():
+        places.sort(key=lambda p: -p.population)
+    return index
+
+
+# Country and region names accepted as qualifiers, by the code the gazetteer uses
+QUALIFIER_CODES = {
+    'united states': 'us', 'united states of america': 'us', 'usa': 'us', 'america': 'us',
+    'canada': 'ca', 'pakistan': 'pk', 'india': 'in', 'bangladesh': 'bd',
+    'united kingdom': 'gb', 'uk': 'gb', 'england': 'gb', 'scotland': 'gb', 'great britain': 'gb',
+    'ireland': 'ie', 'france': 'fr', 'germany': 'de', 'netherlands': 'nl', 'the netherlands': 'nl',
+    'switzerland': 'ch', 'sweden': 'se', 'spain': 'es', 'portugal': 'pt', 'poland': 'pl',
+    'united arab emirates': 'ae', 'uae': 'ae', 'saudi arabia': 'sa', 'qatar': 'qa',
+    'singapore': 'sg', 'hong kong': 'hk', 'japan': 'jp', 'australia': 'au',
+    'new york': 'ny', 'new jersey': 'nj', 'california': 'ca', 'washington': 'wa', 'oregon': 'or',
+    'illinois': 'il', 'massachusetts': 'ma', 'texas': 'tx', 'arizona': 'az', 'pennsylvania': 'pa',
+    'district of columbia': 'dc', 'georgia': 'ga', 'florida': 'fl', 'colorado': 'co', 'utah': 'ut',
+    'nevada': 'nv', 'minnesota': 'mn', 'michigan': 'mi', 'ohio': 'oh', 'indiana': 'in',
+    'tennessee': 'tn', 'north carolina': 'nc', 'ontario': 'on', 'british columbia': 'bc',
+    'quebec': 'qc', 'new south wales': 'nsw', 'victoria': 'vic', 'islamabad capital territory': 'ict',
+}
+
+
+def _qualifier(part):
+    # "Punjab 54000" -> "punjab"; full names -> the gazetteer's codes
+    words = ' '.join(word for word in part.split() if not word.isdigit())
+    return QUALIFIER_CODES.get(words, words)
+
+
+def find_place(text):
+    """Best gazetteer match for text like "New York, NY", "Lahore" or "SF", else None.
+
+    Only the whole text or its first comma-separated part is looked up as a
+    place; later parts ("NY", "Pakistan", "PK") must all name the place's
+    region or country, and a place matching none of the candidates is None.
+    """
+    index = gazetteer()
+    cleaned = _clean(text)
+    if cleaned in index:
+        return index[cleaned][0]
+    parts = [p.strip() for p in cleaned.split(',') if p.strip()]
+    candidates = index.get(parts[0]) if parts else None
+    if not candidates:
+        return None
+    qualifiers = {q for q in map(_qualifier, parts[1:]) if q}
+    for place in candidates:
+        codes = {place.region.lower(), place.country.lower()} - {''}
+        if qualifiers <= codes:
+            return place
+    return None
+
+
+def resolve_location(text):
+    """Location for a job's free-text location; place is '' when unresolved."""
+    cleaned = _clean(text or '')
+    is_remote = bool(REMOTE_RE.search(cleaned))
+    place = find_place(REMOTE_RE.sub(' ', cleaned)) if cleaned else None
+    if place is None:
+        return Location('', None, None, is_remote)
+    return Location(place_label(place), place.latitude, place.longitude, is_remote)
+
+
+def apply_location(job):
+    """Set job's place, coordinates, grid cell and remote flag from job.location."""
+    location = resolve_location(job.location)
+    job.place = location.place
+    job.latitude = location.latitude
+    job.longitude = location.longitude
+    job.geo_cell = grid_cell(location.latitude, location.longitude)
+    job.is_remote = location.is_remote
+
+
+def parse_point(text):
+    """(lat, lon) for a "lat,lon" pair or a gazetteer place, else None."""
+    match = _COORDS_RE.match(text or '')
+    if match:
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+        return None
+    place = find_place(text or '')
+    return (place.latitude, place.longitude) if place else None
+
+
+def grid_cell(lat, lon):
+    if lat is None or lon is None:
+        return None
+    row = int(math.floor((lat + 90) / GRID_DEGREES))
+    col = int(math.floor((lon + 180) / GRID_DEGREES)) % int(360 / GRID_DEGREES)
+    return row * int(360 / GRID_DEGREES) + col
+
+
+def cells_within(lat, lon, radius_km):
+    """Grid cells overlapping the bounding box of a circle."""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + dlat, 89.0))), 0.01))
+    columns = int(360 / GRID_DEGREES)
+    lat_low, lat_high = max(lat - dlat, -90.0), min(lat + dlat, 90.0 - 1e-9)
+    rows = range(int(math.floor((lat_low + 90) / GRID_DEGREES)), int(math.floor((lat_high + 90) / GRID_DEGREES)) + 1)
+    if dlon >= 180:
+        cols = range(columns)
+    else:
+        first = int(math.floor((lon - dlon + 180) / GRID_DEGREES))
+        last = int(math.floor((lon + dlon + 180) / GRID_DEGREES))
+        cols = {c % columns for c in range(first, last + 1)}
+    return [row * columns + col for row in rows for col in cols]
+
+
+def near(qs, lat, lon, radius_km):
+    """Jobs in qs within radius_km of (lat, lon), annotated with distance_sq (km²), nearest first."""
+    radius_km = min(radius_km, MAX_RADIUS_KM)
+    scale = math.cos(math.radians(lat))
+    # Equirectangular approximation: accurate to well under 1% at these radii
+    distance_sq = ExpressionWrapper(
+        ((F('latitude') - lat) * KM_PER_DEGREE) * ((F('latitude') - lat) * KM_PER_DEGREE)
+        + ((F('longitude') - lon) * (KM_PER_DEGREE * scale)) * ((F('longitude') - lon) * (KM_PER_DEGREE * scale)),
+        output_field=FloatField(),
+    )
+    return (
+        qs.filter(geo_cell__in=cells_within(lat, lon, radius_km))
+        .annotate(distance_sq=distance_sq)
+        .filter(distance_sq__lte=radius_km * radius_km)
+        .order_by('distance_sq', '-posted_date')
+    )
+
+
+def distance_km(distance_sq):
+    """Kilometres from the distance_sq annotation added by near()."""
+    return round(math.sqrt(distance_sq), 1) if distance_sq is not None else None
@@ -0,0 +1,137 @@
+# jobAccess/listcache.py - Shared response cache for the public job listings
+#
+# Responses are cached per normalized filter set under the jobs version
+# counter (see versions.py), so any job, category or application write
+# retires every cached listing at once. On a miss one request rebuilds while
+# concurrent ones serve the previous generation's copy, or wait for the
+# rebuild when there is none.
+
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from myproject import metrics
+
+from . import versions
+
+LISTING_TIMEOUT = 300
+# Previous-generation copies served while a rebuild is in flight
+STALE_TIMEOUT = 3600
+LOCK_TIMEOUT = 30
+WAIT_SECONDS = 5.0
+POLL_SECONDS = 0.05
+
+STATS_PREFIX = 'listing:stats'
+STATS = ('hits', 'misses', 'stale', 'waits', 'rebuilds', 'rebuild_ms')
+
+
+def normalize(request, params):
+    """Sorted (name, value) pairs for the params that shape a response, defaults filled in.
+
+    params maps each name to its default (None: omitted when absent). Values
+    are kept exactly as the view reads them with request.GET.get(), since any
+    cleanup here that the view doesn't repeat would let two different
+    responses share a key. Unknown params are dropped, so "?utm_source=x"
+    and "" share a cache entry.
+    """
+    pairs = []
+    for name, default in sorted(params.items()):
+        value = request.GET.get(name, default)
+        if value is not None:
+            pairs.append((name, value))
+    return pairs
+
+
+def _record(stat, amount=1):
+    if stat in ('hits', 'misses', 'stale'):
+        metrics.inc('listing_cache_requests_total', {'result': stat})
+    elif stat == 'waits':
+        metrics.inc('listing_cache_waits_total')
+    elif stat == 'rebuild_ms':
+        metrics.inc('listing_cache_rebuild_seconds_total', amount=amount / 1000)
+    key = f'{STATS_PREFIX}:{stat}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        pass
+
+
+def stats():
+    """Counters since the cache was last cleared, plus derived rates."""
+    values = cache.get_many([f'{STATS_PREFIX}:{stat}' for stat in STATS])
+    data = {stat: values.get(f'{STATS_PREFIX}:{stat}', 0) for stat in STATS}
+    served = data['hits'] + data['misses'] + data['stale']
+    data['hit_rate'] = round((data['hits'] + data['stale']) / served, 4) if served else None
+    data['miss_rate'] = round(data['misses'] / served, 4) if served else None
+    data['avg_rebuild_ms'] = round(data['rebuild_ms'] / data['rebuilds'], 1) if data['rebuilds'] else None
+    return data
+
+
+def _freeze(response):
+    return response.status_code, response['Content-Type'], response.content
+
+
+def _thaw(frozen, state):
+    status, content_type, content = frozen
+    response = HttpResponse(content, status=status, content_type=content_type)
+    response['X-Cache'] = state
+    return response
+
+
+def cached_listing(name, params, anonymous_only=False):
+    """Cache a GET view's 200 responses per normalize(request, params).
+
+    anonymous_only leaves signed-in users' requests to the view, for pages
+    that render per-user content.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or (anonymous_only and request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            digest = hashlib.md5(json.dumps(normalize(request, params)).encode()).hexdigest()
+            generation = versions.versions([versions.JOBS])[0]
+            key = f'listing:{name}:{generation}:{digest}'
+            stale_key = f'listing:{name}:stale:{digest}'
+
+            frozen = cache.get(key)
+            if frozen is not None:
+                _record('hits')
+                return _thaw(frozen, 'HIT')
+
+            lock_key = f'{key}:lock'
+            if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+                frozen = cache.get(stale_key)
+                if frozen is not None:
+                    _record('stale')
+                    return _thaw(frozen, 'STALE')
+                _record('waits')
+                deadline = time.monotonic() + WAIT_SECONDS
+                while time.monotonic() < deadline:
+                    time.sleep(POLL_SECONDS)
+                    frozen = cache.get(key)
+                    if frozen is not None:
+                        _record('hits')
+                        return _thaw(frozen, 'HIT')
+                # The rebuilding request is stuck or gone; rebuild here too
+
+            _record('misses')
+            started = time.perf_counter()
+            try:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    frozen = _freeze(response)
+                    cache.set(key, frozen, LISTING_TIMEOUT)
+                    cache.set(stale_key, frozen, STALE_TIMEOUT)
+            finally:
+                cache.delete(lock_key)
+            _record('rebuilds')
+            _record('rebuild_ms', int((time.perf_counter() - started) * 1000))
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
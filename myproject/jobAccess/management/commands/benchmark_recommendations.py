@@ -0,0 +1,238 @@
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from accounts.models import Application, Profile
+from jobAccess.collaborative import update_cooccurrence
+from jobAccess.models import Job, JobRecommendation, Skill
+from jobAccess.recommendations import (
+    DEFAULT_TOP_K, MODES, collaborative_weight, default_mode, rebuild_recommendations, score_users,
+)
+
+FILLER_WORDS = (
+    "team build design deliver product customer platform service scale data "
+    "support maintain improve review collaborate remote office growth "
+    "experience modern stack testing quality release pipeline"
+).split()
+
+
+class Rollback(Exception):
+    pass
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _zipf_choices(rng, population, k):
+    weights = [1 / (rank + 1) for rank in range(len(population))]
+    return set(rng.choices(population, weights=weights, k=k))
+
+
+def build_synthetic(rng, n_users, n_jobs, n_skills, apps_per_user):
+    """Create users, jobs and training applications; return held-out {user_id: {job_id}}."""
+    Skill.objects.bulk_create([Skill(name=f"bench-skill-{i}") for i in range(n_skills)])
+    skill_ids = [s.id for s in Skill.objects.filter(name__startswith="bench-skill-").order_by("id")]
+    skill_names = dict(Skill.objects.filter(id__in=skill_ids).values_list("id", "name"))
+
+    job_skills = []
+    jobs = []
+    for i in range(n_jobs):
+        required = _zipf_choices(rng, skill_ids, rng.randint(3, 6))
+        words = [skill_names[s] for s in required] + rng.choices(FILLER_WORDS, k=60)
+        rng.shuffle(words)
+        job_skills.append(required)
+        jobs.append(Job(
+            title=f"{skill_names[next(iter(required))]} engineer",
+            company_name=f"Company {i % 500}",
+            location=f"City {i % 50}",
+            description=" ".join(words),
+            job_type="Full-time",
+        ))
+    Job.objects.bulk_create(jobs, batch_size=1000)
+    job_ids = list(Job.objects.order_by("id").values_list("id", flat=True))
+    job_through = Job.required_skills.through
+    job_through.objects.bulk_create(
+        [job_through(job_id=job_id, skill_id=s) for job_id, req in zip(job_ids, job_skills) for s in req],
+        batch_size=2000,
+    )
+    jobs_by_skill = defaultdict(list)
+    for job_id, req in zip(job_ids, job_skills):
+        for s in req:
+            jobs_by_skill[s].append(job_id)
+
+    User.objects.bulk_create(
+        [User(username=f"bench-user-{i}", password="!") for i in range(n_users)], batch_size=1000
+    )
+    user_ids = list(User.objects.filter(username__startswith="bench-user-").order_by("id").values_list("id", flat=True))
+    Profile.objects.bulk_create([Profile(user_id=u) for u in user_ids], batch_size=1000)
+    profile_ids = dict(Profile.objects.filter(user_id__in=user_ids).values_list("user_id", "id"))
+
+    profile_through = Profile.skills.through
+    user_skill_rows, applications, held_out = [], [], {}
+    for user_id in user_ids:
+        own = _zipf_choices(rng, skill_ids, rng.randint(3, 8))
+        user_skill_rows += [profile_through(profile_id=profile_ids[user_id], skill_id=s) for s in own]
+        # Mostly apply to jobs sharing a skill, sometimes anywhere
+        applied = []
+        for _ in range(apps_per_user):
+            pool = jobs_by_skill.get(rng.choice(sorted(own))) if rng.random() < 0.8 else None
+            job_id = rng.choice(pool or job_ids)
+            if job_id not in applied:
+                applied.append(job_id)
+        cut = max(1, len(applied) // 5)
+        held_out[user_id] = set(applied[-cut:])
+        applications += [Application(user_id=user_id, job_id=j) for j in applied[:-cut]]
+    profile_through.objects.bulk_create(user_skill_rows, batch_size=2000)
+    Application.objects.bulk_create(applications, batch_size=2000)
+    return held_out
+
+
+def hold_out_latest():
+    """Remove each user's newest application (users with 2+); return them as {user_id: {job_id}}.
+
+    Co-occurrence counts are rebuilt afterwards, so held-out applications
+    can't feed the collaborative scores they are measured against.
+    """
+    latest = {}
+    counts = defaultdict(int)
+    for app_id, user_id, job_id in Application.objects.order_by("id").values_list("id", "user_id", "job_id").iterator():
+        counts[user_id] += 1
+        latest[user_id] = (app_id, job_id)
+    held_out = {u: {job_id} for u, (_, job_id) in latest.items() if counts[u] > 1}
+    Application.objects.filter(id__in=[latest[u][0] for u in held_out]).delete()
+    # Incremental updates never subtract, so recount without the held-out rows
+    update_cooccurrence(full=True)
+    return held_out
+
+
+class Command(BaseCommand):
+    help = 'Measure recommendation quality and speed on a synthetic or replayed dataset (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replay', action='store_true',
+                            help='Use existing data, holding out each user\'s latest application')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--jobs', type=int, default=5000)
+        parser.add_argument('--skills', type=int, default=300)
+        parser.add_argument('--apps-per-user', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--k', type=int, default=10, help='Cut-off for precision/recall')
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+        parser.add_argument('--mode', choices=MODES)
+        parser.add_argument('--latency-sample', type=int, default=200,
+                            help='Users timed individually for scoring latency')
+        parser.add_argument('--skip-memory', action='store_true',
+                            help='Skip the traced rebuild used to measure peak memory')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if not options['replay'] and Job.objects.exists():
+            raise CommandError('Synthetic runs need an empty job table; use --replay or a scratch DATABASE_URL.')
+        rng = random.Random(options['seed'])
+        report = {}
+        with tempfile.TemporaryDirectory() as tmp, \
+                override_settings(TFIDF_INDEX_PATH=os.path.join(tmp, 'tfidf_index.bin')):
+            try:
+                with transaction.atomic():
+                    report = self.run(rng, options)
+                    raise Rollback
+            except Rollback:
+                pass
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def run(self, rng, options):
+        k, top_k, mode = options['k'], options['top_k'], options['mode']
+        started = time.monotonic()
+        if options['replay']:
+            held_out = hold_out_latest()
+        else:
+            held_out = build_synthetic(rng, options['users'], options['jobs'],
+                                       options['skills'], options['apps_per_user'])
+        setup_seconds = time.monotonic() - started
+
+        started = time.monotonic()
+        rows = rebuild_recommendations(top_k=top_k, mode=mode)
+        rebuild_seconds = time.monotonic() - started
+
+        peak_mb = None
+        if not options['skip_memory']:
+            tracemalloc.start()
+            rebuild_recommendations(top_k=top_k, mode=mode)
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+        recommended = defaultdict(list)
+        for user_id, job_id in JobRecommendation.objects.order_by('user_id', '-relevance_score', '-job_id') \
+                .values_list('user_id', 'job_id').iterator(chunk_size=5000):
+            if len(recommended[user_id]) < k:
+                recommended[user_id].append(job_id)
+        precision, recall = [], []
+        for user_id, expected in held_out.items():
+            hits = len(expected.intersection(recommended.get(user_id, ())))
+            precision.append(hits / k)
+            recall.append(hits / len(expected))
+        active_jobs = Job.objects.filter(is_active=True).count()
+        covered = JobRecommendation.objects.values('job_id').distinct().count()
+
+        profiled = list(Profile.objects.values_list('user_id', flat=True))
+        sample = rng.sample(profiled, min(options['latency_sample'], len(profiled)))
+        latencies = []
+        for user_id in sample:
+            started = time.perf_counter()
+            score_users([user_id], top_k, mode)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        return {
+            'config': {
+                'dataset': 'replay' if options['replay'] else 'synthetic',
+                'mode': mode or default_mode(),
+                'collaborative_weight': collaborative_weight(),
+                'k': k,
+                'top_k': top_k,
+                'seed': options['seed'],
+            },
+            'dataset': {
+                'users': User.objects.count(),
+                'jobs': Job.objects.count(),
+                'active_jobs': active_jobs,
+                'applications': Application.objects.count(),
+                'evaluated_users': len(held_out),
+                'setup_seconds': round(setup_seconds, 3),
+            },
+            'quality': {
+                f'precision@{k}': statistics.fmean(precision) if precision else None,
+                f'recall@{k}': statistics.fmean(recall) if recall else None,
+                'coverage': covered / active_jobs if active_jobs else None,
+            },
+            'performance': {
+                'rebuild_seconds': round(rebuild_seconds, 3),
+                'rows_written': rows,
+                'peak_memory_mb': round(peak_mb, 2) if peak_mb is not None else None,
+                'user_latency_ms': {
+                    'samples': len(latencies),
+                    'p50': _percentile(latencies, 50),
+                    'p90': _percentile(latencies, 90),
+                    'p99': _percentile(latencies, 99),
+                    'max': max(latencies) if latencies else None,
+                },
+            },
+        }
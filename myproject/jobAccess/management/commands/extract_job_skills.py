@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobAccess.models import Job
+from jobAccess.skills import get_matcher, link_job_skills
+
+
+class Command(BaseCommand):
+    help = 'Link jobs to the skills named in their title or description, dropping links they no longer name'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Jobs fetched and links inserted per round trip')
+        parser.add_argument('--missing-only', action='store_true',
+                            help='Only scan jobs that have no required skills yet')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        batch_size = options['batch_size']
+        matcher = get_matcher()
+
+        jobs = Job.objects.all()
+        if options['missing_only']:
+            jobs = jobs.filter(required_skills__isnull=True)
+        rows = jobs.values_list('id', 'title', 'description').iterator(chunk_size=batch_size)
+
+        scanned = linked = links = 0
+        # {job_id: skill ids}; a job's stale links are dropped with its batch
+        pending = {}
+        for job_id, title, description in rows:
+            pending[job_id] = matcher.find(f'{title} {description}')
+            links += len(pending[job_id])
+            scanned += 1
+            if links >= batch_size or len(pending) >= batch_size:
+                linked += link_job_skills(pending)
+                pending, links = {}, 0
+        linked += link_job_skills(pending)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Scanned {scanned} jobs and linked {linked} skills in {elapsed:.2f}s'
+        ))
+        if linked:
+            self.stdout.write('Run rebuild_recommendations to score the new links.')
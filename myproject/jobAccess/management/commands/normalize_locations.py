@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from jobAccess.geo import apply_location
+from jobAccess.models import Job
+
+GEO_FIELDS = ['place', 'latitude', 'longitude', 'geo_cell', 'is_remote']
+
+
+class Command(BaseCommand):
+    help = 'Re-resolve job locations against the bundled gazetteer (run after editing it)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        resolved = remote = 0
+        # One id range at a time, so no read cursor stays open across the updates
+        last_id = 0
+        while True:
+            batch = list(Job.objects.filter(id__gt=last_id).order_by('id').only('id', 'location')[:batch_size])
+            if not batch:
+                break
+            for job in batch:
+                apply_location(job)
+                resolved += bool(job.place)
+                remote += job.is_remote
+            Job.objects.bulk_update(batch, GEO_FIELDS)
+            last_id = batch[-1].id
+        self.stdout.write(self.style.SUCCESS(f'✓ Resolved {resolved} job locations ({remote} remote)'))
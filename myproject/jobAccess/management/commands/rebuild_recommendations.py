@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobAccess.recommendations import DEFAULT_TOP_K, MODES, rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Rebuild precomputed job recommendations for every profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                            help='Recommendations stored per user')
+        parser.add_argument('--mode', choices=MODES,
+                            help='Matching mode (defaults to settings.RECOMMENDATION_MODE)')
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only rebuild for this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = rebuild_recommendations(
+            user_ids=options['users'], top_k=options['top_k'], mode=options['mode'],
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Wrote {written} recommendations in {elapsed:.2f}s'
+        ))
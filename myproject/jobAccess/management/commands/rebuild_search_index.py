@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from jobAccess.search import backend, install
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text job search index and its sync triggers'
+
+    def handle(self, *args, **options):
+        with connection.schema_editor() as schema_editor:
+            install(schema_editor)
+        self.stdout.write(self.style.SUCCESS(f'✓ Search backend: {backend() or "icontains fallback"}'))
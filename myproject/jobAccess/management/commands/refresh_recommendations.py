@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobAccess.recommendations import DEFAULT_TOP_K, MODES, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recompute recommendations for jobs and users changed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                            help='Recommendations stored per user')
+        parser.add_argument('--mode', choices=MODES,
+                            help='Matching mode (defaults to settings.RECOMMENDATION_MODE)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        users, pairs = refresh_recommendations(top_k=options['top_k'], mode=options['mode'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rebuilt {users} users and added {pairs} job matches in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,60 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from myproject.slowlog import log_path, read_entries
+
+SORT_KEYS = {
+    'total': lambda row: row['total_ms'],
+    'count': lambda row: row['count'],
+    'avg': lambda row: row['total_ms'] / row['count'],
+    'max': lambda row: row['max_ms'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Rank the slow-query log by SQL fingerprint (total time by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=None, help='Log path to read, every process\'s file (default: SLOW_QUERY_LOG)')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total')
+        parser.add_argument('--limit', type=int, default=20, help='Fingerprints to show')
+        parser.add_argument('--view', help='Only queries run by this URL name')
+        parser.add_argument('--hours', type=float, help='Only queries logged in the last N hours')
+        parser.add_argument('--plans', action='store_true', help='Print each fingerprint\'s SQL and EXPLAIN plan')
+
+    def handle(self, *args, **options):
+        since = time.time() - options['hours'] * 3600 if options['hours'] else None
+        groups = {}
+        for entry in read_entries(options['log']):
+            if options['view'] and entry.get('view') != options['view']:
+                continue
+            if since and entry.get('ts', 0) < since:
+                continue
+            row = groups.setdefault(entry['fingerprint'], {
+                'fingerprint': entry['fingerprint'], 'sql': entry['sql'], 'plan': None,
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'views': defaultdict(int),
+            })
+            row['count'] += 1
+            row['total_ms'] += entry['ms']
+            row['max_ms'] = max(row['max_ms'], entry['ms'])
+            row['views'][entry.get('view')] += 1
+            if entry.get('plan'):
+                row['plan'] = entry['plan']
+
+        if not groups:
+            self.stdout.write(f"No slow queries logged in {options['log'] or log_path()}")
+            return
+
+        ranked = sorted(groups.values(), key=SORT_KEYS[options['sort']], reverse=True)[:options['limit']]
+        self.stdout.write(f"{'#':>3}  {'total ms':>10}  {'count':>6}  {'avg ms':>8}  {'max ms':>8}  fingerprint   views")
+        for rank, row in enumerate(ranked, 1):
+            views = ', '.join(f'{name} ({n})' for name, n in sorted(row['views'].items(), key=lambda item: -item[1]))
+            self.stdout.write(
+                f"{rank:>3}  {row['total_ms']:>10.1f}  {row['count']:>6}  {row['total_ms'] / row['count']:>8.1f}  "
+                f"{row['max_ms']:>8.1f}  {row['fingerprint']}  {views}"
+            )
+            if options['plans']:
+                self.stdout.write(f"     {row['sql']}")
+                for line in row['plan'] or ['(no plan captured)']:
+                    self.stdout.write(f'       {line}')
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobAccess.collaborative import update_cooccurrence
+
+
+class Command(BaseCommand):
+    help = 'Fold new applications and bookmarks into the job co-occurrence counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recount from the full history instead of new rows only')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        processed = update_cooccurrence(full=options['full'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Processed {processed} interactions in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,72 @@
+# jobAccess/memindex.py - In-process indexes kept in step across processes
+#
+# Each process holds its own copy of the index. Writes patch the local copy
+# after commit and bump a version in the shared cache; a process that sees a
+# version it did not produce rebuilds from the database on its next lookup.
+# With a process-local cache the versions are never shared, so an index is
+# also rebuilt once it is older than settings.INDEX_MAX_AGE.
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# How often a process checks the shared version for other processes' writes
+VERSION_CHECK_SECONDS = 5.0
+
+
+class ProcessIndex:
+    def __init__(self, version_key, build):
+        self.version_key = version_key
+        self.build = build
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+        self._checked_at = 0.0
+        self._built_at = 0.0
+
+    def _shared_version(self):
+        cache.add(self.version_key, 0, None)
+        return cache.get(self.version_key, 0)
+
+    def _expired(self, now):
+        max_age = getattr(settings, 'INDEX_MAX_AGE', 0)
+        return bool(max_age) and now - self._built_at >= max_age
+
+    def get(self):
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < VERSION_CHECK_SECONDS:
+            return self._index
+        with self._lock:
+            version = self._shared_version()
+            if self._index is None or version != self._version or self._expired(now):
+                self._index = self.build()
+                self._version = version
+                self._built_at = now
+            self._checked_at = now
+            return self._index
+
+    def publish(self, patch=None):
+        """After commit: bump the shared version and run patch(index) on the local copy.
+
+        Without a patch, or if another process bumped the version in between,
+        the local copy is dropped and rebuilt on the next lookup instead.
+        """
+        def apply():
+            cache.add(self.version_key, 0, None)
+            try:
+                version = cache.incr(self.version_key)
+            except ValueError:
+                version = None
+            with self._lock:
+                if self._index is None:
+                    return
+                if patch is not None and version is not None and version == self._version + 1:
+                    patch(self._index)
+                    self._version = version
+                else:
+                    self._index = None
+
+        transaction.on_commit(apply)
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobAccess', '0003_jobcategory_job_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationDirtyMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('job', 'Job'), ('user', 'User')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('marked_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def install_search(apps, schema_editor):
+    from jobAccess.search import install
+    install(schema_editor)
+
+
+def uninstall_search(apps, schema_editor):
+    from jobAccess.search import uninstall
+    uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobAccess', '0005_jobcooccurrence_interactionwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchDocument',
+            fields=[
+                ('job', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='jobAccess.job')),
+                ('document', models.TextField(db_column='job_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'job_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(install_search, uninstall_search),
+    ]
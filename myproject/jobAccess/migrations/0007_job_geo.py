@@ -0,0 +1,65 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:06
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 500
+
+
+def resolve_locations(apps, schema_editor):
+    from jobAccess.geo import apply_location
+    Job = apps.get_model('jobAccess', 'Job')
+    # One id range at a time, so large tables are never loaded whole and no
+    # read cursor stays open across the updates
+    last_id = 0
+    while True:
+        jobs = list(Job.objects.filter(id__gt=last_id).order_by('id').only('id', 'location')[:BATCH_SIZE])
+        if not jobs:
+            break
+        for job in jobs:
+            apply_location(job)
+        Job.objects.bulk_update(jobs, ['place', 'latitude', 'longitude', 'geo_cell', 'is_remote'])
+        last_id = jobs[-1].id
+
+
+def reinstall_search(apps, schema_editor):
+    # SQLite rebuilt jobAccess_job for the new NOT NULL columns, dropping the FTS triggers
+    from jobAccess.search import install
+    install(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobAccess', '0006_job_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geo_cell',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='is_remote',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='place',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.RunPython(resolve_locations, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:40
+
+from django.db import migrations
+
+
+def install_trigram(apps, schema_editor):
+    from jobAccess.fuzzy import install
+    install(schema_editor)
+
+
+def uninstall_trigram(apps, schema_editor):
+    from jobAccess.fuzzy import uninstall
+    uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobAccess', '0007_job_geo'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_trigram, uninstall_trigram),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobAccess', '0008_job_trigram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['posted_date', 'id'], name='job_posted_date_id'),
+        ),
+    ]
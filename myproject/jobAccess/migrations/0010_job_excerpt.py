@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 500
+
+
+def fill_excerpts(apps, schema_editor):
+    from jobAccess.serializers import make_excerpt
+    Job = apps.get_model('jobAccess', 'Job')
+    # One id range at a time: descriptions are the largest column, never load them all
+    last_id = 0
+    while True:
+        jobs = list(Job.objects.filter(id__gt=last_id).order_by('id').only('id', 'description')[:BATCH_SIZE])
+        if not jobs:
+            break
+        for job in jobs:
+            job.excerpt = make_excerpt(job.description)
+        Job.objects.bulk_update(jobs, ['excerpt'])
+        last_id = jobs[-1].id
+
+
+def reinstall_search(apps, schema_editor):
+    # SQLite rebuilt jobAccess_job for the new NOT NULL column, dropping the FTS triggers
+    from jobAccess.search import install
+    install(schema_editor)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobAccess', '0009_job_posted_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', max_length=300),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search, migrations.RunPython.noop),
+    ]
@@ -46,15 +46,28 @@ class Job(models.Model):
     company_name = models.CharField(max_length=200)
     location = models.CharField(max_length=200)
     description = models.TextField()
+    excerpt = models.CharField(max_length=300, blank=True, default='')  # Start of description, for list pages
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
     category = models.ForeignKey(JobCategory, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
     posted_date = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)  # Status of the job posting
     salary_min = models.IntegerField(null=True, blank=True)  # Minimum salary
     salary_max = models.IntegerField(null=True, blank=True)  # Maximum salary
+    # Resolved from location by jobAccess.geo on save
+    place = models.CharField(max_length=200, blank=True, default='')  # Canonical gazetteer name
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geo_cell = models.IntegerField(null=True, blank=True, db_index=True)  # Grid cell for radius queries
+    is_remote = models.BooleanField(default=False, db_index=True)
     # Skills required for the job
     required_skills = models.ManyToManyField(Skill, related_name='jobs')
 
+    class Meta:
+        indexes = [
+            # Newest-first listings and cursor pages
+            models.Index(fields=['posted_date', 'id'], name='job_posted_date_id'),
+        ]
+
     def __str__(self):
         return f"{self.title} at {self.company_name}"
 
@@ -74,3 +87,57 @@ class JobRecommendation(models.Model):
 
     def __str__(self):
         return f"Recommendation for {self.user.username}: {self.job.title}"
+
+
+# Jobs and users whose recommendations changed since the last refresh pass
+class RecommendationDirtyMark(models.Model):
+    KIND_CHOICES = [
+        ('job', 'Job'),
+        ('user', 'User'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"Dirty {self.kind} #{self.object_id}"
+
+
+# Number of users who interacted (applied or bookmarked) with both jobs.
+# The row where job == other holds the job's own interaction count.
+class JobCooccurrence(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='cooccurrences')
+    other = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('job', 'other')
+
+    def __str__(self):
+        return f"{self.job_id} ~ {self.other_id}: {self.count}"
+
+
+# Last Application/Bookmark id folded into JobCooccurrence
+class InteractionWatermark(models.Model):
+    source = models.CharField(max_length=20, unique=True)
+    last_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.source} @ {self.last_id}"
+
+
+# Read-only view of the SQLite FTS5 index maintained by jobAccess.search
+class JobSearchDocument(models.Model):
+    job = models.OneToOneField(Job, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING,
+                               related_name='search_document')
+    # FTS5 exposes the whole row under a hidden column named after the table
+    document = models.TextField(db_column='job_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'job_search'
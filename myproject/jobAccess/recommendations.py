@@ -0,0 +1,340 @@
+# jobAccess/recommendations.py - Offline job recommendation engine
+
+import heapq
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from myproject import metrics
+
+from .models import Job, JobRecommendation, RecommendationDirtyMark
+
+# Number of recommendations stored per user
+DEFAULT_TOP_K = 20
+
+# Cold-start list of newest active jobs, shared through the cache
+RECENT_JOBS_CACHE_KEY = 'recommendations:recent_jobs'
+RECENT_JOBS_LIMIT = 100
+RECENT_JOBS_TIMEOUT = 300
+
+# 'skills' matches Profile.skills to Job.required_skills; 'content' uses TF-IDF
+MODES = ('skills', 'content')
+
+# Rows fetched per round trip when streaming the M2M through tables
+CHUNK_SIZE = 5000
+
+# Ids per IN (...) clause; keeps SQLite under its bound-parameter limit
+ID_BATCH_SIZE = 500
+
+
+def id_batches(ids, size=ID_BATCH_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def build_skill_index(skill_ids=None):
+    """Map skill id -> active job ids, plus the number of skills each job requires.
+
+    With skill_ids, only jobs requiring at least one of those skills are loaded.
+    """
+    through = Job.required_skills.through
+    skill_jobs = defaultdict(list)
+    job_sizes = defaultdict(int)
+    rows = through.objects.filter(job__is_active=True)
+    if skill_ids is not None:
+        rows = rows.filter(
+            job_id__in=through.objects.filter(skill_id__in=skill_ids).values('job_id')
+        )
+    rows = rows.values_list('skill_id', 'job_id')
+    for skill_id, job_id in rows.iterator(chunk_size=CHUNK_SIZE):
+        skill_jobs[skill_id].append(job_id)
+        job_sizes[job_id] += 1
+    return skill_jobs, job_sizes
+
+
+def load_profile_skills(user_ids=None):
+    """Map user id -> set of skill ids taken from Profile.skills."""
+    from accounts.models import Profile
+
+    rows = Profile.skills.through.objects.values_list('profile__user_id', 'skill_id')
+    if user_ids is not None:
+        rows = rows.filter(profile__user_id__in=user_ids)
+    user_skills = defaultdict(set)
+    for user_id, skill_id in rows.iterator(chunk_size=CHUNK_SIZE):
+        user_skills[user_id].add(skill_id)
+    return user_skills
+
+
+def _cosine(overlap, user_size, job_size):
+    return overlap / math.sqrt(user_size * job_size)
+
+
+def score_skills(skill_ids, skill_jobs, job_sizes):
+    """Cosine similarity between a user's skills and each job's required skills.
+
+    Only jobs sharing at least one skill with the user are visited, so the cost
+    is proportional to the postings of the user's skills, not the job table.
+    """
+    if not skill_ids:
+        return {}
+    overlap = defaultdict(int)
+    for skill_id in skill_ids:
+        for job_id in skill_jobs.get(skill_id, ()):
+            overlap[job_id] += 1
+    return {
+        job_id: _cosine(count, len(skill_ids), job_sizes[job_id])
+        for job_id, count in overlap.items()
+    }
+
+
+def select_top(scores, top_k):
+    """Return the top_k (job_id, score) pairs, newest job first on ties."""
+    return heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+def write_recommendations(results, user_ids=None):
+    """Replace stored recommendations for user_ids (every user when None)."""
+    rows = [
+        JobRecommendation(user_id=user_id, job_id=job_id, relevance_score=score)
+        for user_id, pairs in results.items()
+        for job_id, score in pairs
+    ]
+    with transaction.atomic():
+        stale = JobRecommendation.objects.all()
+        if user_ids is not None:
+            stale = stale.filter(user_id__in=user_ids)
+        stale.delete()
+        JobRecommendation.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def default_mode():
+    return getattr(settings, 'RECOMMENDATION_MODE', 'skills')
+
+
+def collaborative_weight():
+    """Share of the final score taken from co-occurrence (0 disables blending)."""
+    return getattr(settings, 'RECOMMENDATION_CF_WEIGHT', 0.0)
+
+
+def blend(base, collaborative, weight, top_k):
+    """Mix {user: [(job_id, score)]} candidate lists and keep each user's top_k."""
+    blended = {}
+    for user_id in base.keys() | collaborative.keys():
+        scores = defaultdict(float)
+        for job_id, score in base.get(user_id, ()):
+            scores[job_id] += (1 - weight) * score
+        for job_id, score in collaborative.get(user_id, ()):
+            scores[job_id] += weight * score
+        blended[user_id] = select_top(scores, top_k)
+    return blended
+
+
+def _score_by_skills(user_ids, top_k):
+    user_skills = load_profile_skills(user_ids)
+    if user_ids is None:
+        skill_jobs, job_sizes = build_skill_index()
+    else:
+        all_skills = set().union(*user_skills.values())
+        skill_jobs, job_sizes = build_skill_index(all_skills)
+    return {
+        user_id: select_top(score_skills(skills, skill_jobs, job_sizes), top_k)
+        for user_id, skills in user_skills.items()
+    }
+
+
+def _score_by_content(user_ids, top_k):
+    from .content import build_index, get_index, load_profile_texts
+
+    # A full rebuild also refreshes the TF-IDF matrix from current jobs
+    index = build_index() if user_ids is None else get_index()
+    return index.score_many(load_profile_texts(user_ids), top_k)
+
+
+def score_users(user_ids=None, top_k=DEFAULT_TOP_K, mode=None):
+    """Compute {user_id: [(job_id, score)]} without writing anything.
+
+    With user_ids=None every profile is scored and the TF-IDF matrix and
+    co-occurrence counts are brought up to date first.
+    """
+    mode = mode or default_mode()
+    if mode not in MODES:
+        raise ValueError(f"Unknown recommendation mode: {mode}")
+    weight = collaborative_weight()
+    # Over-fetch candidates when blending so either side can lift a job into the top_k
+    candidates = top_k * 2 if weight else top_k
+    if mode == 'content':
+        results = _score_by_content(user_ids, candidates)
+    else:
+        results = _score_by_skills(user_ids, candidates)
+    if weight:
+        from .collaborative import score_collaborative, update_cooccurrence
+
+        if user_ids is None:
+            update_cooccurrence()
+        results = blend(results, score_collaborative(user_ids, candidates), weight, top_k)
+    return results
+
+
+def rebuild_recommendations(user_ids=None, top_k=DEFAULT_TOP_K, mode=None):
+    """Score active jobs for each profile and store the top_k in JobRecommendation.
+
+    Returns the number of recommendation rows written.
+    """
+    kind = 'full' if user_ids is None else 'users'
+    with metrics.timer('recommendation_rebuild_seconds', {'kind': kind}):
+        if user_ids is None:
+            # A full rebuild supersedes every change marked before it started
+            RecommendationDirtyMark.objects.all().delete()
+        return write_recommendations(score_users(user_ids, top_k, mode), user_ids)
+
+
+# -------------------- INCREMENTAL REFRESH --------------------
+def mark_dirty(kind, object_ids):
+    """Flag jobs or users whose recommendations must be recomputed."""
+    marks = [
+        RecommendationDirtyMark(kind=kind, object_id=object_id)
+        for object_id in set(object_ids) if object_id is not None
+    ]
+    if marks:
+        RecommendationDirtyMark.objects.bulk_create(marks, ignore_conflicts=True)
+
+
+def claim_dirty_marks():
+    """Remove and return the pending (job_ids, user_ids) marks."""
+    job_ids, user_ids = set(), set()
+    with transaction.atomic():
+        marks = list(RecommendationDirtyMark.objects.values_list('id', 'kind', 'object_id'))
+        for batch in id_batches(mark_id for mark_id, _, _ in marks):
+            RecommendationDirtyMark.objects.filter(id__in=batch).delete()
+    for _, kind, object_id in marks:
+        (job_ids if kind == 'job' else user_ids).add(object_id)
+    return job_ids, user_ids
+
+
+def _score_dirty_jobs(job_ids, skip_users, scale=1.0):
+    """Score every (user, job) pair touched by the given jobs' required skills."""
+    through = Job.required_skills.through
+    job_skills = defaultdict(set)
+    rows = through.objects.filter(job_id__in=job_ids, job__is_active=True)
+    for job_id, skill_id in rows.values_list('job_id', 'skill_id'):
+        job_skills[job_id].add(skill_id)
+    if not job_skills:
+        return {}
+
+    from accounts.models import Profile
+    candidates = set(
+        Profile.skills.through.objects
+        .filter(skill_id__in=set().union(*job_skills.values()))
+        .values_list('profile__user_id', flat=True)
+        .distinct()
+    ) - skip_users
+
+    pair_scores = defaultdict(dict)
+    for batch in id_batches(candidates):
+        for user_id, skills in load_profile_skills(batch).items():
+            for job_id, required in job_skills.items():
+                overlap = len(skills & required)
+                if overlap:
+                    pair_scores[user_id][job_id] = scale * _cosine(overlap, len(skills), len(required))
+    return pair_scores
+
+
+def _merge_pair_scores(pair_scores, top_k):
+    """Insert new pair scores that beat a user's current top_k, evicting the weakest."""
+    written = 0
+    for batch in id_batches(pair_scores):
+        existing = defaultdict(list)
+        rows = JobRecommendation.objects.filter(user_id__in=batch)
+        for rec_id, user_id, job_id, score in rows.values_list('id', 'user_id', 'job_id', 'relevance_score'):
+            existing[user_id].append((score, job_id, rec_id))
+
+        evicted, added = [], []
+        for user_id in batch:
+            merged = existing[user_id] + [
+                (score, job_id, None) for job_id, score in pair_scores[user_id].items()
+            ]
+            keep = heapq.nlargest(top_k, merged, key=lambda item: (item[0], item[1]))
+            kept_ids = {rec_id for _, _, rec_id in keep}
+            evicted += [rec_id for _, _, rec_id in existing[user_id] if rec_id not in kept_ids]
+            added += [
+                JobRecommendation(user_id=user_id, job_id=job_id, relevance_score=score)
+                for score, job_id, rec_id in keep if rec_id is None
+            ]
+
+        with transaction.atomic():
+            JobRecommendation.objects.filter(id__in=evicted).delete()
+            JobRecommendation.objects.bulk_create(added, batch_size=1000)
+        written += len(added)
+    return written
+
+
+@metrics.timer('recommendation_rebuild_seconds', {'kind': 'refresh'})
+def refresh_recommendations(top_k=DEFAULT_TOP_K, mode=None):
+    """Recompute recommendations only for jobs and users marked dirty.
+
+    Users who already hold a recommendation for a dirty job, or whose own skills
+    changed, are rebuilt in full; everyone else only gets the dirty jobs scored
+    and merged into their stored top_k. In content mode the TF-IDF matrix is
+    rebuilt when jobs changed, and new jobs reach other users on the next full
+    rebuild. Returns (users_rebuilt, pairs_written).
+    """
+    mode = mode or default_mode()
+    weight = collaborative_weight()
+    if weight:
+        from .collaborative import update_cooccurrence
+
+        update_cooccurrence()
+    job_ids, user_ids = claim_dirty_marks()
+    if job_ids:
+        user_ids |= set(
+            JobRecommendation.objects.filter(job_id__in=job_ids)
+            .values_list('user_id', flat=True)
+        )
+        if mode == 'content':
+            from .content import build_index
+            build_index()
+    for batch in id_batches(user_ids):
+        rebuild_recommendations(user_ids=batch, top_k=top_k, mode=mode)
+
+    written = 0
+    if job_ids and mode == 'skills':
+        # Changed jobs carry no co-occurrence signal yet, only the skill share
+        pair_scores = _score_dirty_jobs(job_ids, user_ids, scale=1 - weight)
+        written = _merge_pair_scores(pair_scores, top_k)
+    return len(user_ids), written
+
+
+def get_recommended_jobs(user, limit=6, min_results=3):
+    """Read precomputed recommendations, topping up with recent jobs if too few."""
+    jobs = list(
+        Job.objects.filter(jobrecommendation__user=user, is_active=True)
+        .defer('description')
+        .order_by('-jobrecommendation__relevance_score', '-id')[:limit]
+    )
+    if len(jobs) < min_results:
+        seen = [job.id for job in jobs]
+        jobs += list(
+            Job.objects.filter(is_active=True)
+            .exclude(id__in=seen)
+            .defer('description')
+            .order_by('-posted_date')[:limit - len(jobs)]
+        )
+    return jobs
+
+
+def recent_active_jobs():
+    """Newest active jobs as dicts, newest first, cached for cold-start users."""
+    jobs = cache.get(RECENT_JOBS_CACHE_KEY)
+    if jobs is None:
+        jobs = list(
+            Job.objects.filter(is_active=True)
+            .order_by('-id')
+            .values('id', 'title', 'company_name', 'location', 'job_type',
+                    'salary_min', 'salary_max', 'posted_date')[:RECENT_JOBS_LIMIT]
+        )
+        cache.set(RECENT_JOBS_CACHE_KEY, jobs, RECENT_JOBS_TIMEOUT)
+    return jobs
@@ -0,0 +1,187 @@
+# jobAccess/search.py - Full-text job search
+#
+# SQLite: an FTS5 external-content table (job_search) kept in sync with
+# jobAccess_job by triggers. PostgreSQL: a generated tsvector column with a
+# GIN index. Other backends fall back to icontains filters.
+
+import re
+
+from django.db import connection, models
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import JobSearchDocument
+
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r'\w+')
+
+# connection alias -> whether the FTS5 table exists
+_available = {}
+
+SQLITE_INSTALL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS job_search USING fts5(
+        title, company_name, location, description,
+        content='jobAccess_job', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS job_search_ai AFTER INSERT ON "jobAccess_job" BEGIN
+        INSERT INTO job_search(rowid, title, company_name, location, description)
+        VALUES (new.id, new.title, new.company_name, new.location, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_search_ad AFTER DELETE ON "jobAccess_job" BEGIN
+        INSERT INTO job_search(job_search, rowid, title, company_name, location, description)
+        VALUES ('delete', old.id, old.title, old.company_name, old.location, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_search_au
+        AFTER UPDATE OF title, company_name, location, description ON "jobAccess_job" BEGIN
+        INSERT INTO job_search(job_search, rowid, title, company_name, location, description)
+        VALUES ('delete', old.id, old.title, old.company_name, old.location, old.description);
+        INSERT INTO job_search(rowid, title, company_name, location, description)
+        VALUES (new.id, new.title, new.company_name, new.location, new.description);
+    END""",
+    # Title matches count most, then company, location and description
+    "INSERT INTO job_search(job_search, rank) VALUES ('rank', 'bm25(10.0, 4.0, 2.0, 1.0)')",
+    "INSERT INTO job_search(job_search) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS job_search_ai",
+    "DROP TRIGGER IF EXISTS job_search_ad",
+    "DROP TRIGGER IF EXISTS job_search_au",
+    "DROP TABLE IF EXISTS job_search",
+]
+
+POSTGRES_INSTALL = [
+    """ALTER TABLE "jobAccess_job" ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(company_name, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(location, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'D')
+        ) STORED""",
+    'CREATE INDEX IF NOT EXISTS job_search_vector_gin ON "jobAccess_job" USING GIN (search_vector)',
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS job_search_vector_gin',
+    'ALTER TABLE "jobAccess_job" DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _sqlite_has_fts5(conn):
+    with conn.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def install(schema_editor):
+    """Create the backend's search structures and index every job.
+
+    Idempotent, so it can be re-run (rebuild_search_index) after a migration
+    rebuilds jobAccess_job on SQLite, which drops the sync triggers.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite' and not _sqlite_has_fts5(schema_editor.connection):
+        return  # Searches keep using icontains
+    for sql in {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL}.get(vendor, []):
+        schema_editor.execute(sql)
+    _available.clear()
+
+
+def uninstall(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL}.get(vendor, []):
+        schema_editor.execute(sql)
+    _available.clear()
+
+
+def parse_query(text):
+    """Split user input into ('word' | 'prefix' | 'phrase', words) terms.
+
+    "quoted text" is a phrase, a trailing * makes a prefix search, and tokens
+    joined by punctuation (node.js) are matched as a phrase of their parts.
+    """
+    terms = []
+    for quoted, bare in _QUERY_TOKEN_RE.findall(text or ''):
+        words = _WORD_RE.findall(quoted if quoted else bare)
+        if not words:
+            continue
+        if quoted or len(words) > 1:
+            terms.append(('phrase', words))
+        elif bare.endswith('*'):
+            terms.append(('prefix', words))
+        else:
+            terms.append(('word', words))
+    return terms
+
+
+def fts5_query(terms):
+    parts = []
+    for kind, words in terms:
+        quoted = '"%s"' % ' '.join(words)
+        parts.append(quoted + '*' if kind == 'prefix' else quoted)
+    return ' '.join(parts)
+
+
+def tsquery(terms):
+    parts = []
+    for kind, words in terms:
+        if kind == 'phrase':
+            parts.append('(%s)' % ' <-> '.join(words))
+        elif kind == 'prefix':
+            parts.append(f'{words[0]}:*')
+        else:
+            parts.append(words[0])
+    return ' & '.join(parts)
+
+
+class Match(models.Lookup):
+    """FTS5 `column MATCH query`, used on JobSearchDocument.document."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+JobSearchDocument._meta.get_field('document').register_lookup(Match)
+
+
+def backend():
+    """'fts5', 'postgres' or None when only icontains is available."""
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'sqlite':
+        if connection.alias not in _available:
+            _available[connection.alias] = 'job_search' in connection.introspection.table_names()
+        return 'fts5' if _available[connection.alias] else None
+    return None
+
+
+def search_jobs(qs, text):
+    """Restrict a Job queryset to matches for text, ordered best match first."""
+    terms = parse_query(text)
+    if not terms:
+        return qs.order_by('-posted_date')
+    kind = backend()
+    if kind == 'fts5':
+        return (
+            qs.filter(search_document__document__match=fts5_query(terms))
+            .order_by('search_document__rank', '-posted_date')
+        )
+    if kind == 'postgres':
+        query = tsquery(terms)
+        table = qs.model._meta.db_table
+        return (
+            qs.filter(RawSQL(f'"{table}".search_vector @@ to_tsquery(\'english\', %s)', [query],
+                             output_field=models.BooleanField()))
+            .annotate(search_rank=RawSQL(
+                f'ts_rank_cd("{table}".search_vector, to_tsquery(\'english\', %s))', [query],
+                output_field=models.FloatField()))
+            .order_by('-search_rank', '-posted_date')
+        )
+    text = text.strip()
+    return qs.filter(
+        Q(title__icontains=text) | Q(company_name__icontains=text)
+        | Q(location__icontains=text) | Q(description__icontains=text)
+    ).order_by('-posted_date')
@@ -0,0 +1,114 @@
+# jobAccess/serializers.py - Shared job payloads for the JSON APIs and admin board
+#
+# job_values() turns any queryset that reaches Job (directly, or through a
+# prefix such as "job__" on Bookmark/Application) into one values() query
+# carrying the job columns, its category name and its application count, so
+# serializing a page never issues per-row queries. A fields= selection
+# narrows both the payload and the columns read.
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from accounts.models import Application
+
+EXCERPT_WORDS = 40
+EXCERPT_LENGTH = 300
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def _text(value):
+    # job_detail has always sent salaries as strings; clients parse them
+    return str(value) if value is not None else None
+
+
+# Output field -> (column relative to the job, formatter). "applications"
+# comes from the application_count annotation instead of a column.
+JOB_FIELDS = {
+    'id': ('id', None),
+    'title': ('title', None),
+    'company_name': ('company_name', None),
+    'location': ('location', None),
+    'place': ('place', None),
+    'is_remote': ('is_remote', None),
+    'job_type': ('job_type', None),
+    'category': ('category__name', None),
+    'is_active': ('is_active', None),
+    'posted_date': ('posted_date', _date),
+    'salary_min': ('salary_min', _text),
+    'salary_max': ('salary_max', _text),
+    'applications': (None, None),
+    'excerpt': ('excerpt', None),
+    'description': ('description', None),
+}
+# What list payloads carry when no fields= is given
+DEFAULT_FIELDS = tuple(name for name in JOB_FIELDS if name not in ('excerpt', 'description'))
+
+
+def make_excerpt(text):
+    """The first EXCERPT_WORDS words of text, at most EXCERPT_LENGTH characters."""
+    words = (text or '').split()
+    excerpt = ' '.join(words[:EXCERPT_WORDS])
+    if len(excerpt) > EXCERPT_LENGTH:
+        excerpt = excerpt[:EXCERPT_LENGTH - 1].rsplit(' ', 1)[0]
+    return excerpt + '…' if excerpt != ' '.join(words) else excerpt
+
+
+def parse_fields(text, allowed=JOB_FIELDS):
+    """Field names from a comma-separated fields= value in allowed order, or None if empty.
+
+    Raises ValueError naming any unknown fields.
+    """
+    names = {name.strip() for name in (text or '').split(',') if name.strip()}
+    if not names:
+        return None
+    unknown = names - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in allowed if name in names)
+
+
+def application_count(prefix=''):
+    """Correlated COUNT of applications for the job at prefix (no GROUP BY on the outer query)."""
+    counts = (
+        Application.objects.filter(job=OuterRef(f'{prefix}id'))
+        .order_by().values('job').annotate(n=Count('id')).values('n')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def _fields(description, fields):
+    if fields is None:
+        return DEFAULT_FIELDS + ('description',) if description else DEFAULT_FIELDS
+    return fields
+
+
+def job_values(qs, prefix='', description=False, extra=(), fields=None):
+    """qs as dict rows holding what serialize_job needs for fields, plus any extra names.
+
+    Only the columns behind the requested fields are selected (the job id
+    always is), so leaving out description skips the widest column.
+    """
+    columns = [f'{prefix}id']
+    for name in _fields(description, fields):
+        column = JOB_FIELDS[name][0]
+        if column is not None and prefix + column not in columns:
+            columns.append(prefix + column)
+    if 'applications' in _fields(description, fields):
+        qs = qs.annotate(application_count=application_count(prefix))
+        columns.append('application_count')
+    return qs.values(*columns, *[name for name in extra if name not in columns])
+
+
+def serialize_job(row, prefix='', description=False, fields=None):
+    data = {}
+    for name in _fields(description, fields):
+        column, formatter = JOB_FIELDS[name]
+        if column is None:
+            data[name] = row['application_count']
+        else:
+            value = row[prefix + column]
+            data[name] = formatter(value) if formatter else value
+    return data
@@ -0,0 +1,133 @@
+# jobAccess/signals.py - Mark recommendations stale, keep suggestions current
+# and bump API versions when jobs, skills or interactions change
+
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Application, Bookmark, Notification, Profile
+from . import fuzzy, skills, suggest, versions
+from .facets import invalidate_facets
+from .geo import apply_location
+from .models import Job, JobCategory, JobRecommendation, Skill
+from .recommendations import RECENT_JOBS_CACHE_KEY, mark_dirty
+from .serializers import make_excerpt
+
+
+@receiver(pre_save, sender=Job)
+def job_saving(sender, instance, **kwargs):
+    # Remember what the in-process indexes hold for this job so post_save can diff it,
+    # geocode new or changed locations and refresh the excerpt list pages show
+    old = Job.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._suggest_fields = suggest.job_fields(old)
+    instance._fuzzy_fields = fuzzy.job_fields(old)
+    if old is None or old.location != instance.location:
+        apply_location(instance)
+    if old is None or old.description != instance.description:
+        instance.excerpt = make_excerpt(instance.description)
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, **kwargs):
+    mark_dirty('job', [instance.pk])
+    cache.delete(RECENT_JOBS_CACHE_KEY)
+    invalidate_facets()
+    versions.bump(versions.JOBS, versions.job_key(instance.pk))
+    suggest.job_changed(getattr(instance, '_suggest_fields', None), suggest.job_fields(instance))
+    fuzzy.job_changed(instance.pk, getattr(instance, '_fuzzy_fields', None), fuzzy.job_fields(instance))
+
+
+@receiver(pre_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    # The cascade drops these users' rows; refill their lists on the next refresh
+    users = JobRecommendation.objects.filter(job=instance).values_list('user_id', flat=True)
+    mark_dirty('user', users)
+    cache.delete(RECENT_JOBS_CACHE_KEY)
+    invalidate_facets()
+    versions.bump(versions.JOBS, versions.job_key(instance.pk))
+    suggest.job_changed(suggest.job_fields(instance), None)
+    fuzzy.job_changed(instance.pk, fuzzy.job_fields(instance), None)
+    suggest.skills_changed(instance.required_skills.values_list('name', flat=True), -1)
+
+
+@receiver(m2m_changed, sender=Job.required_skills.through)
+def job_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        mark_dirty('job', [instance.pk])
+    elif action == 'pre_clear':
+        mark_dirty('job', instance.jobs.values_list('id', flat=True))
+    else:
+        mark_dirty('job', pk_set)
+
+    delta = -1 if action == 'post_remove' else 1
+    if action == 'pre_clear':
+        suggest.invalidate()
+    elif not reverse:
+        suggest.skills_changed(Skill.objects.filter(id__in=pk_set).values_list('name', flat=True), delta)
+    else:
+        suggest.skills_changed([instance.name] * len(pk_set), delta)
+
+
+@receiver(post_save, sender=Skill)
+def skill_saved(sender, instance, created, **kwargs):
+    skills.skills_changed()
+    if created:
+        suggest.skills_changed([instance.name], 1)
+    else:
+        suggest.invalidate()  # Possibly renamed
+
+
+@receiver(post_delete, sender=Skill)
+def skill_deleted(sender, instance, **kwargs):
+    skills.skills_changed()
+    suggest.invalidate()
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+def profile_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        mark_dirty('user', [instance.user_id])
+    elif action == 'pre_clear':
+        mark_dirty('user', instance.profile_set.values_list('user_id', flat=True))
+    else:
+        mark_dirty('user', Profile.objects.filter(id__in=pk_set).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_save, sender=Bookmark)
+@receiver(post_delete, sender=Application)
+@receiver(post_delete, sender=Bookmark)
+def interaction_changed(sender, instance, **kwargs):
+    interactions_changed(sender, instance.user_id, [instance.job_id])
+
+
+def interactions_changed(model, user_id, job_ids):
+    """What saving Application/Bookmark rows triggers; bulk writes call it directly."""
+    # A user's history drives their collaborative-filtering candidates
+    mark_dirty('user', [user_id])
+    if model is Application:
+        # Job payloads carry application counts
+        versions.bump(
+            versions.user_key(user_id, 'applications'), versions.JOBS,
+            *[versions.job_key(job_id) for job_id in job_ids],
+        )
+    else:
+        versions.bump(versions.user_key(user_id, 'bookmarks'))
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    versions.bump(versions.user_key(instance.user_id, 'notifications'))
+
+
+@receiver(post_save, sender=JobCategory)
+@receiver(post_delete, sender=JobCategory)
+def category_changed(sender, instance, **kwargs):
+    # Category facets are labelled by name
+    invalidate_facets()
+    versions.bump(versions.JOBS, versions.CATEGORIES)
@@ -0,0 +1,121 @@
+# jobAccess/skills.py - Detect Skill names in free text
+
+from collections import deque
+
+from . import suggest
+from .memindex import ProcessIndex
+from .models import Job, Skill
+from .recommendations import mark_dirty
+
+SKILLS_VERSION_KEY = 'skills:version'
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over every Skill name.
+
+    A single pass over the text reports all skills it mentions, however many
+    skills exist. Matches must sit on word boundaries, so "Java" is found in
+    "Java/Spring" but not in "JavaScript".
+    """
+
+    def __init__(self, skills):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for skill_id, name in skills:
+            key = (name or '').strip().lower()
+            if not key:
+                continue
+            state = 0
+            for ch in key:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] += ((skill_id, len(key)),)
+
+        # Breadth-first so every fail target is complete before it is used
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def find(self, text):
+        """Return the ids of skills named in text."""
+        text = (text or '').lower()
+        goto, fail, out = self.goto, self.fail, self.out
+        last = len(text) - 1
+        found = set()
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for skill_id, length in out[state]:
+                start = i - length + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (i == last or not text[i + 1].isalnum()):
+                    found.add(skill_id)
+        return found
+
+
+def build_matcher():
+    return SkillMatcher(Skill.objects.values_list('id', 'name'))
+
+
+_matcher = ProcessIndex(SKILLS_VERSION_KEY, build_matcher)
+
+
+def get_matcher():
+    """Process-wide matcher, rebuilt after any skill is added, renamed or removed."""
+    return _matcher.get()
+
+
+def skills_changed():
+    """Have every process rebuild its matcher; the Skill signals call this."""
+    _matcher.publish()
+
+
+def link_job_skills(job_skills):
+    """Make each job's required_skills exactly the given skills; {job_id: skill ids}.
+
+    Links the jobs no longer mention are deleted and missing ones bulk
+    inserted. Bulk writes send no m2m_changed, so the jobs are marked dirty
+    and the suggestion index rebuilt here. Returns the number of links inserted.
+    """
+    through = Job.required_skills.through
+    wanted = {(job_id, skill_id) for job_id, skill_ids in job_skills.items() for skill_id in skill_ids}
+    existing = {}
+    rows = through.objects.filter(job_id__in=list(job_skills)).values_list('id', 'job_id', 'skill_id')
+    for link_id, job_id, skill_id in rows:
+        existing[(job_id, skill_id)] = link_id
+    stale = [link_id for pair, link_id in existing.items() if pair not in wanted]
+    if stale:
+        through.objects.filter(id__in=stale).delete()
+    missing = wanted - existing.keys()
+    through.objects.bulk_create(
+        [through(job_id=job_id, skill_id=skill_id) for job_id, skill_id in missing],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    changed = {job_id for job_id, _ in missing | (existing.keys() - wanted)}
+    if changed:
+        mark_dirty('job', changed)
+        suggest.invalidate()
+    return len(missing)
+
+
+def extract_job_skills(job):
+    """Set a job's required_skills to the skills named in its title or description."""
+    skill_ids = get_matcher().find(f'{job.title} {job.description}')
+    job.required_skills.set(skill_ids)
+    return skill_ids
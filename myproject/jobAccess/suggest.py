@@ -0,0 +1,175 @@
+# jobAccess/suggest.py - Search-as-you-type suggestions
+#
+# Distinct job titles, companies and locations (weighted by active job count)
+# and skill names (weighted by how many jobs require them) live in a sorted
+# in-process list searched with bisect, so lookups never touch the database.
+# Job and skill writes patch the index through memindex.ProcessIndex.
+
+from bisect import bisect_left, insort
+from heapq import nlargest
+
+from django.db.models import Count
+
+from .memindex import ProcessIndex
+from .models import Job, Skill
+
+SUGGEST_VERSION_KEY = 'suggest:version'
+KINDS = ('title', 'company', 'location', 'skill')
+JOB_FIELDS = (('title', 'title'), ('company', 'company_name'), ('location', 'location'))
+MAX_LIMIT = 20
+# Memoised answers per index; short prefixes are the common and expensive case
+RESULT_CACHE_SIZE = 2048
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+class PrefixIndex:
+    """Weighted (kind, label) entries searchable by the prefix of any word."""
+
+    def __init__(self):
+        self.weights = {}   # (kind, normalized label) -> weight
+        self.labels = {}    # (kind, normalized label) -> display label
+        self.keys = []      # sorted (key, kind, normalized label); one key per word start
+        self._results = {}
+
+    @classmethod
+    def from_counts(cls, counts):
+        """Build from (kind, label, weight) rows in one sort."""
+        index = cls()
+        for kind, label, weight in counts:
+            ident = (kind, normalize(label))
+            if not ident[1] or weight <= 0:
+                continue
+            index.labels.setdefault(ident, ' '.join(label.split()))
+            index.weights[ident] = index.weights.get(ident, 0) + weight
+        index.keys = sorted(key for ident in index.weights for key in cls._keys(ident))
+        return index
+
+    @staticmethod
+    def _keys(ident):
+        kind, norm = ident
+        starts = [0] + [i + 1 for i, ch in enumerate(norm) if ch == ' ']
+        return [(norm[i:], kind, norm) for i in starts]
+
+    def add(self, kind, label, delta=1):
+        ident = (kind, normalize(label))
+        if not ident[1] or not delta:
+            return
+        old = self.weights.get(ident, 0)
+        new = old + delta
+        # Forget only the memoised answers this entry can appear in
+        words = [key[0] for key in self._keys(ident)]
+        self._results = {
+            memo_key: results for memo_key, results in self._results.items()
+            if not any(word.startswith(memo_key[0]) for word in words)
+        }
+        if new > 0:
+            self.weights[ident] = new
+            self.labels.setdefault(ident, ' '.join(label.split()))
+            if old <= 0:
+                for key in self._keys(ident):
+                    insort(self.keys, key)
+        elif old > 0:
+            del self.weights[ident]
+            del self.labels[ident]
+            for key in self._keys(ident):
+                pos = bisect_left(self.keys, key)
+                if pos < len(self.keys) and self.keys[pos] == key:
+                    del self.keys[pos]
+
+    def suggest(self, prefix, limit=8, kinds=None):
+        """Best `limit` matches for prefix as [{'text', 'type', 'weight'}], heaviest first."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        memo_key = (prefix, limit, kinds)
+        if memo_key in self._results:
+            return self._results[memo_key]
+
+        found = set()
+        keys = self.keys
+        for pos in range(bisect_left(keys, (prefix,)), len(keys)):
+            key, kind, norm = keys[pos]
+            if not key.startswith(prefix):
+                break
+            if kinds is None or kind in kinds:
+                found.add((kind, norm))
+        # Heaviest first; among equals prefer labels that start with the prefix, then shorter ones
+        best = nlargest(limit, found, key=lambda ident: (
+            self.weights[ident], ident[1].startswith(prefix), -len(ident[1]), ident[1]
+        ))
+        results = [
+            {'text': self.labels[ident], 'type': ident[0], 'weight': self.weights[ident]}
+            for ident in best
+        ]
+        if len(self._results) >= RESULT_CACHE_SIZE:
+            self._results.clear()
+        self._results[memo_key] = results
+        return results
+
+
+def build_index():
+    active = Job.objects.filter(is_active=True)
+    counts = []
+    for kind, field in JOB_FIELDS:
+        rows = active.values(field).annotate(n=Count('id')).values_list(field, 'n')
+        counts.extend((kind, label, n) for label, n in rows)
+    # Every skill is suggestible; demand from job postings ranks it higher
+    skills = Skill.objects.annotate(n=Count('jobs')).values_list('name', 'n')
+    counts.extend(('skill', name, n + 1) for name, n in skills)
+    return PrefixIndex.from_counts(counts)
+
+
+_index = ProcessIndex(SUGGEST_VERSION_KEY, build_index)
+
+
+def get_index():
+    return _index.get()
+
+
+def suggest(prefix, limit=8, kinds=None):
+    return get_index().suggest(prefix, min(limit, MAX_LIMIT), kinds)
+
+
+def _publish(deltas):
+    """Apply (kind, label, delta) rows to this process's index and notify the others."""
+    def patch(index):
+        for kind, label, delta in deltas:
+            index.add(kind, label, delta)
+
+    _index.publish(patch if deltas is not None else None)
+
+
+def job_fields(job):
+    """Snapshot of the indexed fields, or None for jobs that contribute nothing."""
+    if job is None or not job.is_active:
+        return None
+    return {kind: getattr(job, field) for kind, field in JOB_FIELDS}
+
+
+def job_changed(old, new):
+    """Publish the difference between two job_fields snapshots."""
+    deltas = []
+    for kind, _ in JOB_FIELDS:
+        before = old and old[kind]
+        after = new and new[kind]
+        if normalize(before) != normalize(after):
+            if before:
+                deltas.append((kind, before, -1))
+            if after:
+                deltas.append((kind, after, 1))
+    if deltas:
+        _publish(deltas)
+
+
+def skills_changed(names, delta):
+    deltas = [('skill', name, delta) for name in names]
+    if deltas:
+        _publish(deltas)
+
+
+def invalidate():
+    """Force every process to rebuild, for changes too broad to apply as deltas."""
+    _publish(None)
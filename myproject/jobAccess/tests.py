@@ -1,3 +1,1225 @@
-from django.test import TestCase
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import Application, Bookmark
+from .listcache import stats as listing_cache_stats
+from .models import Job, JobCategory
+
+
+class CacheClearingTestCase(TestCase):
+    """Version counters and cached listings outlive each test's rolled-back data."""
+
+    def setUp(self):
+        cache.clear()
+
+
+class JobListQueryBudgetTests(CacheClearingTestCase):
+    """Serializing a page of jobs must cost the same queries at any page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("applicant", password="pw")
+        others = [User.objects.create_user(f"other{i}", password="pw") for i in range(3)]
+        category = JobCategory.objects.create(name="Engineering")
+        for i in range(30):
+            job = Job.objects.create(
+                title=f"Engineer {i}", company_name="Acme", location="Lahore",
+                description="Build things", job_type="Full-time",
+                category=category if i % 2 else None,
+            )
+            for other in others[: i % 4]:
+                Application.objects.create(user=other, job=job)
+            if i % 3 == 0:
+                Application.objects.create(user=cls.user, job=job)
+                Bookmark.objects.create(user=cls.user, job=job)
+
+    def test_jobs_collection_budget(self):
+        for per_page in (5, 30):
+            # COUNT for the paginator + one page query
+            with self.assertNumQueries(2):
+                response = self.client.get("/accounts/api/jobs/", {"per_page": per_page})
+            items = response.json()["items"]
+            self.assertEqual(len(items), per_page)
+
+        items = {item["title"]: item for item in self.client.get("/accounts/api/jobs/", {"per_page": 30}).json()["items"]}
+        self.assertEqual(items["Engineer 3"]["applications"], 4)
+        self.assertEqual(items["Engineer 3"]["category"], "Engineering")
+        self.assertIsNone(items["Engineer 4"]["category"])
+
+    def test_job_detail_budget(self):
+        job = Job.objects.get(title="Engineer 7")
+        with self.assertNumQueries(1):
+            data = self.client.get(f"/accounts/api/jobs/{job.id}/").json()
+        self.assertEqual(data["applications"], 3)
+        self.assertEqual(data["description"], "Build things")
+        # Salaries stay strings, as job_detail has always sent them
+        Job.objects.filter(id=job.id).update(salary_min=50000)
+        data = self.client.get(f"/accounts/api/jobs/{job.id}/").json()
+        self.assertEqual((data["salary_min"], data["salary_max"]), ("50000", None))
+
+    def test_user_lists_budget(self):
+        self.client.force_login(self.user)
+        # Session and user lookups + one list query
+        with self.assertNumQueries(3):
+            bookmarks = self.client.get("/accounts/api/bookmarks/").json()["items"]
+        with self.assertNumQueries(3):
+            applications = self.client.get("/accounts/api/applications/").json()["items"]
+        self.assertEqual(len(bookmarks), 10)
+        self.assertEqual(len(applications), 10)
+        self.assertEqual(applications[0]["status"], "applied")
+
+
+class CursorPaginationTests(CacheClearingTestCase):
+    """Cursor pages must walk every row exactly once, newest first, ties broken by id."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("walker", password="pw")
+        for i in range(25):
+            job = Job.objects.create(
+                title=f"Analyst {i}", company_name="Acme", location="Lahore",
+                description="Crunch numbers", job_type="Contract",
+            )
+            Bookmark.objects.create(user=cls.user, job=job)
+        # Identical timestamps force the id tie-breaker
+        first = Job.objects.order_by("id").first()
+        Job.objects.filter(id__lte=first.id + 9).update(posted_date=first.posted_date)
+
+    def walk(self, url, **params):
+        seen, cursor = [], ""
+        while cursor is not None:
+            data = self.client.get(url, {**params, "cursor": cursor, "limit": 7}).json()
+            self.assertLessEqual(len(data["items"]), 7)
+            seen.extend(item["id"] for item in data["items"])
+            cursor = data["next_cursor"]
+        return seen
+
+    def test_jobs_cursor_walk(self):
+        expected = list(Job.objects.order_by("-posted_date", "-id").values_list("id", flat=True))
+        self.assertEqual(self.walk("/accounts/api/jobs/", job_type="Contract"), expected)
+        data = self.client.get("/accounts/api/jobs/", {"cursor": "", "total": 1}).json()
+        self.assertEqual(data["total"], 25)
+        self.assertTrue(data["total_is_approximate"])
+
+    def test_bookmarks_cursor_walk(self):
+        self.client.force_login(self.user)
+        self.assertEqual(sorted(self.walk("/accounts/api/bookmarks/")), sorted(Job.objects.values_list("id", flat=True)))
+        data = self.client.get("/accounts/api/bookmarks/", {"cursor": "", "limit": 1, "total": 1}).json()
+        self.assertEqual(data["total"], 25)
+
+    def test_notifications_uncapped_without_cursor(self):
+        from accounts.models import Notification
+
+        Notification.objects.bulk_create([Notification(user=self.user, message=f"n{i}") for i in range(60)])
+        self.client.force_login(self.user)
+        data = self.client.get("/accounts/api/notifications/").json()
+        self.assertEqual((len(data["items"]), data["unread"]), (60, 60))
+        self.assertNotIn("next_cursor", data)
+        data = self.client.get("/accounts/api/notifications/", {"cursor": "", "limit": 1}).json()
+        self.assertEqual((len(data["items"]), data["unread"]), (1, 60))
+        self.assertIsNotNone(data["next_cursor"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/accounts/api/jobs/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_replayed_elsewhere(self):
+        from accounts.views import encode_cursor
+
+        self.client.force_login(self.user)
+        recommendation = encode_cursor("recommendations", 0.5, 10)
+        bookmarks = self.client.get("/accounts/api/bookmarks/", {"cursor": ""}).json()["next_cursor"]
+        for url, cursor in [
+            ("/accounts/api/jobs/", recommendation),
+            ("/accounts/api/bookmarks/", recommendation),
+            ("/accounts/api/notifications/", recommendation),
+            ("/accounts/api/jobs/", bookmarks),
+            ("/accounts/api/recommendations/", bookmarks),
+            # Right salt, wrong value types
+            ("/accounts/api/jobs/", encode_cursor("jobs", 0.5, 10)),
+            ("/accounts/api/jobs/", encode_cursor("jobs", "2025-01-01T00:00:00", "10")),
+        ]:
+            self.assertEqual(self.client.get(url, {"cursor": cursor}).status_code, 400, url)
+
+
+@override_settings(CONDITIONAL_GET=True)
+class ConditionalGetTests(CacheClearingTestCase):
+    """Unchanged resources answer If-None-Match with 304 without touching their tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("poller", password="pw")
+        cls.job = Job.objects.create(
+            title="Designer", company_name="Acme", location="Lahore",
+            description="Draw things", job_type="Full-time",
+        )
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_job_detail_etag(self):
+        url = f"/accounts/api/jobs/{self.job.id}/"
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(url, etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(user=self.user, job=self.job)
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["applications"], 1)
+
+    def test_off_without_shared_cache(self):
+        with override_settings(CONDITIONAL_GET=False):
+            response = self.client.get(f"/accounts/api/jobs/{self.job.id}/")
+            self.assertFalse(response.has_header("ETag"))
+            response = self.client.get(f"/accounts/api/jobs/{self.job.id}/", HTTP_IF_NONE_MATCH="*")
+            self.assertEqual(response.status_code, 200)
+
+    def test_user_lists_etag(self):
+        self.client.force_login(self.user)
+        for url in ("/accounts/api/bookmarks/", "/accounts/api/notifications/"):
+            etag = self.client.get(url)["ETag"]
+            # Session and user lookups only
+            with self.assertNumQueries(2):
+                self.assertEqual(self.revalidate(url, etag).status_code, 304)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(f"/accounts/api/jobs/{self.job.id}/bookmark/")
+            self.assertEqual(self.revalidate(url, etag).status_code, 200)
+            Bookmark.objects.all().delete()
+
+
+class ListingCacheTests(CacheClearingTestCase):
+    """Equivalent listing requests share one cached response until a job changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Job.objects.create(
+            title="Writer", company_name="Acme", location="Lahore",
+            description="Write things", job_type="Part-time",
+        )
+
+    def test_normalized_hit_and_invalidation(self):
+        self.assertEqual(self.client.get("/accounts/api/jobs/", {"job_type": "Part-time"})["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = self.client.get("/accounts/api/jobs/", {"page": "1", "job_type": "Part-time", "utm": "x"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.json()["total"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(
+                title="Editor", company_name="Acme", location="Lahore",
+                description="Edit things", job_type="Part-time",
+            )
+        response = self.client.get("/accounts/api/jobs/", {"job_type": "Part-time"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["total"], 2)
+
+        stats = listing_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["rebuilds"]), (1, 2, 2))
+
+    def test_unstripped_values_keyed_apart(self):
+        # The view filters on the raw value, so " Part-time" matches nothing
+        padded = self.client.get("/accounts/api/jobs/", {"job_type": " Part-time"})
+        self.assertEqual((padded["X-Cache"], padded.json()["total"]), ("MISS", 0))
+        plain = self.client.get("/accounts/api/jobs/", {"job_type": "Part-time"})
+        self.assertEqual((plain["X-Cache"], plain.json()["total"]), ("MISS", 1))
+
+
+class BatchInteractionTests(CacheClearingTestCase):
+    """Batch endpoints cost the same queries for one job or many."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("batcher", password="pw")
+        User.objects.create_user("reviewer", password="pw", is_staff=True)
+        cls.jobs = [
+            Job.objects.create(
+                title=f"Tester {i}", company_name="Acme", location="Lahore",
+                description="Test things", job_type="Full-time",
+            )
+            for i in range(20)
+        ]
+
+    def post(self, url, ids):
+        return self.client.post(url, {"ids": ids}, content_type="application/json").json()
+
+    def test_apply_batch(self):
+        self.client.force_login(self.user)
+        ids = [job.id for job in self.jobs]
+        Application.objects.create(user=self.user, job=self.jobs[0])
+        # Session, user, savepoints, job and existing lookups, staff lookup, four bulk inserts
+        with self.assertNumQueries(11):
+            data = self.post("/accounts/api/jobs/apply/", ids + [999999])
+        self.assertEqual(data["applied"], ids[1:])
+        self.assertEqual(data["already_applied"], ids[:1])
+        self.assertEqual(data["missing"], [999999])
+        self.assertEqual(Application.objects.filter(user=self.user).count(), 20)
+        # One notification for the applicant and one for the staff reviewer per job
+        self.assertEqual(self.user.notifications.count(), 19)
+        self.assertEqual(self.post("/accounts/api/jobs/apply/", ids)["applied"], [])
+
+    def test_bookmark_batch_and_fetch(self):
+        self.client.force_login(self.user)
+        ids = [job.id for job in self.jobs[:5]]
+        self.assertEqual(self.post("/accounts/api/jobs/bookmark/", ids)["bookmarked"], ids)
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 5)
+        response = self.client.delete("/accounts/api/jobs/bookmark/", {"ids": ids[:2]}, content_type="application/json")
+        self.assertEqual(response.json()["removed"], ids[:2])
+
+        data = self.client.get("/accounts/api/jobs/", {"ids": f"{ids[3]}, {ids[1]},999999,"}).json()
+        self.assertEqual([item["id"] for item in data["items"]], [ids[3], ids[1]])
+        self.assertEqual(data["missing"], [999999])
+        self.assertEqual(data["items"][0]["description"], "Test things")
+        self.assertEqual(self.client.get("/accounts/api/jobs/", {"ids": f"{ids[3]},0"}).status_code, 400)
+        for bad in ([True], [1.5], [ids[0], -1], ["1e3"], [[ids[0]]]):
+            response = self.client.post("/accounts/api/jobs/bookmark/", {"ids": bad}, content_type="application/json")
+            self.assertEqual(response.status_code, 400, bad)
+
+
+class SkillExtractionTests(CacheClearingTestCase):
+    """Skill names are found on word boundaries; re-extraction replaces a job's links."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from .models import Skill
+
+        cls.skills = {name: Skill.objects.create(name=name).id
+                      for name in ("Java", "JavaScript", "Machine Learning", "Learning", "SQL")}
+
+    def setUp(self):
+        from . import skills
+
+        super().setUp()
+        skills._matcher._index = None
+
+    def test_matcher(self):
+        from .skills import SkillMatcher
+
+        matcher = SkillMatcher([(skill_id, name) for name, skill_id in self.skills.items()] + [(99, "  ")])
+        ids = {skill_id: name for name, skill_id in self.skills.items()}
+
+        def found(text):
+            return sorted(ids[skill_id] for skill_id in matcher.find(text))
+
+        self.assertEqual(found("Senior JavaScript engineer"), ["JavaScript"])
+        self.assertEqual(found("Java/Spring, some sql"), ["Java", "SQL"])
+        self.assertEqual(found("MACHINE LEARNING research"), ["Learning", "Machine Learning"])
+        self.assertEqual(found("NoSQL, Javas"), [])
+        self.assertEqual(found(None), [])
+
+    def test_link_job_skills_replaces_stale_links(self):
+        from .skills import link_job_skills
+
+        job = Job.objects.create(title="Dev", company_name="Acme", location="Lahore",
+                                 description="x", job_type="Full-time")
+        java, sql, learning = self.skills["Java"], self.skills["SQL"], self.skills["Learning"]
+        self.assertEqual(link_job_skills({job.id: {java, sql}}), 2)
+        self.assertEqual(link_job_skills({job.id: {java, sql}}), 0)
+        self.assertEqual(link_job_skills({job.id: {sql, learning}}), 1)
+        self.assertEqual(set(job.required_skills.values_list("id", flat=True)), {sql, learning})
+        self.assertEqual(link_job_skills({job.id: set()}), 0)
+        self.assertFalse(job.required_skills.exists())
+
+    def test_link_job_skills_notifies(self):
+        from .models import RecommendationDirtyMark
+        from .skills import link_job_skills
+        from .suggest import suggest
+
+        job = Job.objects.create(title="Dev", company_name="Acme", location="Lahore",
+                                 description="x", job_type="Full-time")
+        self.assertEqual(suggest("sq", kinds=("skill",))[0]["weight"], 1)
+        RecommendationDirtyMark.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            link_job_skills({job.id: {self.skills["SQL"]}})
+        self.assertEqual(list(RecommendationDirtyMark.objects.values_list("kind", "object_id")), [("job", job.id)])
+        self.assertEqual(suggest("sq", kinds=("skill",))[0]["weight"], 2)
+
+    def test_matcher_follows_renames(self):
+        from .models import Skill
+        from .skills import get_matcher
+
+        self.assertEqual(get_matcher().find("Rust and SQL"), {self.skills["SQL"]})
+        with self.captureOnCommitCallbacks(execute=True):
+            skill = Skill.objects.get(id=self.skills["SQL"])
+            skill.name = "Rust"
+            skill.save()
+        self.assertEqual(get_matcher().find("Rust and SQL"), {self.skills["SQL"]})
+        self.assertEqual(get_matcher().find("SQL only"), set())
+
+    def test_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        job = Job.objects.create(title="SQL analyst", company_name="Acme", location="Lahore",
+                                 description="Java a plus", job_type="Full-time")
+        job.required_skills.set([self.skills["Machine Learning"]])
+        out = StringIO()
+        call_command("extract_job_skills", batch_size=1, stdout=out)
+        self.assertIn("linked 2 skills", out.getvalue())
+        self.assertEqual(set(job.required_skills.values_list("name", flat=True)), {"Java", "SQL"})
+
+
+class SparseFieldsTests(CacheClearingTestCase):
+    """fields= trims both the payload and the columns read."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.job = Job.objects.create(
+            title="Curator", company_name="Acme", location="Lahore",
+            description=" ".join(f"word{i}" for i in range(100)), job_type="Full-time",
+        )
+
+    def test_fields_projection(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(f"/accounts/api/jobs/{self.job.id}/", {"fields": "title,excerpt"}).json()
+        self.assertEqual(data, {"title": "Curator", "excerpt": " ".join(f"word{i}" for i in range(40)) + "…"})
+        self.assertNotIn("description", queries[0]["sql"])
+        self.assertNotIn("accounts_application", queries[0]["sql"])
+
+        items = self.client.get("/accounts/api/jobs/", {"fields": "id,title", "cursor": ""}).json()["items"]
+        self.assertEqual(items, [{"id": self.job.id, "title": "Curator"}])
+        self.assertEqual(self.client.get("/accounts/api/jobs/", {"fields": "salary"}).status_code, 400)
+
+
+class ExportTests(CacheClearingTestCase):
+    """Staff-only streamed exports, their filters and both output formats."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("exporter", password="pw", is_staff=True)
+        cls.job = Job.objects.create(title="=HYPERLINK(\"http://x\")", company_name="@Acme", location="Lahore",
+                                     description="x", job_type="Full-time")
+        Job.objects.create(title="Archived", company_name="Acme", location="Lahore",
+                           description="x", job_type="Contract", is_active=False)
+
+    def export(self, kind, **params):
+        response = self.client.get(f"/accounts/api/exports/{kind}/", params)
+        if response.streaming:
+            return response, b"".join(response.streaming_content).decode()
+        return response, None
+
+    def test_staff_only(self):
+        self.assertEqual(self.export("jobs")[0].status_code, 403)
+        self.client.force_login(User.objects.create_user("viewer", password="pw"))
+        self.assertEqual(self.export("jobs")[0].status_code, 403)
+
+    def test_bad_requests(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.export("users")[0].status_code, 404)
+        for params in ({"colour": "red"}, {"is_active": "yes"}, {"since": "last week"},
+                       {"format": "xml"}):
+            self.assertEqual(self.export("jobs", **params)[0].status_code, 400, params)
+        self.assertEqual(self.export("applications", user="abc")[0].status_code, 400)
+
+    def test_ndjson(self):
+        import json
+
+        self.client.force_login(self.staff)
+        response, body = self.export("jobs", is_active="true")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.job.id])
+        self.assertEqual(rows[0]["company_name"], "@Acme")
+
+    def test_csv_neutralizes_formulas(self):
+        import csv
+
+        self.client.force_login(self.staff)
+        response, body = self.export("jobs", format="csv", job_type="Full-time")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="jobs.csv"')
+        header, row = list(csv.reader(body.splitlines()))
+        self.assertEqual(header[:3], ["id", "title", "company_name"])
+        self.assertEqual(row[:3], [str(self.job.id), "'=HYPERLINK(\"http://x\")", "'@Acme"])
+
+
+class ServerTimingTests(CacheClearingTestCase):
+    """Every response carries Server-Timing; durations feed per-view percentiles."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.job = Job.objects.create(title="Timer", company_name="Acme", location="Lahore",
+                                     description="x", job_type="Full-time")
+
+    def test_header_counts_queries(self):
+        url = f"/accounts/api/jobs/{self.job.id}/"
+        with CaptureQueriesContext(connection) as queries:
+            header = self.client.get(url)["Server-Timing"]
+        names = [part.strip().split(";")[0] for part in header.split(",")]
+        self.assertEqual(names, ["total", "db", "serialize"])
+        self.assertIn(f'desc="{len(queries)} queries"', header)
+
+    def test_snapshot_percentiles(self):
+        from myproject import timing
+
+        timing._windows.pop("test-view", None)
+        for ms in range(1, 101):
+            timing._observe("test-view", ms / 1000)
+        stats = timing.snapshot()["test-view"]
+        self.assertEqual(stats, {"count": 100, "p50_ms": 51.0, "p90_ms": 91.0, "p99_ms": 100.0, "max_ms": 100.0})
+        timing._windows.pop("test-view")
+
+    def test_streaming_response(self):
+        import json
+
+        self.client.force_login(User.objects.create_user("streamer", password="pw", is_staff=True))
+        with self.assertLogs("myproject.timing", "INFO") as logs:
+            response = self.client.get("/accounts/api/exports/jobs/")
+        self.assertTrue(response.streaming)
+        self.assertIn("Server-Timing", response)
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual(json.loads(body)["id"], self.job.id)
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((line["view"], line["status"], line["bytes"]), ("export_data", 200, None))
+
+
+class MetricsEndpointTests(CacheClearingTestCase):
+    """/metrics sums every process's counter file."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(METRICS_DIR=directory.name, METRICS_TOKEN="secret")
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.directory = directory.name
+
+    def test_exposition(self):
+        job = Job.objects.create(title="Tester", company_name="Acme", location="Lahore",
+                                 description="Test things", job_type="Full-time")
+        self.client.get(f"/accounts/api/jobs/{job.id}/")
+        # Another worker's file, as written by ValueFile in that process
+        from myproject.metrics import ValueFile, _key
+        ValueFile(f"{self.directory}/metrics_1.db").add(
+            _key("http_request_duration_seconds_bucket", {"view": "job_detail", "le": "0.005"}), 2)
+
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{le="+Inf",view="job_detail"} 3', text)
+        self.assertIn('db_queries_total{view="job_detail"}', text)
+        self.assertIn('resume_parse_queue_depth{status="pending"} 0', text)
+
+
+class SlowQueryLogTests(CacheClearingTestCase):
+    """Slow queries are logged once per call, with a plan once per fingerprint."""
+
+    def setUp(self):
+        from myproject import slowlog
+
+        super().setUp()
+        slowlog._explained.clear()
+
+    def test_log_and_fingerprint(self):
+        from myproject.slowlog import normalize, read_entries
+
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE id IN (%s, %s,%s) AND name = 'O''Brien' LIMIT 21"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?",
+        )
+        job = Job.objects.create(title="Tester", company_name="Acme", location="Lahore",
+                                 description="Test things", job_type="Full-time")
+        with tempfile.TemporaryDirectory() as directory:
+            log = f"{directory}/slow.log"
+            with override_settings(SLOW_QUERY_MS=0.000001, SLOW_QUERY_LOG=log):
+                self.client.get(f"/accounts/api/jobs/{job.id}/")
+                self.client.get(f"/accounts/api/jobs/{job.id + 1}/")
+            entries = [e for e in read_entries(log) if "jobAccess_job" in e["sql"]]
+        self.assertEqual(len(entries), 2)
+        self.assertEqual({e["view"] for e in entries}, {"job_detail"})
+        self.assertEqual(entries[0]["fingerprint"], entries[1]["fingerprint"])
+        self.assertTrue(entries[0]["plan"])
+        self.assertNotIn("plan", entries[1])
+
+    def test_file_per_process_and_explain_not_counted(self):
+        import os
+        from myproject import slowlog
+
+        job = Job.objects.create(title="Tester", company_name="Acme", location="Lahore",
+                                 description="Test things", job_type="Full-time")
+        url = f"/accounts/api/jobs/{job.id}/"
+        with override_settings(SLOW_QUERY_MS=0):
+            unlogged = self.client.get(url)["Server-Timing"]
+        with tempfile.TemporaryDirectory() as directory:
+            log = f"{directory}/slow.log"
+            with override_settings(SLOW_QUERY_MS=0.000001, SLOW_QUERY_LOG=log):
+                explained = self.client.get(url)["Server-Timing"]
+            self.assertEqual(os.listdir(directory), [f"slow.{os.getpid()}.log"])
+            self.assertTrue(any(e.get("plan") for e in slowlog.read_entries(log)))
+        self.assertEqual(explained.split('desc="')[1].split('"')[0], unlogged.split('desc="')[1].split('"')[0])
+
+
+class RequestProfilingTests(CacheClearingTestCase):
+    """?_profile= is honoured for staff only and stored for later viewing."""
+
+    def test_cpu_profile(self):
+        staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        user = User.objects.create_user("user", password="pw")
+        with tempfile.TemporaryDirectory() as directory, override_settings(PROFILE_DIR=directory):
+            self.client.force_login(user)
+            self.assertNotIn("X-Profile-Id", self.client.get("/accounts/api/jobs/", {"_profile": "cpu"}))
+            self.assertEqual(self.client.get("/accounts/api/profiles/").status_code, 403)
+
+            self.client.force_login(staff)
+            profile_id = self.client.get("/accounts/api/bookmarks/", {"_profile": "cpu"})["X-Profile-Id"]
+            data = self.client.get(f"/accounts/api/profiles/{profile_id}/", {"sort": "tottime_ms", "limit": 5}).json()
+            self.assertEqual((data["kind"], data["view"], data["status"]), ("cpu", "list_bookmarks", 200))
+            self.assertEqual(len(data["rows"]), 5)
+            response = self.client.get(f"/accounts/api/profiles/{profile_id}/", {"format": "collapsed"})
+            self.assertIn(b"(list_bookmarks)", b"".join(response.streaming_content))
+            response.close()
+
+
+class RecommendationsApiTests(CacheClearingTestCase):
+    """Precomputed rows are paged by (score, id); cold-start users get recent jobs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("reader", password="pw")
+        cls.jobs = [
+            Job.objects.create(title=f"Role {i}", company_name="Acme", location="Lahore",
+                               description="Do things", job_type="Full-time")
+            for i in range(5)
+        ]
+
+    def test_cold_start_is_queued_not_scored_inline(self):
+        from .models import JobRecommendation, RecommendationDirtyMark
+
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get("/accounts/api/recommendations/", {"limit": 3}).json()
+        self.assertEqual(data["source"], "recent")
+        self.assertEqual(len(data["items"]), 3)
+        self.assertFalse(JobRecommendation.objects.exists())
+        self.assertTrue(RecommendationDirtyMark.objects.filter(kind="user", object_id=self.user.id).exists())
+        self.assertLess(len(queries), 10)
+
+    def test_precomputed_paging_and_bad_cursors(self):
+        from accounts.views import encode_cursor
+        from .models import JobRecommendation
+
+        for i, job in enumerate(self.jobs):
+            JobRecommendation.objects.create(user=self.user, job=job, relevance_score=i / 10)
+        self.client.force_login(self.user)
+        seen, cursor = [], ""
+        while cursor is not None:
+            data = self.client.get("/accounts/api/recommendations/", {"limit": 2, "cursor": cursor}).json()
+            self.assertEqual(data["source"], "precomputed")
+            seen += [item["id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+        self.assertEqual(seen, [job.id for job in reversed(self.jobs)])
+
+        for bad in (encode_cursor("recommendations", "2025-01-01", 3),
+                    encode_cursor("recommendations", 0.5, 3, 1),
+                    encode_cursor("recommendations", 0.5),
+                    encode_cursor("recommendations", True, 3),
+                    encode_cursor("jobs", 0.5, 3)):
+            response = self.client.get("/accounts/api/recommendations/", {"cursor": bad})
+            self.assertEqual(response.status_code, 400)
+
+    def test_benchmark_hold_out_leaves_no_cooccurrence(self):
+        from accounts.models import Application
+        from .collaborative import update_cooccurrence
+        from .management.commands.benchmark_recommendations import hold_out_latest
+        from .models import JobCooccurrence
+
+        first, second, third = self.jobs[:3]
+        Application.objects.create(user=self.user, job=first)
+        Application.objects.create(user=self.user, job=second)
+        Application.objects.create(user=self.user, job=third)
+        update_cooccurrence()
+        self.assertTrue(JobCooccurrence.objects.filter(job=first, other=third).exists())
+
+        self.assertEqual(hold_out_latest(), {self.user.id: {third.id}})
+        self.assertFalse(JobCooccurrence.objects.filter(job=third).exists())
+        self.assertFalse(JobCooccurrence.objects.filter(other=third).exists())
+        self.assertTrue(JobCooccurrence.objects.filter(job=first, other=second).exists())
+
+
+class GeoTests(CacheClearingTestCase):
+    """Gazetteer resolution and radius filtering."""
+
+    def test_find_place(self):
+        from .geo import find_place
+
+        cases = {
+            "New York, NY": ("New York", "US"),
+            "Hyderabad, Pakistan": ("Hyderabad", "PK"),
+            "Hyderabad": ("Hyderabad", "IN"),
+            "Lahore, Punjab 54000, Pakistan": ("Lahore", "PK"),
+            "Toronto, Canada": ("Toronto", "CA"),
+            "SF": ("San Francisco", "US"),
+        }
+        for text, (name, country) in cases.items():
+            place = find_place(text)
+            self.assertEqual((place.name, place.country), (name, country), text)
+        for text in ("Albany, NY", "Rochester, NY", "Baton Rouge, LA", "Paris, TX", "Suite 4, Lahore", ""):
+            self.assertIsNone(find_place(text), text)
+
+    def test_radius_filter(self):
+        lahore = Job.objects.create(title="Near", company_name="Acme", location="Lahore, Pakistan",
+                                    description="x", job_type="Full-time")
+        Job.objects.create(title="Far", company_name="Acme", location="Karachi",
+                           description="x", job_type="Full-time")
+        self.assertTrue(lahore.place.startswith("Lahore"))
+        data = self.client.get("/accounts/api/jobs/", {"near": "Lahore", "radius_km": 100}).json()
+        self.assertEqual([item["id"] for item in data["items"]], [lahore.id])
+        self.assertEqual(data["items"][0]["distance_km"], 0.0)
+        for radius in ("nan", "inf", "-5", "0", "abc", "500.5"):
+            response = self.client.get("/accounts/api/jobs/", {"near": "Lahore", "radius_km": radius})
+            self.assertEqual(response.status_code, 400, radius)
+        self.assertEqual(self.client.get("/accounts/api/jobs/", {"near": "Atlantis"}).status_code, 400)
+
+    def test_normalize_locations_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        for location in ("Lahore", "Karachi", "Remote"):
+            Job.objects.create(title="Dev", company_name="Acme", location=location,
+                               description="x", job_type="Full-time")
+        Job.objects.update(place="", latitude=None, longitude=None, is_remote=False)
+        out = StringIO()
+        call_command("normalize_locations", batch_size=2, stdout=out)
+        self.assertIn("Resolved 2 job locations (1 remote)", out.getvalue())
+        self.assertEqual(Job.objects.exclude(latitude=None).count(), 2)
+
+
+class FuzzySearchTests(CacheClearingTestCase):
+    """Trigram ranking and the in-process fallback's filtering."""
+
+    def setUp(self):
+        from . import fuzzy
+
+        super().setUp()
+        # The process-wide index may hold rows from other tests' rolled-back transactions
+        fuzzy._index._index = None
+
+    def job(self, title, **fields):
+        return Job.objects.create(**{"title": title, "company_name": "Acme", "location": "Lahore",
+                                     "description": "x", "job_type": "Full-time", **fields})
+
+    def test_ranking(self):
+        from .fuzzy import TrigramIndex, trigrams
+
+        self.assertEqual(trigrams("Go!"), {"  g", " go", "go "})
+        index = TrigramIndex()
+        for job_id, title in enumerate(["Python Developer", "Python Developers", "Java Developer"], 1):
+            index.add(job_id, "title", title)
+        index.add(3, "company_name", "Pythonic Labs")
+        index.add(4, "title", "Pythonic Labs")
+        self.assertEqual([job_id for job_id, _ in index.search("Pythn Developer")], [1, 2, 3])
+        self.assertEqual([job_id for job_id, _ in index.search("Pythn Developer", threshold=0.7)], [1])
+        index.remove(1, "title", "Python Developer")
+        self.assertEqual([job_id for job_id, _ in index.search("Pythn Developer")], [2, 3])
+
+    def test_inactive_jobs_left_out(self):
+        from .fuzzy import fuzzy_search_jobs
+
+        live = self.job("Python Developer")
+        self.job("Python Developer", is_active=False)
+        self.assertEqual(list(fuzzy_search_jobs(Job.objects.all(), "Pyhton Developr")), [live])
+
+    def test_filters_applied_before_the_cap(self):
+        from unittest import mock
+        from .fuzzy import fuzzy_search_jobs
+
+        for _ in range(6):
+            self.job("Python Developer")
+        contracts = [self.job("Python Developers", job_type="Contract") for _ in range(2)]
+        with mock.patch("jobAccess.fuzzy.MAX_CANDIDATES", 3):
+            found = list(fuzzy_search_jobs(Job.objects.filter(job_type="Contract"), "Python Developer"))
+        self.assertEqual(sorted(job.id for job in found), [job.id for job in contracts])
+
+    def test_rebuilt_after_other_process_writes(self):
+        from django.core.cache import cache
+        from . import fuzzy
+
+        self.assertEqual(list(fuzzy.fuzzy_search_jobs(Job.objects.all(), "Pythn Developer")), [])
+        # Written by another worker: the row commits there, and only the shared version moves
+        job = self.job("Python Developer")
+        cache.incr(fuzzy.FUZZY_VERSION_KEY)
+        self.assertEqual(list(fuzzy.fuzzy_search_jobs(Job.objects.all(), "Pythn Developer")), [])
+        fuzzy._index._checked_at -= 10
+        with override_settings(INDEX_MAX_AGE=0):
+            self.assertEqual(list(fuzzy.fuzzy_search_jobs(Job.objects.all(), "Pythn Developer")), [job])
+
+        # With a process-local cache the bump never arrives; the age limit catches up instead
+        other = self.job("Python Developers")
+        fuzzy._index._checked_at -= 10
+        fuzzy._index._built_at -= 300
+        with override_settings(INDEX_MAX_AGE=300):
+            found = fuzzy.fuzzy_search_jobs(Job.objects.all(), "Pythn Developer")
+            self.assertEqual(sorted(j.id for j in found), [job.id, other.id])
+
+
+class SavedSearchTests(CacheClearingTestCase):
+    """Saved-search endpoints and the batched alert matcher."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("seeker", password="pw")
+
+    def job(self, **kwargs):
+        fields = {"title": "Python Developer", "company_name": "Acme", "location": "Lahore, Pakistan",
+                  "description": "Build APIs", "job_type": "Full-time", **kwargs}
+        return Job.objects.create(**fields)
+
+    def test_create_and_patch_validation(self):
+        from accounts.models import SavedSearch
+
+        self.client.force_login(self.user)
+        url = "/accounts/api/saved-searches/"
+        self.assertEqual(self.client.post(url, "{not json", content_type="application/json").status_code, 400)
+        self.assertEqual(self.client.post(url, {"salary_min": "lots"}, content_type="application/json").status_code, 400)
+        self.assertEqual(self.client.post(url, {"alerts_enabled": "maybe"}, content_type="application/json").status_code, 400)
+        search_id = self.client.post(url, {
+            "name": "n" * 150, "query": "python", "salary_min": 0, "alerts_enabled": "false",
+        }, content_type="application/json").json()["id"]
+        search = SavedSearch.objects.get(id=search_id)
+        self.assertEqual((len(search.name), search.salary_min, search.alerts_enabled), (100, 0, False))
+
+        detail = f"{url}{search_id}/"
+        response = self.client.patch(detail, {
+            "location": "x" * 300, "remote": "true", "salary_max": "90000", "alerts_enabled": "true",
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        search.refresh_from_db()
+        self.assertEqual((len(search.location), search.remote, search.salary_max, search.alerts_enabled),
+                         (200, True, 90000, True))
+        # Fields not sent are kept
+        self.assertEqual((search.query, search.salary_min), ("python", 0))
+        self.assertEqual(self.client.patch(detail, "[", content_type="application/json").status_code, 400)
+
+    def test_alerts_match_new_jobs_once(self):
+        from accounts.alerts import send_search_alerts
+        from accounts.models import SavedSearch
+
+        SavedSearch.objects.create(user=self.user, query="python", location="Lahore")
+        SavedSearch.objects.create(user=self.user, query="python", salary_min=100000)
+        SavedSearch.objects.create(user=self.user, job_type="Contract")
+        self.job()
+        # The first run only records where new jobs start
+        self.assertEqual(send_search_alerts(), (0, 0))
+        self.job(title="Senior Python Engineer", salary_min=120000)
+        self.job(title="Ruby Developer", job_type="Contract", location="Karachi")
+        self.job(title="Python Developer", is_active=False)
+        scanned, sent = send_search_alerts()
+        self.assertEqual((scanned, sent), (3, 2))
+        messages = sorted(self.user.notifications.values_list("message", flat=True))
+        self.assertIn("Ruby Developer", messages[0] + messages[1])
+        self.assertEqual(send_search_alerts(), (0, 0))
+
+    def test_cooccurrence_reset_keeps_alert_watermark(self):
+        from accounts.alerts import send_search_alerts
+        from accounts.models import SavedSearch
+        from .collaborative import update_cooccurrence
+
+        self.job()
+        send_search_alerts()
+        update_cooccurrence(full=True)
+        SavedSearch.objects.create(user=self.user, query="golang")
+        self.job(title="Golang Developer")
+        self.assertEqual(send_search_alerts(), (1, 1))
+
+
+class RecommendationEngineTests(CacheClearingTestCase):
+    """Offline scoring writes each profile's top_k active jobs to JobRecommendation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from accounts.models import Profile
+        from .models import Skill
+
+        cls.skills = {name: Skill.objects.create(name=name) for name in ("Python", "Django", "React")}
+
+        def job(title, skills, **fields):
+            created = Job.objects.create(title=title, company_name="Acme", location="Lahore",
+                                         description=fields.pop("description", title),
+                                         job_type="Full-time", **fields)
+            created.required_skills.set([cls.skills[name] for name in skills])
+            return created
+
+        cls.backend = job("Backend", ["Python", "Django"])
+        cls.scripting = job("Scripting", ["Python"])
+        cls.frontend = job("Frontend", ["React"])
+        cls.closed = job("Closed", ["Python", "Django"], is_active=False)
+        cls.alice = User.objects.create_user("alice", password="pw")
+        cls.bob = User.objects.create_user("bob", password="pw")
+        Profile.objects.create(user=cls.alice).skills.set([cls.skills["Python"], cls.skills["Django"]])
+        Profile.objects.create(user=cls.bob).skills.set([cls.skills["React"]])
+
+    def stored(self, user):
+        from .models import JobRecommendation
+
+        rows = JobRecommendation.objects.filter(user=user).order_by("-relevance_score", "-job_id")
+        return [(job_id, round(score, 3)) for job_id, score in rows.values_list("job_id", "relevance_score")]
+
+    @override_settings(RECOMMENDATION_CF_WEIGHT=0)
+    def test_skill_rebuild(self):
+        from .models import RecommendationDirtyMark
+        from .recommendations import rebuild_recommendations
+
+        self.assertEqual(rebuild_recommendations(mode="skills"), 3)
+        self.assertEqual(self.stored(self.alice), [(self.backend.id, 1.0), (self.scripting.id, 0.707)])
+        self.assertEqual(self.stored(self.bob), [(self.frontend.id, 1.0)])
+        self.assertFalse(RecommendationDirtyMark.objects.exists())
+
+        self.assertEqual(rebuild_recommendations(user_ids=[self.alice.id], top_k=1, mode="skills"), 1)
+        self.assertEqual(self.stored(self.alice), [(self.backend.id, 1.0)])
+        self.assertEqual(self.stored(self.bob), [(self.frontend.id, 1.0)])
+
+    @override_settings(RECOMMENDATION_CF_WEIGHT=0)
+    def test_incremental_refresh(self):
+        from .recommendations import rebuild_recommendations, refresh_recommendations
+
+        rebuild_recommendations(mode="skills")
+        api = Job.objects.create(title="API", company_name="Acme", location="Lahore",
+                                 description="x", job_type="Full-time")
+        api.required_skills.set([self.skills["Python"]])
+        # A new job is merged into matching users' lists without rebuilding them
+        self.assertEqual(refresh_recommendations(mode="skills"), (0, 1))
+        self.assertIn((api.id, 0.707), self.stored(self.alice))
+        self.assertEqual(refresh_recommendations(mode="skills"), (0, 0))
+
+        self.bob.profile.skills.add(self.skills["Python"])
+        self.assertEqual(refresh_recommendations(mode="skills"), (1, 0))
+        self.assertEqual({job_id for job_id, _ in self.stored(self.bob)},
+                         {self.frontend.id, self.scripting.id, api.id, self.backend.id})
+
+        self.scripting.is_active = False
+        self.scripting.save()
+        # Users holding the changed job are rebuilt and lose it
+        self.assertEqual(refresh_recommendations(mode="skills")[0], 2)
+        self.assertNotIn(self.scripting.id, [job_id for job_id, _ in self.stored(self.alice)])
+
+    def test_tfidf_index(self):
+        from .content import TfidfIndex, tokenize
+
+        self.assertEqual(tokenize("Node.js and C++ / C# for the Web"), ["node.js", "c++", "c#", "web"])
+        index = TfidfIndex.build([
+            (1, "Django developer building Python web APIs"),
+            (2, "Python data engineer"),
+            (3, "React developer"),
+        ])
+        ranked = index.score("python django", top_k=3)
+        self.assertEqual([job_id for job_id, _ in ranked], [1, 2])
+        self.assertAlmostEqual(index.score("react developer", top_k=1)[0][1], 1.0, places=5)
+        self.assertEqual(index.score("haskell", top_k=3), [])
+        with tempfile.TemporaryDirectory() as directory:
+            index.save(f"{directory}/index.bin")
+            loaded = TfidfIndex.load(f"{directory}/index.bin")
+        self.assertEqual(loaded.score("python django", top_k=3), ranked)
+
+    @override_settings(RECOMMENDATION_CF_WEIGHT=0)
+    def test_content_rebuild(self):
+        from .recommendations import rebuild_recommendations
+
+        shop = Job.objects.create(title="Django shop", company_name="Acme", location="Lahore",
+                                  description="Python and Django web work", job_type="Full-time")
+        Job.objects.create(title="Django archive", company_name="Acme", location="Lahore",
+                           description="Python and Django", job_type="Full-time", is_active=False)
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(TFIDF_INDEX_PATH=f"{directory}/tfidf.bin"):
+            rebuild_recommendations(mode="content")
+        self.assertEqual([job_id for job_id, _ in self.stored(self.alice)], [shop.id])
+        self.assertEqual(self.stored(self.bob), [])
+
+    @override_settings(RECOMMENDATION_CF_WEIGHT=0.5)
+    def test_collaborative_blend(self):
+        from .collaborative import score_collaborative, update_cooccurrence
+        from .models import JobCooccurrence
+        from .recommendations import rebuild_recommendations
+
+        for name, jobs in (("u1", [self.backend, self.scripting]),
+                           ("u2", [self.backend, self.scripting, self.frontend, self.closed])):
+            user = User.objects.create_user(name, password="pw")
+            for job in jobs:
+                Application.objects.create(user=user, job=job)
+        Application.objects.create(user=self.alice, job=self.backend)
+        self.assertEqual(update_cooccurrence(), 7)
+        self.assertEqual(JobCooccurrence.objects.get(job=self.backend, other=self.scripting).count, 2)
+        self.assertEqual(update_cooccurrence(), 0)
+
+        scores = dict(score_collaborative([self.alice.id])[self.alice.id])
+        self.assertEqual(scores.keys(), {self.scripting.id, self.frontend.id})
+        self.assertEqual((round(scores[self.scripting.id], 3), round(scores[self.frontend.id], 3)), (1.0, 0.707))
+
+        Bookmark.objects.create(user=self.alice, job=self.frontend)
+        self.assertEqual(update_cooccurrence(), 1)
+        self.assertEqual(JobCooccurrence.objects.get(job=self.backend, other=self.frontend).count, 2)
+
+        rebuild_recommendations(user_ids=[self.alice.id], mode="skills")
+        # Skills alone rank backend first; the co-occurrence share lifts scripting above it
+        self.assertEqual([job_id for job_id, _ in self.stored(self.alice)][:2], [self.scripting.id, self.backend.id])
+
+
+class ResumeParsingTests(CacheClearingTestCase):
+    """Uploads queue a task; sandboxed child processes turn the file into profile skills."""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        from . import skills
+        from .models import Skill
+
+        for name in ("Python", "Django", "Kubernetes"):
+            Skill.objects.create(name=name)
+        skills._matcher._index = None
+        self.user = User.objects.create_user("candidate", password="pw")
+        self.client.force_login(self.user)
+
+    def upload(self, name, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        return self.client.post("/accounts/api/profile/resume/", {"resume": SimpleUploadedFile(name, content)}).json()
+
+    def test_upload_then_parse(self):
+        from accounts.models import ResumeParseTask
+        from accounts.resumes import process_resumes
+
+        task_id = self.upload("cv.txt", b"Five years of Python and django.")["parse_task"]
+        self.assertEqual(ResumeParseTask.objects.get(id=task_id).status, "pending")
+        self.assertEqual(process_resumes(workers=1, timeout=10), {"done": 1, "failed": 0})
+        task = ResumeParseTask.objects.get(id=task_id)
+        self.assertEqual((task.status, task.detected_skills), ("done", ["Django", "Python"]))
+        self.assertEqual(set(self.user.profile.skills.values_list("name", flat=True)), {"Django", "Python"})
+        self.assertEqual(process_resumes(), {"done": 0, "failed": 0})
+
+    def test_failures_stay_with_their_task(self):
+        import time
+        from unittest import mock
+        from accounts.models import ResumeParseTask
+        from accounts.resumes import process_resumes
+
+        def hang(path, conn, memory_mb, cpu_seconds):
+            time.sleep(30)
+
+        self.upload("cv.txt", b"Kubernetes")
+        with mock.patch("accounts.resumes.parse_resume_file", hang):
+            self.assertEqual(process_resumes(timeout=1), {"done": 0, "failed": 1})
+        self.assertEqual(ResumeParseTask.objects.get().error, "timed out after 1s")
+
+        self.upload("broken.docx", b"not a zip archive")
+        self.assertEqual(process_resumes(timeout=10), {"done": 0, "failed": 1})
+        self.assertTrue(ResumeParseTask.objects.latest("id").error.startswith("BadZipFile"))
+        self.assertFalse(self.user.profile.skills.exists())
+
+    def test_orphaned_task_requeued(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from accounts.models import ResumeParseTask
+        from accounts.resumes import LEASE_SLACK_SECONDS, process_resumes
+
+        task_id = self.upload("cv.txt", b"Python")["parse_task"]
+        # Claimed by a worker that died; still inside the lease, so left alone
+        claimed_at = timezone.now() - timedelta(seconds=10 + LEASE_SLACK_SECONDS - 5)
+        ResumeParseTask.objects.filter(id=task_id).update(status="running", claimed_at=claimed_at)
+        self.assertEqual(process_resumes(timeout=10), {"done": 0, "failed": 0})
+        self.assertEqual(ResumeParseTask.objects.get(id=task_id).status, "running")
+
+        ResumeParseTask.objects.filter(id=task_id).update(claimed_at=claimed_at - timedelta(seconds=10))
+        self.assertEqual(process_resumes(timeout=10), {"done": 1, "failed": 0})
+        task = ResumeParseTask.objects.get(id=task_id)
+        self.assertEqual((task.status, task.detected_skills), ("done", ["Python"]))
+        self.assertIsNotNone(task.claimed_at)
+
+    def test_text_extraction(self):
+        import sys
+        import zipfile
+        import zlib
+        from unittest import mock
+        from accounts.resume_text import extract_text
+
+        with tempfile.TemporaryDirectory() as directory:
+            docx = f"{directory}/cv.docx"
+            with zipfile.ZipFile(docx, "w") as archive:
+                archive.writestr("word/document.xml", "<w:p><w:r><w:t>Python &amp; Django</w:t></w:r></w:p>"
+                                                      "<w:p><w:r><w:t xml:space=\"preserve\">Kubernetes</w:t></w:r></w:p>")
+            self.assertEqual(extract_text(docx), "Python & Django\nKubernetes")
+
+            stream = zlib.compress(b"BT /F1 12 Tf (Python \\(3.12\\)) Tj ET")
+            pdf = f"{directory}/cv.pdf"
+            with open(pdf, "wb") as fh:
+                fh.write(b"%PDF-1.4\n1 0 obj <<>>\nstream\n" + stream + b"\nendstream\nendobj\n")
+            with mock.patch.dict(sys.modules, {"pypdf": None}):
+                self.assertEqual(extract_text(pdf), "Python (3.12)")
+
+
+class FullTextSearchTests(CacheClearingTestCase):
+    """Query parsing, trigger-maintained FTS5 index and relevance ordering."""
+
+    def job(self, title, description="x", **fields):
+        return Job.objects.create(title=title, company_name="Acme", location="Lahore",
+                                  description=description, job_type="Full-time", **fields)
+
+    def test_parse_query(self):
+        from .search import fts5_query, parse_query, tsquery
+
+        terms = parse_query('"machine learning" node.js pyth* django -')
+        self.assertEqual(terms, [
+            ("phrase", ["machine", "learning"]), ("phrase", ["node", "js"]),
+            ("prefix", ["pyth"]), ("word", ["django"]),
+        ])
+        self.assertEqual(fts5_query(terms), '"machine learning" "node js" "pyth"* "django"')
+        self.assertEqual(tsquery(terms), "(machine <-> learning) & (node <-> js) & pyth:* & django")
+        # Quotes and operators in user input never reach MATCH unescaped
+        self.assertEqual(fts5_query(parse_query('title:x OR "y')), '"title x" "OR" "y"')
+
+    def test_triggers_and_ranking(self):
+        from .search import backend, search_jobs
+
+        if backend() != "fts5":
+            self.skipTest("SQLite without FTS5")
+
+        def found(text):
+            return [job.id for job in search_jobs(Job.objects.all(), text)]
+
+        in_description = self.job("Engineer", description="Maintains our Django services")
+        in_title = self.job("Django Developer")
+        self.assertEqual(found("django"), [in_title.id, in_description.id])
+        self.assertEqual(found("developers"), [in_title.id])
+        self.assertEqual(found("djan*"), [in_title.id, in_description.id])
+
+        in_title.title = "Rails Developer"
+        in_title.save()
+        self.assertEqual(found("django"), [in_description.id])
+        self.assertEqual(found("rails"), [in_title.id])
+        in_description.delete()
+        self.assertEqual(found("django"), [])
+        self.assertEqual(found('"rails developer"'), [in_title.id])
+        self.assertEqual(found('"developer rails"'), [])
+
+
+class SuggestTests(CacheClearingTestCase):
+    """Prefix suggestions come from memory and follow job writes."""
+
+    def setUp(self):
+        from . import suggest
+
+        super().setUp()
+        suggest._index._index = None
+
+    def test_prefix_index(self):
+        from .suggest import PrefixIndex
+
+        index = PrefixIndex.from_counts([
+            ("title", "Python  Developer", 3), ("title", "python developer", 1),
+            ("title", "Developer Advocate", 2), ("company", "DevCorp", 5), ("skill", "Go", 0),
+        ])
+        self.assertEqual(index.suggest("dev"), [
+            {"text": "DevCorp", "type": "company", "weight": 5},
+            {"text": "Python Developer", "type": "title", "weight": 4},
+            {"text": "Developer Advocate", "type": "title", "weight": 2},
+        ])
+        self.assertEqual([s["text"] for s in index.suggest("DEV", kinds=("title",), limit=1)], ["Python Developer"])
+        self.assertEqual(index.suggest("go"), [])
+        self.assertEqual(index.suggest("  "), [])
+
+        # Cached answers are dropped when an entry they could contain changes
+        index.add("title", "Developer Advocate", 4)
+        index.add("title", "Python Developer", -4)
+        self.assertEqual([s["text"] for s in index.suggest("dev")], ["Developer Advocate", "DevCorp"])
+
+    def test_endpoint_follows_writes(self):
+        Job.objects.create(title="Data Engineer", company_name="Databricks", location="Lahore",
+                           description="x", job_type="Full-time")
+        url = "/accounts/api/suggest/"
+        self.client.get(url, {"prefix": "x"})
+        with self.assertNumQueries(0):
+            data = self.client.get(url, {"prefix": "dat", "types": "title,company,bogus"}).json()
+        self.assertEqual([s["text"] for s in data["suggestions"]], ["Databricks", "Data Engineer"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(title="Data Analyst", company_name="Acme", location="Karachi",
+                                     description="x", job_type="Full-time")
+        texts = [s["text"] for s in self.client.get(url, {"prefix": "data"}).json()["suggestions"]]
+        self.assertIn("Data Analyst", texts)
+        with self.captureOnCommitCallbacks(execute=True):
+            job.is_active = False
+            job.save()
+        texts = [s["text"] for s in self.client.get(url, {"prefix": "data", "limit": "x"}).json()["suggestions"]]
+        self.assertNotIn("Data Analyst", texts)
+
+    def test_index_max_age(self):
+        from . import suggest
+
+        suggest.suggest("dat")
+        # Another worker's write: the row is there but no version reaches this process
+        Job.objects.create(title="Data Engineer", company_name="Acme", location="Lahore",
+                           description="x", job_type="Full-time")
+        suggest._index._checked_at -= 10
+        with override_settings(INDEX_MAX_AGE=0):
+            self.assertEqual(suggest.suggest("dat"), [])
+        suggest._index._checked_at -= 10
+        suggest._index._built_at -= 300
+        with override_settings(INDEX_MAX_AGE=300):
+            self.assertEqual([s["text"] for s in suggest.suggest("dat")], ["Data Engineer"])
+
+
+class FacetTests(CacheClearingTestCase):
+    """Facet counts come from one grouped query per facet and are cached until jobs change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = JobCategory.objects.create(name="Engineering")
+        for salary, job_type, location, active in ((None, "Full-time", "Lahore", True),
+                                                   (49999, "Full-time", "Lahore", True),
+                                                   (50000, "Contract", "Karachi", True),
+                                                   (150000, "Full-time", "Lahore", False)):
+            Job.objects.create(title="Role", company_name="Acme", location=location, description="x",
+                               job_type=job_type, salary_min=salary, is_active=active,
+                               category=category if salary else None)
+
+    def test_compute_facets(self):
+        from .facets import compute_facets
+
+        with self.assertNumQueries(5):
+            facets = compute_facets(Job.objects.all())
+        self.assertEqual(facets["job_type"], [{"value": "Full-time", "count": 3}, {"value": "Contract", "count": 1}])
+        self.assertEqual(facets["category"], [{"value": "Engineering", "count": 3}, {"value": None, "count": 1}])
+        self.assertEqual([(b["value"], b["count"]) for b in facets["salary_band"]],
+                         [("0-50k", 1), ("50k-100k", 1), ("150k+", 1), ("unspecified", 1)])
+        self.assertEqual(facets["is_active"], [{"value": True, "count": 3}, {"value": False, "count": 1}])
+        self.assertEqual(compute_facets(Job.objects.filter(location="Karachi"))["location"],
+                         [{"value": "Karachi", "count": 1}])
+
+    def test_cached_until_jobs_change(self):
+        from .facets import cached_facets
+
+        filters = {"job_type": "Full-time"}
+        qs = Job.objects.filter(job_type="Full-time")
+        with self.assertNumQueries(5):
+            self.assertEqual(cached_facets(qs, filters)["job_type"], [{"value": "Full-time", "count": 3}])
+        with self.assertNumQueries(0):
+            cached_facets(qs, filters)
+
+        # Applications change jobs' payloads but not their facets
+        user = User.objects.create_user("facet", password="pw")
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(user=user, job=qs.first())
+        with self.assertNumQueries(0):
+            cached_facets(qs, filters)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(title="Role", company_name="Acme", location="Lahore", description="x",
+                               job_type="Full-time")
+        self.assertEqual(cached_facets(qs, filters)["job_type"], [{"value": "Full-time", "count": 4}])
+        with self.captureOnCommitCallbacks(execute=True):
+            category = JobCategory.objects.get()
+            category.name = "Eng"
+            category.save()
+        self.assertIn({"value": "Eng", "count": 2}, cached_facets(qs, filters)["category"])
+
+        data = self.client.get("/accounts/api/jobs/", {"job_type": "Contract", "facets": "1"}).json()
+        self.assertEqual(data["facets"]["job_type"], [{"value": "Contract", "count": 1}])
+        self.assertNotIn("facets", self.client.get("/accounts/api/jobs/").json())
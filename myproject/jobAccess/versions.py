@@ -0,0 +1,88 @@
+# jobAccess/versions.py - Version counters behind the API's ETags
+#
+# Each scope (all jobs, one job, one user's bookmarks, ...) has a counter in
+# the shared cache that writes bump after commit. A response's ETag is a
+# digest of the counters it depends on plus the request path, so answering a
+# conditional GET with 304 costs a cache read instead of the view's queries.
+# The counters must be visible to every worker, so conditional() is off
+# unless settings.CONDITIONAL_GET says the cache is shared.
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+JOBS = 'version:jobs'
+CATEGORIES = 'version:categories'
+
+
+def job_key(job_id):
+    return f'version:job:{job_id}'
+
+
+def user_key(user_id, name):
+    """Scope for one user's list, e.g. user_key(7, 'bookmarks')."""
+    return f'version:user:{user_id}:{name}'
+
+
+def versions(keys):
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Seeding from the clock means a counter lost to eviction restarts
+            # above any value an earlier ETag was built from
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump(*keys):
+    """Invalidate ETags built from keys once the current transaction commits."""
+    def apply():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass  # Never read, so no ETag depends on it yet
+    transaction.on_commit(apply)
+
+
+def etag(request, keys):
+    raw = '|'.join([request.get_full_path(), str(request.user.pk), *map(str, versions(keys))])
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def conditional(scopes):
+    """Answer GETs with 304 while the versions of scopes(request, *args, **kwargs) are unchanged.
+
+    scopes returns the version keys the response depends on, or None to skip
+    (e.g. for anonymous requests, which get a 401 anyway). Without
+    settings.CONDITIONAL_GET the view runs as is and sends no ETag: with a
+    per-process cache a write bumps only its own worker's counters, and the
+    others would keep answering 304 for data that changed.
+    """
+    def decorator(view):
+        def etag_func(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return None
+            keys = scopes(request, *args, **kwargs)
+            return None if keys is None else etag(request, keys)
+
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'CONDITIONAL_GET', False):
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header('ETag'):
+                # Per-user data: browsers may keep it but must revalidate every time
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,231 @@
+# myproject/metrics.py - Counters and histograms shared across worker processes
+#
+# Each process adds to float values in its own memory-mapped file under
+# METRICS_DIR, so recording costs a dict lookup and an in-place write, never
+# a lock shared with other workers. The /metrics view sums every process's
+# file (including ones written by management commands and exited workers,
+# so counters stay monotonic) and renders the Prometheus text format.
+
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# name -> (type, help); histograms are stored as <name>_bucket/_sum/_count
+METRICS = {
+    'http_request_duration_seconds': ('histogram', 'Request wall time by view'),
+    'http_requests_total': ('counter', 'Requests by view and status class'),
+    'db_queries_total': ('counter', 'Database queries issued by requests, by view'),
+    'db_query_seconds_total': ('counter', 'Database time spent by requests, by view'),
+    'listing_cache_requests_total': ('counter', 'Listing cache lookups by result'),
+    'listing_cache_waits_total': ('counter', 'Listing lookups that waited on another request\'s rebuild'),
+    'listing_cache_rebuild_seconds_total': ('counter', 'Time spent rebuilding cached listings'),
+    'recommendation_rebuild_seconds': ('histogram', 'Recommendation rebuild/refresh durations by kind'),
+}
+
+_HEADER = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+INITIAL_SIZE = 1 << 16
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'jobrec-metrics')
+
+
+class ValueFile:
+    """Float values by key in a memory-mapped file only this process writes.
+
+    Layout: 8-byte count of used bytes, then entries of a 4-byte key length,
+    the UTF-8 key padded to 8-byte alignment and an 8-byte double. The used
+    count is written after each new entry, so readers never see half of one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size < INITIAL_SIZE:
+            self._file.truncate(INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or _HEADER.size
+        self._positions = {key: position for key, _, position in _entries(self._map, self._used)}
+
+    def add(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value = _VALUE.unpack_from(self._map, position)[0]
+        _VALUE.pack_into(self._map, position, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode('utf-8')
+        padded = _LENGTH.size + len(encoded)
+        padded += -padded % 8
+        needed = self._used + padded + _VALUE.size
+        if needed > len(self._map):
+            size = len(self._map)
+            while size < needed:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        _LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[self._used + _LENGTH.size:self._used + _LENGTH.size + len(encoded)] = encoded
+        position = self._used + padded
+        _VALUE.pack_into(self._map, position, 0.0)
+        self._used = needed
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+
+def _entries(data, used):
+    offset = _HEADER.size
+    while offset < used:
+        length = _LENGTH.unpack_from(data, offset)[0]
+        key = bytes(data[offset + _LENGTH.size:offset + _LENGTH.size + length]).decode('utf-8')
+        padded = _LENGTH.size + length
+        padded += -padded % 8
+        position = offset + padded
+        yield key, _VALUE.unpack_from(data, position)[0], position
+        offset = position + _VALUE.size
+
+
+_lock = threading.Lock()
+_file = None
+_opened_for = None
+_disabled = False
+
+
+def _values():
+    global _file, _opened_for, _disabled
+    directory = metrics_dir()
+    if _opened_for != (os.getpid(), directory):
+        # First use, a worker forked after its parent opened a file, or a new METRICS_DIR
+        try:
+            os.makedirs(directory, exist_ok=True)
+            _file = ValueFile(os.path.join(directory, f'metrics_{os.getpid()}.db'))
+        except OSError as exc:
+            if not _disabled:
+                logger.warning('Metrics disabled, cannot write to %s: %s', directory, exc)
+            _disabled, _file = True, None
+        _opened_for = (os.getpid(), directory)
+    return _file
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted((labels or {}).items())])
+
+
+def inc(name, labels=None, amount=1.0):
+    with _lock:
+        values = _values()
+        if values is not None:
+            values.add(_key(name, labels), amount)
+
+
+def observe(name, value, labels=None):
+    """Record value in histogram name (per-bucket counts; render() makes them cumulative)."""
+    bound = next((b for b in DURATION_BUCKETS if value <= b), '+Inf')
+    with _lock:
+        values = _values()
+        if values is not None:
+            values.add(_key(f'{name}_bucket', {**(labels or {}), 'le': str(bound)}), 1.0)
+            values.add(_key(f'{name}_sum', labels), value)
+            values.add(_key(f'{name}_count', labels), 1.0)
+
+
+@contextmanager
+def timer(name, labels=None):
+    """Observe the enclosed block's duration in histogram name."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, labels)
+
+
+def observe_request(view, status, seconds, queries, db_seconds):
+    labels = {'view': view}
+    observe('http_request_duration_seconds', seconds, labels)
+    inc('http_requests_total', {'view': view, 'status': f'{status // 100}xx'})
+    if queries:
+        inc('db_queries_total', labels, queries)
+        inc('db_query_seconds_total', labels, db_seconds)
+
+
+def collect():
+    """{(name, sorted label pairs): value} summed over every process's file."""
+    totals = defaultdict(float)
+    for path in glob.glob(os.path.join(metrics_dir(), 'metrics_*.db')):
+        try:
+            with open(path, 'rb') as fh:
+                data = fh.read()
+        except OSError:
+            continue
+        if len(data) < _HEADER.size:
+            continue
+        for key, value, _ in _entries(data, _HEADER.unpack_from(data, 0)[0]):
+            name, labels = json.loads(key)
+            totals[(name, tuple(tuple(pair) for pair in labels))] += value
+    return totals
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(totals, gauges=()):
+    """Prometheus text exposition of collect() totals plus (name, type, help, [(labels, value)]) gauges."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            counts = defaultdict(dict)
+            for (metric, labels), value in totals.items():
+                if metric == f'{name}_bucket':
+                    le = dict(labels)['le']
+                    counts[tuple(pair for pair in labels if pair[0] != 'le')][le] = value
+            for series in sorted(counts):
+                running = 0.0
+                for bound in [str(b) for b in DURATION_BUCKETS] + ['+Inf']:
+                    running += counts[series].get(bound, 0.0)
+                    labels = tuple(sorted(series + (('le', bound),)))
+                    lines.append(f'{name}_bucket{_format_labels(labels)} {_format_value(running)}')
+                lines.append(f'{name}_sum{_format_labels(series)} {_format_value(totals[(f"{name}_sum", series)])}')
+                lines.append(f'{name}_count{_format_labels(series)} {_format_value(totals[(f"{name}_count", series)])}')
+        else:
+            for (metric, labels), value in sorted(totals.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    for name, kind, help_text, samples in gauges:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            lines.append(f'{name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,261 @@
+# myproject/profiling.py - Profile one request on demand with ?_profile=cpu or ?_profile=mem
+#
+# Only staff requests carrying the parameter are profiled; every other request
+# costs ProfilingMiddleware a dict lookup. A CPU profile is a cProfile run of
+# the rest of the middleware chain and the view, a memory profile is a
+# tracemalloc snapshot taken before the response is returned. Results are
+# stored under PROFILE_DIR as a summary (.json), raw data (.prof for pstats,
+# snakeviz and friends) and collapsed stacks (.collapsed for flamegraph.pl or
+# speedscope); the response's X-Profile-Id header names them.
+
+import cProfile
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+
+from django.conf import settings
+
+KINDS = ('cpu', 'mem')
+# Stored profiles kept; older ones are deleted
+KEEP = 50
+# Rows kept in the summary table
+TOP = 200
+TRACEBACK_DEPTH = 30
+MAX_STACK_DEPTH = 100
+# Stacks below this share of the request's time are dropped from .collapsed files
+MIN_STACK_SHARE = 0.0005
+
+# cProfile and tracemalloc are process-wide: one profiled request at a time
+_busy = threading.Lock()
+
+
+def profile_dir():
+    return getattr(settings, 'PROFILE_DIR', None) or os.path.join(tempfile.gettempdir(), 'jobrec-profiles')
+
+
+def _path(profile_id, suffix):
+    return os.path.join(profile_dir(), f'{profile_id}.{suffix}')
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':
+        # Builtins look like ('~', 0, "<method 'join' of 'str' objects>")
+        return name
+    return f'{os.path.basename(filename)}:{line}({name})'
+
+
+def _code_key(function):
+    """pstats' (filename, line, name) key for a Python function."""
+    code = getattr(getattr(function, '__func__', function), '__code__', None)
+    return code and (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def _collapse(stats, entry):
+    """Collapsed stacks ("a;b;c microseconds" lines) reconstructed from pstats caller edges.
+
+    cProfile only records caller -> callee totals, so time a function spends
+    under several callers is split between them in proportion to each
+    caller's share of its cumulative time.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((func, cumulative))
+    # The middleware chain recurses through itself, so start from the known
+    # entry point rather than from the functions that have no callers
+    roots = [entry] if entry in stats else [func for func, value in stats.items() if not value[4]]
+
+    weights = {}
+    cutoff = max((stats[root][3] for root in roots), default=0) * MIN_STACK_SHARE
+
+    def walk(func, share_ct, stack):
+        _, _, own, cumulative, _ = stats[func]
+        if share_ct < cutoff or cumulative <= 0 or func in stack or len(stack) >= MAX_STACK_DEPTH:
+            return
+        fraction = min(1.0, share_ct / cumulative)
+        stack = stack + (func,)
+        line = ';'.join(_label(f).replace(';', ',') for f in stack)
+        weights[line] = weights.get(line, 0.0) + own * fraction
+        for callee, edge_ct in callees.get(func, ()):
+            walk(callee, edge_ct * fraction, stack)
+
+    for root in roots:
+        walk(root, stats[root][3], ())
+    return [f'{line} {round(seconds * 1e6)}' for line, seconds in weights.items() if seconds >= 1e-6]
+
+
+def _cpu_rows(profiler):
+    stats = pstats.Stats(profiler).stats
+    rows = [
+        {
+            'function': _label(func),
+            'ncalls': calls,
+            'primitive_calls': primitive,
+            'tottime_ms': round(own * 1000, 3),
+            'cumtime_ms': round(cumulative * 1000, 3),
+        }
+        for func, (primitive, calls, own, cumulative, _) in stats.items()
+    ]
+    rows.sort(key=lambda row: row['cumtime_ms'], reverse=True)
+    return stats, rows[:TOP]
+
+
+def _mem_rows(snapshot):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+    rows = [
+        {
+            'location': f'{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+            'file': stat.traceback[0].filename,
+            'size_kb': round(stat.size / 1024, 2),
+            'count': stat.count,
+        }
+        for stat in snapshot.statistics('lineno')[:TOP]
+    ]
+    collapsed = []
+    for stat in snapshot.statistics('traceback'):
+        # Oldest frame first, as flamegraph tools expect
+        frames = [f'{os.path.basename(frame.filename)}:{frame.lineno}' for frame in reversed(stat.traceback)]
+        collapsed.append(f"{';'.join(frames)} {stat.size}")
+    return rows, collapsed
+
+
+def _prune():
+    summaries = sorted(
+        (name for name in os.listdir(profile_dir()) if name.endswith('.json')), reverse=True,
+    )
+    for name in summaries[KEEP:]:
+        profile_id = name[:-len('.json')]
+        for suffix in ('json', 'prof', 'collapsed'):
+            try:
+                os.remove(_path(profile_id, suffix))
+            except FileNotFoundError:
+                pass
+
+
+def _save(profile_id, summary, collapsed, profiler=None):
+    os.makedirs(profile_dir(), exist_ok=True)
+    if profiler is not None:
+        profiler.dump_stats(_path(profile_id, 'prof'))
+    with open(_path(profile_id, 'collapsed'), 'w', encoding='utf-8') as fh:
+        fh.write('\n'.join(collapsed) + '\n')
+    with open(_path(profile_id, 'json'), 'w', encoding='utf-8') as fh:
+        json.dump(summary, fh)
+    _prune()
+
+
+def list_profiles():
+    """Stored profile summaries without their tables, newest first."""
+    try:
+        names = sorted((n for n in os.listdir(profile_dir()) if n.endswith('.json')), reverse=True)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        summary = load(name[:-len('.json')])
+        if summary is not None:
+            summary.pop('rows', None)
+            profiles.append(summary)
+    return profiles
+
+
+def _valid_id(profile_id):
+    return profile_id.replace('-', '').isalnum()
+
+
+def load(profile_id):
+    """The stored summary for profile_id, or None."""
+    if not _valid_id(profile_id):
+        return None
+    try:
+        with open(_path(profile_id, 'json'), encoding='utf-8') as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def artifact_path(profile_id, suffix):
+    """Path of a stored .prof or .collapsed file, or None."""
+    if not _valid_id(profile_id) or suffix not in ('prof', 'collapsed'):
+        return None
+    path = _path(profile_id, suffix)
+    return path if os.path.exists(path) else None
+
+
+class ProfilingMiddleware:
+    """Profile staff requests that ask for it with ?_profile=cpu or ?_profile=mem.
+
+    Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        kind = request.GET.get('_profile')
+        if kind is None:
+            return self.get_response(request)
+        if kind not in KINDS or not (request.user.is_authenticated and request.user.is_staff):
+            return self.get_response(request)
+        if not _busy.acquire(blocking=False):
+            response = self.get_response(request)
+            response['X-Profile-Id'] = 'busy'
+            return response
+        try:
+            return self._profile(request, kind)
+        finally:
+            _busy.release()
+
+    def _profile(self, request, kind):
+        profile_id = f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}'
+        profiler = None
+        started = time.perf_counter()
+        if kind == 'cpu':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        else:
+            tracemalloc.start(TRACEBACK_DEPTH)
+            try:
+                response = self.get_response(request)
+                # Lazy responses allocate while rendering
+                if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                    response.render()
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        total = time.perf_counter() - started
+
+        match = request.resolver_match
+        summary = {
+            'id': profile_id,
+            'kind': kind,
+            'created': round(time.time(), 3),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': (match.view_name if match else None) or 'unresolved',
+            'user': request.user.username,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+        }
+        if kind == 'cpu':
+            stats, summary['rows'] = _cpu_rows(profiler)
+            collapsed = _collapse(stats, _code_key(self.get_response))
+        else:
+            summary['peak_kb'] = round(peak / 1024, 2)
+            summary['rows'], collapsed = _mem_rows(snapshot)
+        _save(profile_id, summary, collapsed, profiler)
+        response['X-Profile-Id'] = profile_id
+        return response
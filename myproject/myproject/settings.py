@@ -53,6 +53,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings cover all other middleware
+    'myproject.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     # Serve static files efficiently in production
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -60,6 +62,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Staff-only ?_profile=cpu|mem; needs request.user
+    'myproject.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -99,6 +103,85 @@ _db_url = os.getenv('DATABASE_URL')
 if _db_url:
     DATABASES['default'] = dj_database_url.parse(_db_url, conn_max_age=600, ssl_require=True)
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Holds listing responses, facet counts and the API's version counters. The
+# in-memory default is per process; set REDIS_URL (needs the redis package)
+# to share it between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'jobrec',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+_redis_url = os.getenv('REDIS_URL')
+if _redis_url:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': _redis_url,
+    }
+
+# ETags/304s (jobAccess.versions) need version counters every worker sees, so
+# they are on only with a shared cache; CONDITIONAL_GET=true forces them on
+# for a single-process server. With the in-memory cache, cached listings in
+# other workers can lag a write by up to their 5 minute timeout.
+CONDITIONAL_GET = os.getenv('CONDITIONAL_GET', 'true' if _redis_url else 'false').lower() == 'true'
+
+# The in-process search indexes (jobAccess.memindex) learn about other
+# workers' writes through the same counters. With the in-memory cache those
+# bumps never leave their worker, so each index is also rebuilt once it is
+# INDEX_MAX_AGE seconds old; 0 turns the limit off for a shared cache.
+INDEX_MAX_AGE = int(os.getenv('INDEX_MAX_AGE', '0' if _redis_url else '300'))
+
+# Metrics
+# Each process keeps its counters in a file under METRICS_DIR and /metrics
+# sums them, so every gunicorn worker must see the same directory. Clear it
+# when the service starts so exited workers' files don't pile up. Scrapers
+# without a staff session send "Authorization: Bearer $METRICS_TOKEN".
+
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Slow query log
+# Queries slower than SLOW_QUERY_MS (0 turns the log off) are written with
+# their view, SQL fingerprint and EXPLAIN plan to SLOW_QUERY_LOG (default
+# <tmp>/jobrec-slow-queries.log; each process writes <name>.<pid>.log,
+# rotated at 10 MB). Rank them with
+# `python manage.py slow_queries`.
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG')
+
+# Request profiling
+# Staff can add ?_profile=cpu or ?_profile=mem to any URL; the last 50
+# profiles are kept in PROFILE_DIR (default <tmp>/jobrec-profiles) and listed
+# at /accounts/api/profiles/.
+
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+# myproject.timing writes one JSON line per request (on by default when DEBUG
+# is off; set REQUEST_LOG_LEVEL=INFO or WARNING to choose).
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'myproject.timing': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'WARNING' if DEBUG else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -157,6 +240,14 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Recommendations: 'skills' (Job.required_skills overlap) or 'content' (TF-IDF)
+RECOMMENDATION_MODE = os.getenv('RECOMMENDATION_MODE', 'skills')
+TFIDF_INDEX_PATH = Path(os.getenv('TFIDF_INDEX_PATH', BASE_DIR / 'tfidf_index.bin'))
+# Share of each score taken from application/bookmark co-occurrence (0 disables it)
+RECOMMENDATION_CF_WEIGHT = float(os.getenv('RECOMMENDATION_CF_WEIGHT', '0.3'))
+# Merge skills detected in uploaded resumes into Profile.skills (else only propose them)
+RESUME_SKILL_MERGE = os.getenv('RESUME_SKILL_MERGE', 'True').lower() == 'true'
+
 # Login URL configuration
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -0,0 +1,182 @@
+# myproject/slowlog.py - Log queries slower than SLOW_QUERY_MS with their query plan
+#
+# ServerTimingMiddleware installs a SlowQueryLog execute_wrapper next to its
+# timing wrapper. A query over the threshold is written as one JSON line to a
+# rotating file: the view that ran it, its duration and its SQL fingerprint
+# (literals and IN lists collapsed, so every call of the same ORM query
+# groups together). The first time a process sees a fingerprint it also runs
+# EXPLAIN on the same SQL and parameters and stores the plan. Parameters
+# themselves are never written. Each process rotates its own file (the pid
+# goes before the extension, as METRICS_DIR files carry theirs), so workers
+# never rotate a file another one is appending to. `manage.py slow_queries`
+# ranks every process's entries together.
+
+import hashlib
+import json
+import logging
+import glob
+import os
+import re
+import tempfile
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+# Fingerprints remembered per process as already explained
+MAX_EXPLAINED = 10000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE = re.compile(r'\s+')
+
+EXPLAIN_PREFIX = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+}
+
+
+def threshold_ms():
+    return getattr(settings, 'SLOW_QUERY_MS', 0)
+
+
+def log_path():
+    return getattr(settings, 'SLOW_QUERY_LOG', None) or os.path.join(tempfile.gettempdir(), 'jobrec-slow-queries.log')
+
+
+def normalize(sql):
+    """sql with literals and placeholders as ?, IN lists as (...) and whitespace collapsed."""
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.md5(normalized.encode()).hexdigest()[:12]
+
+
+_explained = set()
+_state = threading.local()
+_handler_lock = threading.Lock()
+_opened_for = None
+
+
+def process_path(path, pid):
+    """This process's file for log path: slow.log -> slow.<pid>.log."""
+    root, ext = os.path.splitext(path)
+    return f'{root}.{pid}{ext}'
+
+
+def _writer():
+    """The logger writing to this process's file, (re)attached on first use, after a fork or when the path changes."""
+    global _opened_for
+    key = (os.getpid(), log_path())
+    if _opened_for != key:
+        with _handler_lock:
+            if _opened_for != key:
+                for handler in list(logger.handlers):
+                    logger.removeHandler(handler)
+                    handler.close()
+                path = process_path(key[1], key[0])
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                handler = RotatingFileHandler(path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                logger.addHandler(handler)
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                _opened_for = key
+    return logger
+
+
+def explain(connection, sql, params):
+    """The database's plan for sql as a list of lines, or None if it can't be explained."""
+    prefix = EXPLAIN_PREFIX.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    try:
+        # Savepoint, so a failed EXPLAIN can't break the request's transaction
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                rows = cursor.fetchall()
+    except DatabaseError as exc:
+        return [f'EXPLAIN failed: {exc}']
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [' '.join(str(value) for value in row) for row in rows]
+
+
+class SlowQueryLog:
+    """Database execute_wrapper logging the request's queries over threshold_ms()."""
+
+    def __init__(self, request, threshold):
+        self.request = request
+        self.threshold = threshold / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_state, 'explaining', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed = time.perf_counter() - started
+        if elapsed >= self.threshold:
+            self.record(context['connection'], sql, params, many, elapsed)
+        return result
+
+    def record(self, connection, sql, params, many, elapsed):
+        normalized = normalize(sql)
+        digest = fingerprint(normalized)
+        match = self.request.resolver_match
+        entry = {
+            'ts': round(time.time(), 3),
+            'view': (match.view_name if match else None) or 'unresolved',
+            'method': self.request.method,
+            'path': self.request.path,
+            'ms': round(elapsed * 1000, 2),
+            'fingerprint': digest,
+            'sql': normalized,
+        }
+        if not many and digest not in _explained and len(_explained) < MAX_EXPLAINED:
+            _explained.add(digest)
+            _state.explaining = True
+            try:
+                entry['plan'] = explain(connection, sql, params)
+            finally:
+                _state.explaining = False
+        _writer().info(json.dumps(entry))
+
+
+def _log_files(path):
+    """Every process's file for path (and path itself), each preceded by its rotated backups."""
+    root, ext = os.path.splitext(path)
+    own = re.compile(re.escape(root) + r'\.\d+' + re.escape(ext) + '$')
+    current = sorted(name for name in glob.glob(f'{glob.escape(root)}.*{glob.escape(ext)}') if own.match(name))
+    files = []
+    for name in current + [path]:
+        files += [f'{name}.{n}' for n in range(BACKUP_COUNT, 0, -1)] + [name]
+    return files
+
+
+def read_entries(path=None):
+    """Logged entries from every process's log file and rotated backups, oldest file first per process."""
+    for name in _log_files(path or log_path()):
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
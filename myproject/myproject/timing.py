@@ -0,0 +1,162 @@
+# myproject/timing.py - Per-request timing: Server-Timing header, log line, rolling percentiles
+#
+# ServerTimingMiddleware measures wall time, database queries/time (through a
+# connection execute_wrapper) and response size for every request. Views
+# that build responses with the JsonResponse and render defined here also
+# report how long encoding/template rendering took. Each URL name keeps its
+# last WINDOW durations in process for percentile snapshots, and the same
+# numbers go to the cross-process histograms in myproject.metrics.
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django import http, shortcuts
+from django.db import connections
+
+from . import slowlog
+from .metrics import observe_request
+
+logger = logging.getLogger('myproject.timing')
+
+# Requests kept per URL name for percentiles
+WINDOW = 1000
+PERCENTILES = (50, 90, 99)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_seconds', 'serialize_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute_wrapper; the slow-query log's EXPLAINs aren't the request's queries
+        if getattr(slowlog._state, 'explaining', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class _Window:
+    __slots__ = ('count', 'durations')
+
+    def __init__(self):
+        self.count = 0
+        self.durations = deque(maxlen=WINDOW)
+
+
+_windows = {}
+_windows_lock = threading.Lock()
+
+
+def _observe(name, seconds):
+    window = _windows.get(name)
+    if window is None:
+        with _windows_lock:
+            window = _windows.setdefault(name, _Window())
+    window.count += 1
+    window.durations.append(seconds)
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def snapshot():
+    """{url name: {count, p50_ms, p90_ms, p99_ms, max_ms}} over each name's last WINDOW requests."""
+    data = {}
+    for name, window in sorted(_windows.items()):
+        ordered = sorted(window.durations)
+        if not ordered:
+            continue
+        stats = {'count': window.count}
+        for pct in PERCENTILES:
+            stats[f'p{pct}_ms'] = round(_percentile(ordered, pct) * 1000, 2)
+        stats['max_ms'] = round(ordered[-1] * 1000, 2)
+        data[name] = stats
+    return data
+
+
+@contextmanager
+def serializing():
+    """Count the enclosed block as serialization time of the current request."""
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.serialize_seconds += time.perf_counter() - started
+
+
+class JsonResponse(http.JsonResponse):
+    """django.http.JsonResponse that reports its encoding time."""
+
+    def __init__(self, *args, **kwargs):
+        with serializing():
+            super().__init__(*args, **kwargs)
+
+
+def render(*args, **kwargs):
+    """django.shortcuts.render that reports template rendering time."""
+    with serializing():
+        return shortcuts.render(*args, **kwargs)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        threshold = slowlog.threshold_ms()
+        slow_queries = slowlog.SlowQueryLog(request, threshold) if threshold > 0 else None
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                    if slow_queries is not None:
+                        stack.enter_context(connection.execute_wrapper(slow_queries))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        response['Server-Timing'] = (
+            f'total;dur={total * 1000:.1f}, '
+            f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.queries} queries", '
+            f'serialize;dur={metrics.serialize_seconds * 1000:.1f}'
+        )
+        match = request.resolver_match
+        name = (match.view_name if match else None) or 'unresolved'
+        _observe(name, total)
+        observe_request(name, response.status_code, total, metrics.queries, metrics.db_seconds)
+        if logger.isEnabledFor(logging.INFO):
+            size = None if response.streaming else len(response.content)
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': name,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'db_ms': round(metrics.db_seconds * 1000, 2),
+                'queries': metrics.queries,
+                'serialize_ms': round(metrics.serialize_seconds * 1000, 2),
+                'bytes': size,
+            }))
+        return response
@@ -59,8 +59,44 @@ document.addEventListener('DOMContentLoaded', function() {
         if (e.key === 'Enter') searchBtn.click();
       });
     }
+
+    // Search-as-you-type suggestions
+    attachSuggestions(searchBar);
+    attachSuggestions(document.getElementById('keyword'));
+    attachSuggestions(document.getElementById('location'), 'location');
 });
 
+function attachSuggestions(input, types) {
+  if (!input) return;
+  const list = document.createElement('datalist');
+  list.id = `${input.id || input.className.split(' ')[0]}-suggestions`;
+  input.after(list);
+  input.setAttribute('list', list.id);
+  input.setAttribute('autocomplete', 'off');
+
+  let lastPrefix = '';
+  input.addEventListener('input', debounce(async () => {
+    const prefix = input.value.trim();
+    if (!prefix || prefix === lastPrefix) return;
+    lastPrefix = prefix;
+    const params = new URLSearchParams({ prefix, limit: 8 });
+    if (types) params.append('types', types);
+    try {
+      const res = await fetch(`/accounts/api/suggest/?${params.toString()}`);
+      if (!res.ok) return;
+      const data = await res.json();
+      list.replaceChildren(...data.suggestions.map((s) => {
+        const option = document.createElement('option');
+        option.value = s.text;
+        option.label = s.type;
+        return option;
+      }));
+    } catch (err) {
+      console.error('Suggestions failed', err);
+    }
+  }, 150));
+}
+
 function debounce(func, wait) {
   let timeout;
   return function executedFunction(...args) {
@@ -499,10 +535,10 @@ document.addEventListener('click', function(e) {
 
 // ============== NOTIFICATION BADGE ==============
 function updateNotificationBadge() {
-  fetch('/accounts/api/notifications/', { credentials: 'same-origin' })
+  fetch('/accounts/api/notifications/?cursor=&limit=1', { credentials: 'same-origin' })
     .then(async (r) => {
       if (r.status === 401) {
-        return { items: [] }; // not logged in, hide badge
+        return { unread: 0 }; // not logged in, hide badge
       }
       if (!r.ok) {
         const body = await r.text();
@@ -511,7 +547,7 @@ function updateNotificationBadge() {
       return r.json();
     })
     .then(data => {
-      const unreadCount = data.items ? data.items.filter(n => !n.read).length : 0;
+      const unreadCount = data.unread || 0;
       const badge = document.getElementById('notif-badge');
       if (badge) {
         if (unreadCount > 0) {
@@ -531,19 +567,19 @@ function updateProfileStats() {
   const bookmarkCount = document.getElementById('bookmark-count');
 
   if (appCount) {
-    fetch('/accounts/api/applications/')
+    fetch('/accounts/api/applications/?cursor=&limit=1&total=1')
       .then(r => r.json())
       .then(data => {
-        appCount.textContent = data.items ? data.items.length : 0;
+        appCount.textContent = data.total || 0;
       })
       .catch(err => console.log('App count update skipped:', err));
   }
 
   if (bookmarkCount) {
-    fetch('/accounts/api/bookmarks/')
+    fetch('/accounts/api/bookmarks/?cursor=&limit=1&total=1')
       .then(r => r.json())
       .then(data => {
-        bookmarkCount.textContent = data.items ? data.items.length : 0;
+        bookmarkCount.textContent = data.total || 0;
       })
       .catch(err => console.log('Bookmark count update skipped:', err));
   }